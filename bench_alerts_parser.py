@@ -0,0 +1,76 @@
+"""
+Micro-benchmark: throughput of the alerts export parser (parse_alerts_csv) and of parsing plus
+validation (normalise_alert_rows, what write_to_db consumes) on a synthetic "All Intrady Alerts" export.
+
+    python bench_alerts_parser.py [rows] [repeats]
+"""
+import csv
+import gc
+import io
+import logging
+import random
+import sys
+import time
+
+from algo_scripts.algotrade.scripts.trading_style.intraday.strategies.intraday_screener.scanner.get_intra_stock_alerts import (
+    normalise_alert_rows, parse_alerts_csv)
+
+logger = logging.getLogger("BenchAlertsParser")
+logger.setLevel(logging.WARNING)
+
+TAGS = ["PRB", "ORB", "VOL", "PDH", "PDL", "R1", "S1", "GAP"]
+
+
+def synthetic_export(rows, seed=7):
+    """Build an export with the same cell layout the site produces."""
+    rnd = random.Random(seed)
+    out = io.StringIO(newline="")
+    writer = csv.writer(out)
+    writer.writerow(["Stock Name", "LTP", "Alerts", "Deviation From Pivots", "Todays Range", "Level"])
+    for i in range(rows):
+        price = round(rnd.uniform(50, 5000), 2)
+        pct = round(rnd.uniform(-6, 6), 2)
+        change = round(price * pct / 100, 2)
+        tags = " ".join(rnd.sample(TAGS, rnd.randint(0, 3)))
+        writer.writerow([
+            f"STOCK{i}\xa0\xa0{tags}",
+            f"{price}\n{change}({pct}%)",
+            f"{rnd.randint(1, 9)} alerts",
+            f"R{rnd.randint(1, 3)} +{round(rnd.uniform(0, 2), 2)}%",
+            f"{round(price * 0.98, 2)} - {round(price * 1.02, 2)}",
+            round(price * rnd.uniform(0.97, 1.03), 2),
+        ])
+    return out.getvalue()
+
+
+def best_of(repeats, fn):
+    """Best wall time over `repeats` runs, with GC paused like timeit does."""
+    timings = []
+    for _ in range(repeats):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return min(timings), result
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    text = synthetic_export(rows)
+    args = dict(stock_type="Intraday Alerts", strength="Intraday", date_time="2025-01-01 10:00:00", logger=logger)
+
+    parse_time, parsed = best_of(repeats, lambda: parse_alerts_csv(io.StringIO(text, newline=""), **args))
+    valid_time, records = best_of(repeats, lambda: list(normalise_alert_rows(
+        parse_alerts_csv(io.StringIO(text, newline=""), **args), logger)))
+
+    assert len(parsed) == len(records) == rows
+    assert [r[4] for r in parsed] == [r["stock_name"] for r in records]
+
+    print(f"rows={rows} repeats={repeats}")
+    print(f"parse_alerts_csv            {parse_time * 1000:8.1f} ms  {rows / parse_time:12,.0f} rows/s")
+    print(f"  + normalise_alert_rows    {valid_time * 1000:8.1f} ms  {rows / valid_time:12,.0f} rows/s")
@@ -0,0 +1,104 @@
+"""
+Cold-start budget: how long importing each strategy module takes, measured with -X importtime.
+
+    python bench_import_time.py [budget_ms] [repeats]
+
+Every module is imported in a fresh interpreter `repeats` times and the best run is kept, so a
+warm disk cache does not hide regressions and a noisy run does not fail the check. The slowest
+imports of each module are listed; exits with status 1 if any module goes over the budget
+(IMPORT_BUDGET_MS, default 1500 ms) or a cold import loads one of its DEFERRED_IMPORTS.
+"""
+import os
+import re
+import subprocess
+import sys
+
+MODULES = (
+    "algo_scripts.algotrade.scripts.trading_style.intraday.strategies.intraday_screener.scanner.get_intra_stock_alerts",
+    "algo_scripts.algotrade.scripts.trading_style.intraday.strategies.intraday_screener.ohl.ohl_process",
+    "algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_ohl_signals",
+    "algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_intraday_screener_signals",
+    "algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.tradingview_signals",
+    "algo_scripts.algotrade.scripts.trade_utils.market_data",
+)
+
+# Heavy packages a module only needs once it runs; a cold import must not load them
+DEFERRED_IMPORTS = {
+    MODULES[0]: ("selenium.webdriver",),
+    MODULES[1]: ("fyers_apiv3",),
+}
+
+# import time: self [us] | cumulative | imported package
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+
+def import_profile(module: str):
+    """Return [(imported module, cumulative us, nesting depth)] for one cold import, in report order."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    profile = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            _, cumulative, indent, name = match.groups()
+            profile.append((name, int(cumulative), (len(indent) - 1) // 2))
+    return profile
+
+
+def measure(module: str, repeats: int):
+    """Best-of-`repeats` total import time in ms and that run's profile."""
+    best_ms, best_profile = None, None
+    for _ in range(repeats):
+        profile = import_profile(module)
+        total_ms = next(cumulative for name, cumulative, depth in profile if name == module and depth == 0) / 1000
+        if best_ms is None or total_ms < best_ms:
+            best_ms, best_profile = total_ms, profile
+    return best_ms, best_profile
+
+
+def slowest_imports(module: str, profile, top: int = 5):
+    """The module's direct imports that dominate its import time."""
+    # -X importtime reports children before their parent, so the module's direct imports are the
+    # depth-1 entries right above its own depth-0 line
+    end = next(i for i, (name, _, depth) in enumerate(profile) if name == module and depth == 0)
+    direct = []
+    for name, cumulative, depth in reversed(profile[:end]):
+        if depth == 0:
+            break
+        if depth == 1:
+            direct.append((name, cumulative / 1000))
+    return sorted(direct, key=lambda item: item[1], reverse=True)[:top]
+
+
+def main(budget_ms: float, repeats: int) -> bool:
+    ok = True
+    for module in MODULES:
+        short_name = module.rsplit(".", 1)[-1]
+        try:
+            total_ms, profile = measure(module, repeats)
+        except RuntimeError as e:
+            ok = False
+            print(f"❌ {short_name}: {e}")
+            continue
+        loaded = {name for name, _, _ in profile}
+        eager = [name for name in DEFERRED_IMPORTS.get(module, ()) if name in loaded]
+        status = "✅" if total_ms <= budget_ms and not eager else "❌"
+        ok = ok and total_ms <= budget_ms and not eager
+        print(f"{status} {short_name:<32} {total_ms:8.1f} ms (budget {budget_ms:.0f} ms)")
+        for name in eager:
+            print(f"     imports {name} at module level; import it where it is used")
+        for name, ms in slowest_imports(module, profile):
+            print(f"     {ms:8.1f} ms  {name}")
+    return ok
+
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    sys.exit(0 if main(budget, repeats) else 1)
@@ -0,0 +1,174 @@
+"""
+Benchmark: ORM objects copied into lists vs Core named-tuple read models, for one full day of
+OHL and intraday alert history.
+
+    python bench_read_models.py [ohl_rows] [intraday_rows] [repeats] [db_url]
+
+Reports the best wall time of `repeats` reads and the peak Python memory (tracemalloc) of one
+read, with the result kept alive as the callers keep it. db_url defaults to throw-away SQLite
+files (one per table); the tables are created if missing and emptied afterwards.
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.read_models import OhlSignalRow
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_intraday_screener_signals import (
+    SgIntradayScreenerSignals, SgIntradayScreenerSignalsRepository)
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_ohl_signals import (
+    SgOhlSignals, SgOhlSignalsRepository)
+
+DAY = date(2025, 1, 1)
+
+
+def ohl_records(rows):
+    return [
+        {
+            "screener_run_id": "202501011015",
+            "screener_date": DAY,
+            "screener_type": "OHL",
+            "screener": "Open = Low" if i % 2 else "Open = High",
+            "stock_name": f"STOCK{i}",
+            "trade_type": "BUY" if i % 2 else "SELL",
+            "screener_rank": i + 1,
+            "price": 100.0 + i,
+            "change": 1.5,
+            "percentage": 0.8,
+            "momentum": 2.1,
+            "open": 99.0 + i,
+            "deviation_from_pivots": "R1 +0.4%",
+            "todays_range": "98.1 - 104.2",
+            "ohl": "LOW" if i % 2 else "HIGH",
+            "stock_type": "FO",
+            "weekly_trend": "UP",
+            "sector": "BANKING",
+            "bullish_milestone_tags": "PRB ORB" if i % 2 else "",
+            "bearish_milestone_tags": "" if i % 2 else "PRB PDL",
+            "last_updated_time": datetime(2025, 1, 1, 10, 15),
+        }
+        for i in range(rows)
+    ]
+
+
+def intraday_records(rows):
+    return [
+        {
+            "screener_run_time": datetime(2025, 1, 1, 9, 15 + i % 45),
+            "screener_date": DAY,
+            "screener_type": "BEST_INTRADAY_STOCKS",
+            "screener": f"Intraday{i % 4}",
+            "stock_name": f"STOCK{i // 4}",
+            "stock_type": "Intraday Alerts",
+            "trade_type": "BUY" if i % 2 else "SELL",
+            "ltp": 100.0 + i,
+            "alerts": "3 alerts",
+            "deviation_from_pivots": "R1 +0.4%",
+            "todays_range": "98.1 - 104.2",
+            "level": 101.5 + i,
+            "run_id": "202501011015",
+            "run_history": "09:15-RUN, 09:30-RUN, 09:45-RUN",
+            "tags": "09:15-BEST_Intraday, 09:30-BEST_Intraday",
+            "screener_rank": i + 1,
+            "bullish_milestone_tags": "PRB" if i % 2 else "",
+            "bearish_milestone_tags": "" if i % 2 else "PRB",
+        }
+        for i in range(rows)
+    ]
+
+
+def legacy_ohl(session):
+    """What get_by_screener_date_and_screener did before: ORM objects copied into 20-item lists."""
+    return [
+        [getattr(row, field) for field in OhlSignalRow._fields]
+        for row in session.query(SgOhlSignals).filter(SgOhlSignals.screener_date == DAY).all()
+    ]
+
+
+def legacy_intraday(session):
+    """The ORM read the intraday history had to use: full objects for every column."""
+    return (
+        session.query(SgIntradayScreenerSignals)
+        .filter(SgIntradayScreenerSignals.screener_date == DAY)
+        .order_by(SgIntradayScreenerSignals.id)
+        .all()
+    )
+
+
+def measure(session, read, repeats):
+    """(best seconds, peak bytes, rows) of `read`; the session is cleared so every read starts cold."""
+    best = None
+    for _ in range(repeats):
+        session.expunge_all()
+        session.commit()
+        started = time.perf_counter()
+        rows = read()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        del rows
+
+    session.expunge_all()
+    session.commit()
+    gc.collect()
+    tracemalloc.start()
+    rows = read()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(rows)
+
+
+if __name__ == "__main__":
+    ohl_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    intraday_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    db_files = []
+    if len(sys.argv) > 4:
+        urls = (sys.argv[4], sys.argv[4])
+    else:
+        tmp = tempfile.mkdtemp()
+        db_files = [os.path.join(tmp, "ohl.db"), os.path.join(tmp, "intraday.db")]
+        urls = tuple(f"sqlite:///{db_file}" for db_file in db_files)
+
+    sessions = {}
+    for model, records, url in ((SgOhlSignals, ohl_records(ohl_rows), urls[0]),
+                                (SgIntradayScreenerSignals, intraday_records(intraday_rows), urls[1])):
+        engine = create_engine(url)
+        model.__table__.create(engine, checkfirst=True)
+        session = sessionmaker(bind=engine)()
+        session.execute(model.__table__.insert(), records)
+        session.commit()
+        sessions[model] = session
+    ohl_session, intra_session = sessions[SgOhlSignals], sessions[SgIntradayScreenerSignals]
+
+    ohl_repo = SgOhlSignalsRepository(session=ohl_session)
+    intra_repo = SgIntradayScreenerSignalsRepository(session=intra_session)
+    cases = (
+        ("OHL   ORM + list", ohl_session, lambda: legacy_ohl(ohl_session)),
+        ("OHL   OhlSignalRow", ohl_session, lambda: ohl_repo.get_by_screener_date_and_screener(DAY)),
+        ("Intra ORM objects", intra_session, lambda: legacy_intraday(intra_session)),
+        ("Intra IntradaySignalRow", intra_session, lambda: intra_repo.get_signal_rows(DAY)),
+    )
+
+    print(f"ohl_rows={ohl_rows} intraday_rows={intraday_rows} repeats={repeats} "
+          f"url={ohl_session.bind.url.render_as_string(hide_password=True)}")
+    results = {}
+    for name, session, read in cases:
+        seconds, peak, count = measure(session, read, repeats)
+        results[name] = (seconds, peak)
+        print(f"{name:24s} {seconds * 1000:9.1f} ms  peak {peak / 2 ** 20:7.2f} MiB  ({count} rows)")
+    for legacy, slim in (("OHL   ORM + list", "OHL   OhlSignalRow"), ("Intra ORM objects", "Intra IntradaySignalRow")):
+        (t_old, m_old), (t_new, m_new) = results[legacy], results[slim]
+        print(f"{slim.split()[0]:5s} speed-up x{t_old / t_new:.2f}, memory x{m_old / m_new:.2f} smaller")
+
+    for model, session in sessions.items():
+        session.execute(delete(model))
+        session.commit()
+        session.close()
+    for db_file in db_files:
+        os.remove(db_file)
@@ -0,0 +1,100 @@
+"""
+Benchmark: ORM bulk_save_objects vs Core multi-row bulk_insert for SgIntradayScreenerSignals.
+
+    python bench_screener_insert.py [rows] [batch_size] [db_url]
+
+db_url defaults to a throw-away SQLite file; pass a MySQL-compatible URL to test against a
+local server (the table is created if missing and emptied between runs).
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, date
+
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_intraday_screener_signals import (
+    SgIntradayScreenerSignals, SgIntradayScreenerSignalsRepository)
+
+
+def synthetic_records(rows):
+    run_time = datetime(2025, 1, 1, 10, 15)
+    return [
+        {
+            "screener_run_time": run_time,
+            "screener_date": date(2025, 1, 1),
+            "screener_type": "BEST_INTRADAY_STOCKS",
+            "screener": "Intraday",
+            "stock_name": f"STOCK{i}",
+            "stock_type": "Intraday Alerts",
+            "trade_type": "BUY" if i % 2 else "SELL",
+            "ltp": 100.0 + i,
+            "vol_change": (i % 11) - 5.0,
+            "alerts": "3 alerts",
+            "deviation_from_pivots": "R1 +0.4%",
+            "todays_range": "98.1 - 104.2",
+            "level": 101.5 + i,
+            "run_id": "202501011015",
+            "run_history": "10:15-RUN",
+            "signal_count": 1,
+            "tags": "10:15-BEST_Intraday",
+            "screener_rank": i + 1,
+            "bullish_milestone_tags": "PRB" if i % 2 else "",
+            "bearish_milestone_tags": "" if i % 2 else "PRB",
+        }
+        for i in range(rows)
+    ]
+
+
+def reset(session):
+    session.execute(delete(SgIntradayScreenerSignals))
+    session.commit()
+
+
+def orm_path(session, records, batch_size):
+    for start in range(0, len(records), batch_size):
+        session.bulk_save_objects([SgIntradayScreenerSignals(**r) for r in records[start:start + batch_size]])
+        session.commit()
+
+
+def core_path(session, records, batch_size):
+    stats = SgIntradayScreenerSignalsRepository(session=session).bulk_insert(records, batch_size=batch_size)
+    assert all(batch["ok"] for batch in stats), stats
+    return stats
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    db_file = None
+    if len(sys.argv) > 3:
+        url = sys.argv[3]
+    else:
+        db_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+        url = f"sqlite:///{db_file}"
+
+    engine = create_engine(url)
+    SgIntradayScreenerSignals.__table__.create(engine, checkfirst=True)
+    session = sessionmaker(bind=engine)()
+    records = synthetic_records(rows)
+
+    results = {}
+    for name, path in (("ORM bulk_save_objects", orm_path), ("Core bulk_insert", core_path)):
+        reset(session)
+        started = time.perf_counter()
+        stats = path(session, records, batch_size)
+        results[name] = time.perf_counter() - started
+        if stats:
+            per_batch = sorted(batch["seconds"] for batch in stats)
+            print(f"  Core batch times: median {per_batch[len(per_batch) // 2] * 1000:.1f} ms, max {per_batch[-1] * 1000:.1f} ms")
+
+    reset(session)
+    print(f"rows={rows} batch_size={batch_size} url={engine.url.render_as_string(hide_password=True)}")
+    for name, seconds in results.items():
+        print(f"{name:24s} {seconds:7.2f} s  {rows / seconds:10,.0f} rows/s")
+    orm, core = results.values()
+    print(f"speed-up x{orm / core:.2f}")
+    if db_file:
+        os.remove(db_file)
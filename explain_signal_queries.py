@@ -0,0 +1,146 @@
+"""
+Run EXPLAIN on the SQL each signal repository actually emits and fail on full table scans.
+
+    python explain_signal_queries.py [YYYY-MM-DD]
+
+The repository methods are called for real, but the statement to explain is intercepted before
+it reaches the cursor, and statements a method sends before it are swapped for SELECT 1, so
+nothing is read or deleted. Plans depend on table statistics:
+run it against a database holding realistic history, MySQL may pick a scan on near-empty tables.
+Exits with status 1 if any query plans a full table scan.
+"""
+import io
+import logging
+import sys
+from contextlib import redirect_stdout
+from datetime import date, time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_intraday_screener_signals import SgIntradayScreenerSignalsRepository
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_ohl_signals import SgOhlSignalsRepository
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.tradingview_signals import TVSignalsRepository
+
+
+SIGNALS_DELETE = "DELETE FROM sg_intraday_screener_signals"
+EVENTS_DELETE = "DELETE FROM sg_intraday_signal_events"
+
+
+def repository_queries(day: str):
+    """
+    (label, callable[, statement prefix]) for every hot lookup/delete the intraday flow runs; with
+    a prefix the first statement starting with it is explained instead of the first one sent.
+    """
+    return [
+        ("SgIntradayScreenerSignalsRepository.fetch_signals_by_date_stock_and_screeners",
+         lambda: SgIntradayScreenerSignalsRepository().fetch_signals_by_date_stock_and_screeners(day, "RELIANCE")),
+        ("SgIntradayScreenerSignalsRepository.get_signal_rows",
+         lambda: SgIntradayScreenerSignalsRepository().get_signal_rows(day, ["RELIANCE", "TCS"])),
+        ("SgIntradayScreenerSignalsRepository.get_levels_by_date_and_stocks",
+         lambda: SgIntradayScreenerSignalsRepository().get_levels_by_date_and_stocks(day, ["RELIANCE", "TCS"])),
+        ("SgIntradayScreenerSignalsRepository.get_stocks_with_tag",
+         lambda: SgIntradayScreenerSignalsRepository().get_stocks_with_tag(day, "PRB", time(11, 0))),
+        ("SgIntradayScreenerSignalsRepository.delete_by_date_and_type (run events)",
+         lambda: SgIntradayScreenerSignalsRepository().delete_by_date_and_type(day, "BEST_INTRADAY_STOCKS"),
+         EVENTS_DELETE),
+        ("SgIntradayScreenerSignalsRepository.delete_by_date_and_type",
+         lambda: SgIntradayScreenerSignalsRepository().delete_by_date_and_type(day, "BEST_INTRADAY_STOCKS"),
+         SIGNALS_DELETE),
+        ("SgIntradayScreenerSignalsRepository.delete_by_date_type_and_screeners",
+         lambda: SgIntradayScreenerSignalsRepository().delete_by_date_type_and_screeners(day, "BEST_INTRADAY_STOCKS"),
+         SIGNALS_DELETE),
+        ("SgOhlSignalsRepository.get_data",
+         lambda: SgOhlSignalsRepository().get_data(day)),
+        ("SgOhlSignalsRepository.get_by_screener_date_and_screener",
+         lambda: SgOhlSignalsRepository().get_by_screener_date_and_screener(day)),
+        ("SgOhlSignalsRepository.get_candidate_stock_names",
+         lambda: SgOhlSignalsRepository().get_candidate_stock_names(day, "Low", "PRB")),
+        ("SgOhlSignalsRepository.delete_by_date_and_type",
+         lambda: SgOhlSignalsRepository().delete_by_date_and_type(day, "OHL")),
+        ("TVSignalsRepository.get_tickers_with_signals_on",
+         lambda: TVSignalsRepository().get_tickers_with_signals_on(["NSE:RELIANCE-EQ", "NSE:TCS-EQ"], day)),
+        ("TVSignalsRepository.check_stocks_by_date_and_screener",
+         lambda: TVSignalsRepository().check_stocks_by_date_and_screener(["RELIANCE"], day)),
+        ("TVSignalsRepository.get_tv_signals",
+         lambda: TVSignalsRepository().get_tv_signals(day)),
+        ("TVSignalsRepository.get_tv_signals_by_criteria",
+         lambda: TVSignalsRepository().get_tv_signals_by_criteria(day, "BUY", "OHL")),
+    ]
+
+
+class _Captured(Exception):
+    """Raised from the cursor hook to stop the statement from executing."""
+
+
+def capture_statement(call, prefix: str = None):
+    """
+    Return (engine, sql, parameters) for the first statement `call` sends (the first starting with
+    `prefix`, if given), or None. Statements sent before it run as SELECT 1 instead.
+    """
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if prefix is not None and not statement.lstrip().startswith(prefix):
+            return "SELECT 1", ()
+        captured.append((conn.engine, statement, parameters))
+        raise _Captured()
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute, retval=True)
+    # the repositories log/print the interrupted statement as an error; keep that out of the report
+    logging.disable(logging.CRITICAL)
+    try:
+        with redirect_stdout(io.StringIO()):
+            call()
+    except _Captured:
+        pass
+    finally:
+        logging.disable(logging.NOTSET)
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+    return captured[0] if captured else None
+
+
+def explain(bind, statement, parameters):
+    """Return (plan lines, full scan findings) for one statement."""
+    with bind.connect() as conn:
+        if bind.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            plan = [row[-1] for row in rows]
+            # "SCAN t USING INDEX ..." walks an index; a bare "SCAN t" reads every row
+            scans = [line for line in plan if line.startswith("SCAN") and " USING " not in line]
+        else:
+            rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().all()
+            plan = [
+                f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}"
+                for row in rows
+            ]
+            scans = [
+                f"{row['table']}: type=ALL"
+                for row in rows
+                if row["type"] == "ALL"
+            ]
+    return plan, scans
+
+
+def check_query_plans(day: str) -> bool:
+    ok = True
+    for label, call, *prefix in repository_queries(day):
+        captured = capture_statement(call, *prefix)
+        if captured is None:
+            print(f"⚠️ {label}: no statement captured")
+            continue
+        bind, statement, parameters = captured
+        plan, scans = explain(bind, statement, parameters)
+        status = "❌" if scans else "✅"
+        print(f"{status} {label}")
+        for line in plan:
+            print(f"     {line}")
+        if scans:
+            ok = False
+            print(f"     full table scan: {', '.join(scans)}")
+    return ok
+
+
+if __name__ == "__main__":
+    day = sys.argv[1] if len(sys.argv) > 1 else date.today().strftime("%Y-%m-%d")
+    sys.exit(0 if check_query_plans(day) else 1)
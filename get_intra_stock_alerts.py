@@ -1,4 +1,4 @@
-import csv, os, logging
+import csv, os, logging, re, sys
 
 #from algo_scripts.algotrade.scripts.fyers.fyers_subscribe_n1_ghseets import stock
 
@@ -6,15 +6,26 @@ import csv, os, logging
 logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
 import tempfile
 import shutil
+import queue
+import threading
+import io
+import json
+import base64
+import ctypes
+import ctypes.util
+import select
+import struct
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
+from urllib.parse import urlsplit
 import os
 import time
 import pytz
-from selenium import webdriver
+# ✅ selenium.webdriver and WebDriverWait/expected_conditions are imported where they are used:
+#    they cost most of this module's import time and only the scrape needs them.
+#    Locators use BY_XPATH / BY_CSS_SELECTOR below instead of selenium's By for the same reason.
 from selenium.common.exceptions import WebDriverException, TimeoutException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -22,6 +33,7 @@ from algo_scripts.algotrade.scripts.trade_utils.time_manager import get_current_
 
 from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_intraday_screener_signals import \
     SgIntradayScreenerSignalsRepository, SgIntradayScreenerSignals
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.management.session_provider import remove_session
 
 
 INTRADAY_SCREENER_EMAIL = os.getenv("INTRADAY_SCREENER_EMAIL")
@@ -30,9 +42,140 @@ INTRADAY_SCREENER_PWD = os.getenv("INTRADAY_SCREENER_PWD")
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
-def read_csv_and_delete(download_dir,file_name, stock_type, strength, date_time,logger):
+# Column order of the rows built by build_alert_row and unpacked by write_to_db
+ALERT_ROW_COLUMNS = (
+    "screener_run_time",
+    "screener_date",
+    "screener_type",
+    "screener",
+    "stock_name",
+    "stock_type",
+    "trade_type",
+    "ltp",
+    "vol_change",
+    "alerts",
+    "deviation_from_pivots",
+    "todays_range",
+    "level",
+    "run_id",
+    "run_history",
+    "signal_count",
+    "tags",
+    "screener_rank",
+    "bullish_milestone_tags",
+    "bearish_milestone_tags",
+)
+
+
+@lru_cache(maxsize=8)
+def alert_run_context(stock_type, strength, date_time):
+    """Values shared by every row of one scrape run (computed once per run)."""
+    ist_zone = pytz.timezone("Asia/Kolkata")
+    time_now = datetime.now()
+    ist_now = time_now.astimezone(ist_zone)
+    return {
+        "date_time": date_time,
+        "screener_date": get_today_date_as_str(),
+        "run_time_str": ist_now.strftime("%H:%M"),  # ✅ Get current run time for run_history
+        "screener_run_id": get_screener_run_id(),
+        "stock_type": stock_type,
+        "strength": strength,
+    }
+
+
+def build_alert_row(run_context, stock_name, parameters, price, vol_change, alerts,
+                    deviation_from_pivots, todays_range, level, screener_rank):
+    """Build the 20-column row written by write_to_db from one parsed alert."""
+    # Determine Trade Type based on percentage
+    trade_type = "SELL" if float(vol_change) < 0 else "BUY"
+    if trade_type == "BUY":
+        bullish_tags = parameters.strip()
+        bearish_tags = ""
+    else:
+        bearish_tags = parameters.strip()
+        bullish_tags = ""
+
+    run_time_str = run_context["run_time_str"]
+    return [
+        run_context["date_time"],
+        run_context["screener_date"],
+        "BEST_INTRADAY_STOCKS",
+        run_context["strength"],
+        stock_name.strip(),
+        run_context["stock_type"],
+        trade_type,
+        price,
+        vol_change,
+        alerts,
+        deviation_from_pivots,
+        todays_range,
+        level,
+        run_context["screener_run_id"],
+        f"{run_time_str}-RUN",  # run_history (first time)
+        1,  # signal_count starts at 1 for new entries
+        f"{run_time_str}-BEST_{run_context['strength']}",
+        screener_rank,
+        bullish_tags,
+        bearish_tags,
+    ]
+
+
+def iter_alerts_csv(file, stock_type, strength, date_time, logger):
+    """
+    Yield write_to_db rows one at a time from an "All Intrady Alerts" export in any text
+    file object (on-disk file or io.StringIO). Malformed rows are logged and skipped.
+    """
+    reader = csv.reader(file)
+
+    # Clean headers to remove hidden BOM markers or extra spaces
+    headers = next(reader, None)
+    run_context = alert_run_context(stock_type, strength, date_time)
+    screener_rank = 1
+
+    for row in reader:
+        #logger.info("row" + str(row))
+        if len(row) > 0:
+            try:
+                # Split the 'Stock Name' and 'Parameters' column
+                try:
+                    stock_name, parameters = row[0].split('\xa0\xa0', maxsplit=1)
+                    #parameters = all_parameters.split('\n\n ', maxsplit=1)
+                except ValueError:
+                    stock_name = row[0]
+                    parameters = ""
+                # Split the 'LTP' column into Price, Change, and Percentage
+                ltp_parts = row[1].split('\n')
+                price = ltp_parts[0].strip()
+                change, vol_change = ltp_parts[1].split('(')
+                #percentage = percentage.strip(')%')
+                vol_change = vol_change.strip(')%')
+
+                modified_row = build_alert_row(
+                    run_context,
+                    stock_name,
+                    parameters,
+                    price,
+                    vol_change,
+                    row[2],
+                    row[3],  # Deviation from Pivots
+                    row[4],  # TODAYS RANGE
+                    row[5],
+                    screener_rank,
+                )
+            except (IndexError, ValueError) as e:
+                logger.error(f"❌ Skipping malformed alert row {row}: {e}")
+                continue
+            yield modified_row
+            screener_rank += 1
+    logger.info(f"Reading completed")
 
-    data = []
+
+def parse_alerts_csv(file, stock_type, strength, date_time, logger):
+    """List version of iter_alerts_csv."""
+    return list(iter_alerts_csv(file, stock_type, strength, date_time, logger))
+
+
+def read_csv_and_delete(download_dir,file_name, stock_type, strength, date_time,logger):
     #full_path = f"/home/ubuntu/algotrade/scraper/temp/{file_path}"
 
     csv_file = os.path.join(download_dir, file_name)
@@ -41,242 +184,730 @@ def read_csv_and_delete(download_dir,file_name, stock_type, strength, date_time,
     logger.info(f"Reading {csv_file}..")
     try:
         with open(csv_file, mode='r', newline='', encoding='utf-8') as file:
-            reader = csv.reader(file)
-
-            # Clean headers to remove hidden BOM markers or extra spaces
-            headers = next(reader)
-            ist_zone = pytz.timezone("Asia/Kolkata")
-            time_now = datetime.now()
-            ist_now = time_now.astimezone(ist_zone)
-            screener_date = get_today_date_as_str()
-            run_time_str = ist_now.strftime("%H:%M")  # ✅ Get current run time for run_history
-            screener_rank = 1
-
-            screener_run_id  = get_screener_run_id()
-
-            for row in reader:
-                #logger.info("row" + str(row))
-                if len(row) > 0:
-                    # Split the 'Stock Name' and 'Parameters' column
-                    try:
-                        stock_name, parameters = row[0].split('\xa0\xa0', maxsplit=1)
-                        #parameters = all_parameters.split('\n\n ', maxsplit=1)
-                    except ValueError:
-                        stock_name = row[0]
-                        parameters = ""
-                    # Split the 'LTP' column into Price, Change, and Percentage
-                    ltp_parts = row[1].split('\n')
-                    price = ltp_parts[0].strip()
-                    change, vol_change = ltp_parts[1].split('(')
-                    #percentage = percentage.strip(')%')
-                    vol_change = vol_change.strip(')%')
-                    # Determine Trade Type based on percentage
-                    trade_type = "SELL" if float(vol_change) < 0 else "BUY"
-                    if trade_type == "BUY":
-                        bullish_tags = parameters.strip()
-                        bearish_tags = ""
-                    else:
-                        bearish_tags = parameters.strip()
-                        bullish_tags = ""
-
-                    # Construct the modified row
-                    modified_row = [
-                        date_time,
-                        screener_date,
-                        "BEST_INTRADAY_STOCKS",
-                        strength,
-                        stock_name.strip(),
-                        stock_type,
-                        trade_type,
-                        price,
-                        vol_change,
-                        row[2],
-                        row[3],  # Deviation from Pivots
-                        row[4],  # TODAYS RANGE
-                        row[5],
-                        screener_run_id,
-                        f"{run_time_str}-RUN",  # run_history (first time)
-                        1,  # signal_count starts at 1 for new entries
-                        f"{run_time_str}-BEST_{strength}",
-                        screener_rank,
-                        bullish_tags,
-                        bearish_tags
-
-
-                    ]
-                    data.append(modified_row)
-                    screener_rank += 1
-                    #logger.info(f"Appending completed")
-
-            # Delete the file after processing
-        logger.info(f"Reading completed")
+            data = parse_alerts_csv(file, stock_type, strength, date_time, logger)
+
+        # Delete the file after processing
         logger.info(f"Deleting {csv_file}..")
         os.remove(csv_file)
-
     except FileNotFoundError:
         logger.error(f"Error: File not found at {file_name}")
-    except Exception as e:
-        logger.error(f"An error occurred: {e}")
+        return []
 
     return data
 
 
-def get_intraday_screener_bwis(logger):
-    #delete_bwis_screener_records_from_db(logger)
-    logger.info("Starting best intraday screeners script.")
-    ist_zone = pytz.timezone("Asia/Kolkata")
-    time_now = datetime.now()
-    ist_now = time_now.astimezone(ist_zone)
-    date_time = ist_now.strftime("%Y-%m-%d %H:%M:%S")
-    user_data_dir = tempfile.mkdtemp(prefix="chrome-ud-bwis")
+def stream_alerts_to_db(file, stock_type, strength, date_time, logger, chunk_size=500):
+    """
+    Parse an alerts export from any text file object and insert it chunk by chunk while it is
+    being read, without building the full row list. Returns the number of rows inserted.
+    """
+    return write_to_db(iter_alerts_csv(file, stock_type, strength, date_time, logger), logger, chunk_size)
+
 
+def stream_csv_to_db(download_dir, file_name, stock_type, strength, date_time, logger, chunk_size=500):
+    """
+    Parse the downloaded export and insert it chunk by chunk while it is being read,
+    then delete the file. Returns the number of rows inserted.
+    """
+    csv_file = os.path.join(download_dir, file_name)
+    logger.info(f"Streaming {csv_file} into DB..")
+    try:
+        with open(csv_file, mode='r', newline='', encoding='utf-8') as file:
+            inserted = stream_alerts_to_db(file, stock_type, strength, date_time, logger, chunk_size)
+        logger.info(f"Deleting {csv_file}..")
+        os.remove(csv_file)
+    except FileNotFoundError:
+        logger.error(f"Error: File not found at {file_name}")
+        return 0
+    return inserted
+
+
+# Point at a local fixture server to exercise the scraper offline
+INTRADAY_SCREENER_URL = os.getenv("INTRADAY_SCREENER_URL", "https://intradayscreener.com")
+
+# "csv" clicks the export button, "json" reads the alerts XHR the page already made
+INTRADAY_ALERTS_MODE = os.getenv("INTRADAY_ALERTS_MODE", "csv")
+# Regex for the URL path of the alerts feed; only XHR/fetch JSON responses from the screener's own host are considered
+INTRADAY_ALERTS_FEED_PATH = os.getenv("INTRADAY_ALERTS_FEED_PATH", r"/intra(day)?[-_]?alerts/?$")
+
+# Row column -> key in the JSON records of the alerts feed; override with INTRADAY_ALERTS_FEED_FIELDS
+ALERTS_FEED_FIELDS = {
+    "stock_name": "symbol",
+    "parameters": "parameters",
+    "price": "ltp",
+    "vol_change": "changePercent",
+    "alerts": "alert",
+    "deviation_from_pivots": "deviationFromPivots",
+    "todays_range": "todaysRange",
+    "level": "level",
+}
+ALERTS_FEED_FIELDS.update(json.loads(os.getenv("INTRADAY_ALERTS_FEED_FIELDS", "{}")))
+
+LOGIN_EMAIL_XPATH = '/html/body/app-root/div/app-login-layout/div/app-signin/div/div[1]/div/div[2]/div/div/div/div/div/div/form/div[1]/input'
+LOGIN_PASSWORD_XPATH = '/html/body/app-root/div/app-login-layout/div/app-signin/div/div[1]/div/div[2]/div/div/div/div/div/div/form/div[2]/div/input'
+LOGIN_BUTTON_XPATH = '/html/body/app-root/div/app-login-layout/div/app-signin/div/div[1]/div/div[2]/div/div/div/div/div/div/form/button'
+CHART_CLOSE_XPATH = '/html/body/app-root/div/app-home-layout/div[1]/app-nav-bar/div[2]/div/div/div[1]/button'
+SESSION_CLOSE_XPATH = '/html/body/app-root/div/app-home-layout/div[1]/app-nav-bar/div[1]/div[1]/button'
+INTRADAY_MENU_XPATH = '/html/body/app-root/div/app-home-layout/div[1]/app-nav-bar/div[1]/div[2]/nav/div/ul/li[2]'
+INTRA_ALERTS_LINK_XPATH = '/html/body/app-root/div/app-home-layout/div[1]/app-nav-bar/div[1]/div[2]/nav/div/ul/li[2]/div/a[5]'
+ALERTS_TABLE_ROWS_CSS = "table tbody tr"
+
+# Values of selenium's By.XPATH / By.CSS_SELECTOR; importing By loads all of selenium.webdriver
+BY_XPATH = "xpath"
+BY_CSS_SELECTOR = "css selector"
+EXPORT_CSV_XPATH = "//button[contains(text(), 'CSV')]"
+
+# Injected into every page before the app boots so network_idle can see in-flight XHR/fetch calls
+NETWORK_TRACKER_JS = """
+(function () {
+    if (window.__pendingRequests !== undefined) { return; }
+    window.__pendingRequests = 0;
+    var done = function () { window.__pendingRequests = Math.max(0, window.__pendingRequests - 1); };
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__pendingRequests++;
+        this.addEventListener('loadend', done);
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            window.__pendingRequests++;
+            return fetch.apply(this, arguments).finally(done);
+        };
+    }
+})();
+"""
+
+# Keeps Blob/data-URI downloads in the page instead of letting Chrome write them to disk
+DOWNLOAD_CAPTURE_JS = """
+(function () {
+    if (window.__captureDownloads !== undefined) { return; }
+    window.__captureDownloads = false;
+    window.__capturedDownloads = [];
+    var blobs = {};
+    var createObjectURL = URL.createObjectURL;
+    URL.createObjectURL = function (obj) {
+        var url = createObjectURL.apply(this, arguments);
+        if (obj instanceof Blob) { blobs[url] = obj; }
+        return url;
+    };
+    var revokeObjectURL = URL.revokeObjectURL;
+    URL.revokeObjectURL = function (url) {
+        delete blobs[url];
+        return revokeObjectURL.apply(this, arguments);
+    };
+    var capture = function (anchor) {
+        if (!window.__captureDownloads || !anchor.hasAttribute('download')) { return false; }
+        window.__capturedDownloads.push({name: anchor.download, href: anchor.href, blob: blobs[anchor.href] || null});
+        return true;
+    };
+    var click = HTMLAnchorElement.prototype.click;
+    HTMLAnchorElement.prototype.click = function () {
+        if (capture(this)) { return; }
+        return click.apply(this, arguments);
+    };
+    var dispatchEvent = HTMLAnchorElement.prototype.dispatchEvent;
+    HTMLAnchorElement.prototype.dispatchEvent = function (event) {
+        if (event.type === 'click' && capture(this)) { return false; }
+        return dispatchEvent.apply(this, arguments);
+    };
+})();
+"""
+
+READ_CAPTURED_DOWNLOAD_JS = """
+var done = arguments[arguments.length - 1];
+var item = window.__capturedDownloads.pop();
+window.__capturedDownloads = [];
+var blob = item.blob ? Promise.resolve(item.blob) : fetch(item.href).then(function (r) { return r.blob(); });
+blob.then(function (b) { return b.text(); })
+    .then(function (text) { done({name: item.name, text: text}); },
+          function (e) { done({name: item.name, error: String(e)}); });
+"""
+
+ANGULAR_STABLE_JS = """
+if (document.readyState !== 'complete') { return false; }
+if (!window.getAllAngularTestabilities) { return true; }
+return window.getAllAngularTestabilities().every(function (t) { return t.isStable(); });
+"""
+
+
+def angular_stable(driver):
+    """Document loaded and every Angular root reports no pending macrotasks."""
+    return driver.execute_script(ANGULAR_STABLE_JS)
+
+
+def network_idle(driver):
+    """No XHR/fetch requests in flight (needs NETWORK_TRACKER_JS injected)."""
+    return driver.execute_script("return (window.__pendingRequests || 0) === 0;")
+
+
+def page_settled(driver):
+    return angular_stable(driver) and network_idle(driver)
+
+
+def wait_for_settle(driver, label, logger, timings=None, timeout=3):
+    """
+    Best-effort page_settled wait. A live page may never report idle (polling XHRs, Angular
+    timers), so readiness is decided by concrete elements and a timeout here is only logged.
+    """
+    try:
+        wait_until(driver, page_settled, label, logger, timings, timeout=timeout)
+        return True
+    except TimeoutException:
+        logger.info(f"{label}: page still busy after {timeout}s, continuing")
+        return False
 
-    chromeOptions = webdriver.ChromeOptions()
 
-    # add preferred download path here
-    #prefs = {"download.default_directory" : r"C:\trad-fin\algo_platform_01_2025\algo_scripts\algotrade\scripts\trading_style\intraday\strategies\intraday_screener\bwis"}
-    logger.info("Getting Directory.")
-    cwd = os.getcwd()
-    download_dir= cwd
-    #download_dir = os.path.join(cwd, "bwis_downloads")
-    #os.makedirs(download_dir, exist_ok=True)
-    logger.info("Directory Fetched -> " + str(download_dir))
+def alerts_table_has_rows(driver):
+    return len(driver.find_elements(BY_CSS_SELECTOR, ALERTS_TABLE_ROWS_CSS)) > 0
 
-    prefs = {"download.default_directory": download_dir}
 
+def read_captured_download(driver, logger, timings=None, timeout=3, download_path=None):
+    """
+    Return the text of the download captured by DOWNLOAD_CAPTURE_JS, or None if the
+    page did not start a capturable download within timeout seconds.
+    Returns None as soon as Chrome starts writing download_path instead, so the file
+    fallback does not wait out the timeout.
+    """
+    def captured_or_on_disk(d):
+        if d.execute_script("return window.__capturedDownloads.length > 0;"):
+            return "captured"
+        if download_path and (os.path.exists(download_path) or os.path.exists(download_path + ".crdownload")):
+            return "on disk"
+        return False
 
-    chromeOptions.add_experimental_option("prefs",prefs)
-    # chromeOptions.add_argument("--headless=new")
-    # chromeOptions.add_argument("--no-sandbox")
-    # chromeOptions.add_argument("--disable-dev-shm-usage")
-    chromeOptions.add_argument(f"--user-data-dir={user_data_dir}")
-    driver = webdriver.Chrome(options=chromeOptions)
-    driver.set_window_size(1920, 1080)
-    driver.get("https://intradayscreener.com/opening-range-breakout")
-    logger.info("Starting best intraday screeners script.")
+    try:
+        outcome = wait_until(driver, captured_or_on_disk, "export captured", logger, timings, timeout=timeout)
+    except TimeoutException:
+        return None
+    finally:
+        driver.execute_script("window.__captureDownloads = false;")
+    if outcome == "on disk":
+        logger.info("Export went to the download directory")
+        return None
+
+    result = driver.execute_async_script(READ_CAPTURED_DOWNLOAD_JS)
+    if result.get("error"):
+        logger.error(f"❌ Could not read captured download {result['name']}: {result['error']}")
+        return None
+    logger.info(f"Captured {result['name']} in memory ({len(result['text'])} chars)")
+    return result["text"]
 
+
+def wait_until(driver, condition, label, logger, timings=None, timeout=30):
+    """
+    Wait for a readiness condition instead of sleeping a fixed time.
+    The time actually spent waiting is logged and stored in timings[label].
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    started = time.perf_counter()
     try:
-        # Step 1: Login
-        logger.info("Attempting login.")
+        return WebDriverWait(driver, timeout, poll_frequency=0.1).until(condition)
+    finally:
+        elapsed = time.perf_counter() - started
+        if timings is not None:
+            timings[label] = round(elapsed, 3)
+        logger.info(f"⏱️ {label}: {elapsed:.2f}s")
+
+
+class ScreenerSessionPoolTimeout(TimeoutException):
+    """No pooled browser session became free within the checkout timeout."""
+
+
+class ScreenerBrowserSession:
+    """A Chrome session owned by ScreenerSessionPool."""
+
+    def __init__(self, driver, user_data_dir, download_dir, owns_download_dir=False):
+        self.driver = driver
+        self.user_data_dir = user_data_dir
+        self.download_dir = download_dir
+        self.owns_download_dir = owns_download_dir
+        self.logged_in_at = None
+        self.closed = False
+
+    def is_alive(self):
+        if self.closed:
+            return False
+        try:
+            _ = self.driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def is_logged_in(self):
+        if self.logged_in_at is None:
+            return False
+        try:
+            if "/login" in self.driver.current_url:
+                return False
+            return len(self.driver.find_elements(BY_XPATH, LOGIN_EMAIL_XPATH)) == 0
+        except WebDriverException:
+            return False
+
+    def quit(self):
+        """Stop Chrome and remove its temporary directories; safe to call more than once."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.driver.quit()
+        except WebDriverException:
+            pass
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+        if self.owns_download_dir:
+            shutil.rmtree(self.download_dir, ignore_errors=True)
+
+
+class ScreenerSessionPool:
+    """
+    Keeps a small pool of logged-in intradayscreener.com Chrome sessions warm.
+    Sessions are health-checked on checkout and only log in again when the
+    browser died, the site logged us out or the session is older than session_ttl.
+    Without a download_dir every session gets its own temporary download directory,
+    so parallel jobs never race on the same export file name.
+    """
+
+    def __init__(self, logger, size=1, download_dir=None, session_ttl=6 * 60 * 60):
+        self.logger = logger
+        self.size = size
+        self.download_dir = download_dir
+        self.session_ttl = session_ttl
+        self.alerts_url = None
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._open_sessions = 0
+        self._checked_out = {}
+        self._closed = False
+
+    def warm_up(self):
+        """Start and log in every session of the pool up front."""
+        while True:
+            with self._lock:
+                if self._open_sessions >= self.size:
+                    return
+                self._open_sessions += 1
+            try:
+                browser = self._ensure_ready(self._start_browser())
+            except Exception:
+                self._discard()
+                raise
+            self._idle.put(browser)
+
+    @contextmanager
+    def session(self, timeout=300):
+        """Check out a ready, logged-in driver for the duration of one scrape job."""
+        browser = self._checkout(timeout)
+        try:
+            browser = self._ensure_ready(browser)
+        except Exception:
+            # _ensure_ready already quit every browser it gave up on; only the slot is left to free
+            self._discard()
+            raise
+        self._checked_out[browser.driver] = browser
+        try:
+            yield browser.driver
+        finally:
+            self._checked_out.pop(browser.driver, None)
+            self._release(browser)
+
+    def download_dir_for(self, driver):
+        return self._checked_out[driver].download_dir
+
+    def relogin(self, driver):
+        """Log a checked-out driver in again, e.g. after the site redirected to /login."""
+        self._login(self._checked_out[driver])
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            browser.quit()
+            self._discard()
+
+    def _checkout(self, timeout):
+        if self._closed:
+            raise RuntimeError("ScreenerSessionPool is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._open_sessions < self.size
+            if can_open:
+                self._open_sessions += 1
+        if can_open:
+            try:
+                return self._start_browser()
+            except Exception:
+                self._discard()
+                raise
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise ScreenerSessionPoolTimeout(
+                f"No browser session free after {timeout}s ({self.size} open, all checked out)"
+            ) from None
+
+    def _release(self, browser):
+        if self._closed or not browser.is_alive():
+            browser.quit()
+            self._discard()
+            return
+        self._idle.put(browser)
+
+    def _discard(self):
+        """Give back the pool slot of a session that has been quit."""
+        with self._lock:
+            self._open_sessions -= 1
+
+    def _ensure_ready(self, browser):
         """
-        login_link = WebDriverWait(driver, 30).until(
-            EC.element_to_be_clickable((By.XPATH, '/html/body/app-root/div[3]/app-home-layout/div[1]/app-nav-bar/div[1]/div[2]/nav/div/ul/li[11]/div/a'))
-        )
-        login_link.click()
+        Return a live, logged-in session, replacing browser if it died.
+        If starting or logging in fails, the browser in hand (including a fresh replacement)
+        is quit before the error is re-raised, so no Chrome process or temp dir is left behind.
         """
-        driver.get("https://intradayscreener.com/login")
+        try:
+            if not browser.is_alive():
+                self.logger.info("Pooled browser session died, starting a new one.")
+                browser.quit()
+                browser = self._start_browser()
+
+            expired = browser.logged_in_at is not None and time.time() - browser.logged_in_at > self.session_ttl
+            if expired or not browser.is_logged_in():
+                self._login(browser)
+            else:
+                self.logger.info("Reusing logged-in browser session.")
+        except Exception:
+            browser.quit()
+            raise
+        return browser
+
+    def _start_browser(self):
+        from selenium import webdriver
+        user_data_dir = tempfile.mkdtemp(prefix="chrome-ud-bwis")
+        download_dir = self.download_dir or tempfile.mkdtemp(prefix="bwis-downloads")
+        chromeOptions = webdriver.ChromeOptions()
+        prefs = {"download.default_directory": download_dir}
+        chromeOptions.add_experimental_option("prefs", prefs)
+        # chromeOptions.add_argument("--headless=new")
+        # chromeOptions.add_argument("--no-sandbox")
+        # chromeOptions.add_argument("--disable-dev-shm-usage")
+        chromeOptions.add_argument(f"--user-data-dir={user_data_dir}")
+        # Network events are needed by capture_alerts_feed in json mode
+        chromeOptions.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        try:
+            driver = webdriver.Chrome(options=chromeOptions)
+        except Exception:
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            if not self.download_dir:
+                shutil.rmtree(download_dir, ignore_errors=True)
+            raise
+        browser = ScreenerBrowserSession(driver, user_data_dir, download_dir, owns_download_dir=not self.download_dir)
+        try:
+            driver.set_window_size(1920, 1080)
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_TRACKER_JS})
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": DOWNLOAD_CAPTURE_JS})
+        except Exception:
+            browser.quit()
+            raise
+        return browser
+
+    def _login(self, browser):
+        from selenium.webdriver.support import expected_conditions as EC
+        driver = browser.driver
+        self.logger.info("Attempting login.")
+        driver.get(f"{INTRADAY_SCREENER_URL}/login")
         # Fill email and password
-        email_field = WebDriverWait(driver, 30).until(
-            EC.visibility_of_element_located((By.XPATH, '/html/body/app-root/div/app-login-layout/div/app-signin/div/div[1]/div/div[2]/div/div/div/div/div/div/form/div[1]/input'))
+        email_field = wait_until(
+            driver, EC.visibility_of_element_located((BY_XPATH, LOGIN_EMAIL_XPATH)), "login form", self.logger
         )
-        email_field.send_keys(INTRADAY_SCREENER_EMAIL)  # Replace with your actual email
-
-        password_field = driver.find_element(By.XPATH, '/html/body/app-root/div/app-login-layout/div/app-signin/div/div[1]/div/div[2]/div/div/div/div/div/div/form/div[2]/div/input')
-        password_field.send_keys(INTRADAY_SCREENER_PWD)  # Replace with your actual password
-
-        login_button = driver.find_element(By.XPATH, '/html/body/app-root/div/app-login-layout/div/app-signin/div/div[1]/div/div[2]/div/div/div/div/div/div/form/button')
+        email_field.send_keys(INTRADAY_SCREENER_EMAIL)
+        password_field = driver.find_element(BY_XPATH, LOGIN_PASSWORD_XPATH)
+        password_field.send_keys(INTRADAY_SCREENER_PWD)
+        login_button = driver.find_element(BY_XPATH, LOGIN_BUTTON_XPATH)
         login_button.click()
-        logger.info("Login successful.")
-        # Wait for a few seconds to allow the login process to complete
-        WebDriverWait(driver, 10)
-
-        # Step 2: Use JavaScript to click 'F&O' after login
-        # Click on the "F&O" label
-        time.sleep(8)
-
-        chart_close_button = WebDriverWait(driver, 20).until(
-            EC.element_to_be_clickable((By.XPATH, '/html/body/app-root/div/app-home-layout/div[1]/app-nav-bar/div[2]/div/div/div[1]/button'))
+        wait_until(driver, lambda d: "/login" not in d.current_url, "login redirect", self.logger)
+        wait_until(
+            driver, EC.presence_of_element_located((BY_XPATH, INTRADAY_MENU_XPATH)), "home page nav", self.logger
         )
-        chart_close_button.click()
-        time.sleep(5)
 
-        session_close_button = WebDriverWait(driver, 20).until(
-            EC.element_to_be_clickable((By.XPATH, '/html/body/app-root/div/app-home-layout/div[1]/app-nav-bar/div[1]/div[1]/button'))
-        )
-        session_close_button.click()
-        time.sleep(5)
+        dismiss_popups(driver, self.logger, timeout=20)
+        browser.logged_in_at = time.time()
+        self.logger.info("Login successful.")
 
-        logger.info("Windows Closed.")
 
+def dismiss_popups(driver, logger, timeout, timings=None):
+    """Close the chart and session popups if they show up within timeout seconds."""
+    from selenium.webdriver.support import expected_conditions as EC
+    for name, xpath in (("chart popup", CHART_CLOSE_XPATH), ("session popup", SESSION_CLOSE_XPATH)):
+        try:
+            close_button = wait_until(
+                driver, EC.element_to_be_clickable((BY_XPATH, xpath)), name, logger, timings, timeout=timeout
+            )
+            close_button.click()
+            wait_until(driver, EC.invisibility_of_element_located((BY_XPATH, xpath)), f"{name} closed", logger, timings)
+        except TimeoutException:
+            logger.info(f"No {name} to close")
+    logger.info("Windows Closed.")
+
+
+def open_intraday_alerts(driver, pool, logger, timings=None):
+    """Bring the pooled driver to the Intraday Alerts page, logging in again if the site asks."""
+    from selenium.webdriver.support import expected_conditions as EC
+    if pool.alerts_url:
+        driver.get(pool.alerts_url)
+        if "/login" in driver.current_url:
+            logger.info("Session expired, logging in again.")
+            pool.relogin(driver)
+            driver.get(pool.alerts_url)
+        wait_until(driver, alerts_table_has_rows, "alerts table rows", logger, timings)
+        dismiss_popups(driver, logger, timeout=1, timings=timings)
+    else:
         # Step 3: Expand 'Intraday' menu
-
         logger.info("Expanding Intraday menu.")
-        intraday_menu = WebDriverWait(driver, 30).until(
-            EC.element_to_be_clickable((By.XPATH, '/html/body/app-root/div/app-home-layout/div[1]/app-nav-bar/div[1]/div[2]/nav/div/ul/li[2]'))
+        intraday_menu = wait_until(
+            driver, EC.element_to_be_clickable((BY_XPATH, INTRADAY_MENU_XPATH)), "intraday menu", logger, timings
         )
         intraday_menu.click()
-        time.sleep(2)
 
-
-        intra_alerts_link = WebDriverWait(driver, 30).until(
-            EC.element_to_be_clickable((By.XPATH, '/html/body/app-root/div/app-home-layout/div[1]/app-nav-bar/div[1]/div[2]/nav/div/ul/li[2]/div/a[5]'))
+        intra_alerts_link = wait_until(
+            driver, EC.element_to_be_clickable((BY_XPATH, INTRA_ALERTS_LINK_XPATH)), "alerts link", logger, timings
         )
         intra_alerts_link.click()
         logger.info("Intra Alerts Link clicked.")
-        time.sleep(8)
-        export_tag = "//button[contains(text(), 'CSV')]"
+        wait_until(driver, alerts_table_has_rows, "alerts table rows", logger, timings)
+        pool.alerts_url = driver.current_url
 
-        """
+    # Give late XHRs a moment to finish refreshing the table before it is exported or its feed is read
+    wait_for_settle(driver, "alerts page settled", logger, timings)
 
-        tabs = [
-            ('/html/body/app-root/div/app-home-layout/div[2]/app-ohlc-scanner/div[1]/div[3]/div[1]/div[2]/button[1]', "INTRADAY_ALERTS", "All Intrady Alerts.csv"),
-        ]
 
-        stock_types = [
-            (f"{fno_label}", "FNO")
-            # ("/html/body/app-root/div[3]/app-home-layout/div[1]/app-index-panel/div/div[2]/span/div/label[2]", "CASH")
-        ]
+def drain_performance_log(driver):
+    """Read and drop the buffered network events of the pooled driver."""
+    try:
+        return driver.get_log("performance")
+    except WebDriverException:
+        return []
 
-        data = [[
-            "screener_run_time","screener_date","screener_type", "screener", "stock_name", "stock_type", "trade_type", "LTP", "percent_change",
-            "vol_change", "deviation_from_pivots", "todays_range","Run_History", "signal_count", "Tags","Bullish_Tags", "Bearish_Tags"
 
-        ]]
+def is_alerts_feed(response, resource_type, feed_path=INTRADAY_ALERTS_FEED_PATH):
+    """
+    True for the alerts feed itself: an XHR/fetch JSON response served by the screener site
+    (or one of its subdomains) whose URL path matches feed_path. Other JSON calls whose URL merely
+    mentions "alert" (settings, notifications, third-party widgets) do not match.
+    """
+    url = urlsplit(response.get("url", ""))
+    host = url.hostname or ""
+    site = (urlsplit(INTRADAY_SCREENER_URL).hostname or "").removeprefix("www.")
+    return (
+        resource_type in ("XHR", "Fetch")
+        and "json" in response.get("mimeType", "")
+        and (host == site or host.endswith("." + site))
+        and re.search(feed_path, url.path, re.IGNORECASE) is not None
+    )
+
+
+def capture_alerts_feed(driver, logger, feed_path=INTRADAY_ALERTS_FEED_PATH):
+    """
+    Return the decoded body of the most recent alerts feed response (see is_alerts_feed),
+    taken from the browser's network log. Returns None if the page made no such request.
+    """
+    request_ids = []
+    for entry in drain_performance_log(driver):
+        message = json.loads(entry["message"])["message"]
+        if message.get("method") != "Network.responseReceived":
+            continue
+        params = message["params"]
+        if is_alerts_feed(params["response"], params.get("type"), feed_path):
+            request_ids.append((params["requestId"], params["response"]["url"]))
+
+    for request_id, url in reversed(request_ids):
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except WebDriverException:
+            logger.info(f"Response body no longer available for {url}")
+            continue
+        text = base64.b64decode(body["body"]).decode("utf-8") if body.get("base64Encoded") else body["body"]
+        logger.info(f"Captured alerts feed from {url}")
+        return json.loads(text)
+    return None
 
-        for stock_type_xpath, stock_type in stock_types:
 
-            stock_type_option = WebDriverWait(driver, 30).until(
-                EC.element_to_be_clickable((By.XPATH, stock_type_xpath))
-            )
-            stock_type_option.click()
-            time.sleep(5)
+def feed_text(value):
+    """Text cell of a feed record as the CSV export writes it: numbers as text, missing as ""."""
+    return "" if value is None else str(value)
 
-            for xpath, strength, file_name in tabs:
-                logger.info(f"Extracting {stock_type}:{strength}")
-                tab = WebDriverWait(driver, 30).until(
-                    EC.element_to_be_clickable((By.XPATH, xpath))
-                )
 
-                tab.click()
-                time.sleep(2)
-                """
-        export = WebDriverWait(driver, 30).until(
-                    EC.element_to_be_clickable((By.XPATH, export_tag))
+def json_alerts_to_rows(payload, stock_type, strength, date_time, logger):
+    """
+    Build write_to_db rows straight from the alerts feed, mapping keys through ALERTS_FEED_FIELDS.
+    Text cells are converted like the CSV export's, so both modes write the same values.
+    """
+    records = payload
+    if isinstance(payload, dict):
+        # Unwrap {"data": [...]}-style envelopes
+        records = next((value for value in payload.values() if isinstance(value, list)), [])
+
+    run_context = alert_run_context(stock_type, strength, date_time)
+    fields = ALERTS_FEED_FIELDS
+    data = []
+    for record in records:
+        try:
+            data.append(build_alert_row(
+                run_context,
+                str(record[fields["stock_name"]]),
+                feed_text(record.get(fields["parameters"])),
+                record[fields["price"]],
+                record[fields["vol_change"]],
+                feed_text(record.get(fields["alerts"])),
+                feed_text(record.get(fields["deviation_from_pivots"])),
+                feed_text(record.get(fields["todays_range"])),
+                record.get(fields["level"]),
+                len(data) + 1,
+            ))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"❌ Skipping malformed feed record {record}: {e}")
+    return data
+
+
+def get_intraday_screener_bwis(logger, pool=None, mode=None):
+    #delete_bwis_screener_records_from_db(logger)
+    from selenium.webdriver.support import expected_conditions as EC
+    logger.info("Starting best intraday screeners script.")
+    ist_zone = pytz.timezone("Asia/Kolkata")
+    time_now = datetime.now()
+    ist_now = time_now.astimezone(ist_zone)
+    date_time = ist_now.strftime("%Y-%m-%d %H:%M:%S")
+
+    # One-off runs get a throw-away pool; run_bwis_service keeps one warm across runs
+    own_pool = pool is None
+    if own_pool:
+        pool = ScreenerSessionPool(logger, size=1)
+
+    mode = mode or INTRADAY_ALERTS_MODE
+    stock_type = "Intraday Alerts"
+    strength = "Intraday"
+    timings = {}
+    run_started = time.perf_counter()
+    try:
+        with pool.session() as driver:
+            drain_performance_log(driver)
+            open_intraday_alerts(driver, pool, logger, timings)
+
+            if mode == "json":
+                payload = capture_alerts_feed(driver, logger)
+                rows = json_alerts_to_rows(payload, stock_type, strength, date_time, logger) if payload is not None else []
+                if rows:
+                    write_to_db(rows, logger)
+                    return
+                if payload is None:
+                    logger.warning("No alerts feed response captured, falling back to CSV export.")
+                else:
+                    # An empty or reshaped feed (e.g. renamed keys) must not silently skip the run
+                    logger.warning("Alerts feed gave no usable rows, falling back to CSV export.")
+
+            """
+
+            tabs = [
+                ('/html/body/app-root/div/app-home-layout/div[2]/app-ohlc-scanner/div[1]/div[3]/div[1]/div[2]/button[1]', "INTRADAY_ALERTS", "All Intrady Alerts.csv"),
+            ]
+
+            stock_types = [
+                (f"{fno_label}", "FNO")
+                # ("/html/body/app-root/div[3]/app-home-layout/div[1]/app-index-panel/div/div[2]/span/div/label[2]", "CASH")
+            ]
+
+            data = [[
+                "screener_run_time","screener_date","screener_type", "screener", "stock_name", "stock_type", "trade_type", "LTP", "percent_change",
+                "vol_change", "deviation_from_pivots", "todays_range","Run_History", "signal_count", "Tags","Bullish_Tags", "Bearish_Tags"
+
+            ]]
+
+            for stock_type_xpath, stock_type in stock_types:
+
+                stock_type_option = WebDriverWait(driver, 30).until(
+                    EC.element_to_be_clickable((By.XPATH, stock_type_xpath))
                 )
-        export.click()
-        logger.info(f"Export clicked")
-        time.sleep(10)
-        file_name = "All Intrady Alerts.csv"
-        stock_type = "Intraday Alerts"
-        strength = "Intraday"
-        logger.info(f"Waiting for File" + str(file_name))
-        wait_for_file(download_dir, file_name,logger)
-        logger.info(f"File written")
-
-        each_data = read_csv_and_delete(download_dir,file_name, stock_type=stock_type, strength=strength, date_time = date_time,logger=logger)
-                #data += each_data
-                #write_to_csv(data)
-        write_to_db(each_data,logger)
+                stock_type_option.click()
+                time.sleep(5)
+
+                for xpath, strength, file_name in tabs:
+                    logger.info(f"Extracting {stock_type}:{strength}")
+                    tab = WebDriverWait(driver, 30).until(
+                        EC.element_to_be_clickable((By.XPATH, xpath))
+                    )
+
+                    tab.click()
+                    time.sleep(2)
+                    """
+            export = wait_until(
+                driver, EC.element_to_be_clickable((BY_XPATH, EXPORT_CSV_XPATH)), "export enabled", logger, timings
+            )
+            driver.execute_script("window.__capturedDownloads = []; window.__captureDownloads = true;")
+            export.click()
+            logger.info(f"Export clicked")
+            download_dir = pool.download_dir_for(driver)
+            file_name = "All Intrady Alerts.csv"
+            csv_text = read_captured_download(
+                driver, logger, timings, download_path=os.path.join(download_dir, file_name)
+            )
+
+            if csv_text is None:
+                # The page saved the export some other way; pick it up from this session's download dir
+                # (while the session is still checked out, so no other job downloads into it)
+                logger.info(f"Waiting for File" + str(file_name))
+                download_started = time.perf_counter()
+                wait_for_file(download_dir, file_name,logger)
+                timings["download"] = round(time.perf_counter() - download_started, 3)
+                logger.info(f"File written")
+                stream_csv_to_db(download_dir, file_name, stock_type=stock_type, strength=strength, date_time=date_time, logger=logger)
+                return
+
+        # Same incremental path as the downloaded file: rows are parsed, validated and written chunk by chunk
+        stream_alerts_to_db(
+            io.StringIO(csv_text, newline=""), stock_type=stock_type, strength=strength, date_time=date_time, logger=logger
+        )
 
     except TimeoutException:
         logging.error("An element failed to load in the expected time.")
 
     finally:
         #input("Press Enter to close the browser...")
+        logger.info(f"⏱️ Wait timings: {timings} (run total {time.perf_counter() - run_started:.2f}s)")
         run_completed_time = get_current_ist_time_as_str()
         print("Run Completed " + run_completed_time)
-        driver.quit()
-        shutil.rmtree(user_data_dir, ignore_errors=True)
+        if own_pool:
+            pool.close()
+
+
+def run_bwis_service(logger, interval=60, pool_size=1):
+    """
+    Long-running scraper: keeps the browser pool logged in and runs the
+    intraday alerts scrape every `interval` seconds.
+    """
+    pool = ScreenerSessionPool(logger, size=pool_size)
+    pool.warm_up()
+    logger.info(f"Scraper service started with {pool_size} warm session(s).")
+    try:
+        while True:
+            started = time.time()
+            try:
+                get_intraday_screener_bwis(logger, pool=pool)
+            except Exception as e:
+                logger.error(f"❌ Scrape run failed: {e}")
+            finally:
+                remove_session()  # ✅ hand the run's DB connection back to the pool
+            time.sleep(max(0, interval - (time.time() - started)))
+    except KeyboardInterrupt:
+        logger.info("Scraper service stopping.")
+    finally:
+        pool.close()
+
 
 def write_to_csv(data):
     """
@@ -293,174 +924,79 @@ def write_to_csv(data):
 def write_to_db_existing_check(scraped_data, logger):
     """
     Writes the extracted data to the database in a single batch.
-    Always inserts new records without checking for existing entries.
+    Rows that already exist for the day are merged into by bulk_upsert.
     Commits once after processing all records.
     """
     db_repo = SgIntradayScreenerSignalsRepository()
-    session = db_repo.session
     logger.info("▶️ Connecting to DB")
 
-    new_entries = []
-    for record in scraped_data:
-        try:
-            (
-                screener_run_time,
-                screener_date,
-                screener_type,
-                screener,
-                stock_name,
-                stock_type,
-                trade_type,
-                ltp,
-                vol_change,
-                alerts,
-                deviation_from_pivots,
-                todays_range,
-                level,
-                run_id,
-                run_history,
-                signal_count,
-                tags,
-                screener_rank,
-                bullish_milestone_tags,
-                bearish_milestone_tags,
-            ) = record
-
-            # Convert screener_date to date if it's a string
-            if isinstance(screener_date, str):
-                try:
-                    screener_date = datetime.strptime(screener_date, "%Y-%m-%d").date()
-                except ValueError:
-                    logger.error(f"❌ Invalid screener_date format: {screener_date} - Skipping entry.")
-                    continue
-
-            # Ensure numeric fields
-            ltp = float(ltp) if ltp is not None else None
-            #percent_change = float(percent_change) if percent_change is not None else None
-            vol_change = float(vol_change) if vol_change is not None else None
-            signal_count = int(signal_count) if signal_count is not None else 1
-
-            # Prepare new record for batch insert
-            new_entry = SgIntradayScreenerSignals(
-                screener_run_time=screener_run_time,
-                screener_date=screener_date,
-                screener_type=screener_type,
-                screener=screener,
-                stock_name=stock_name,
-                stock_type=stock_type,
-                trade_type=trade_type,
-                ltp=ltp,
-                vol_change=vol_change,
-                alerts=alerts,
-                deviation_from_pivots=deviation_from_pivots,
-                todays_range=todays_range,
-                level=level,
-                run_id=run_id,
-                run_history=run_history,
-                signal_count=signal_count,
-                tags=tags,
-                bullish_milestone_tags=bullish_milestone_tags,
-                bearish_milestone_tags=bearish_milestone_tags,
-                screener_rank = screener_rank
-            )
-            new_entries.append(new_entry)
-
-        except Exception as e:
-            logger.error(f"❌ Error processing record {record}: {e}")
-
-    try:
-        # Bulk insert all new records at once
-        session.bulk_save_objects(new_entries)
-        session.commit()
-        logger.info("✅ Batch insert completed successfully.")
-    except Exception as commit_error:
-        logger.error(f"❌ Error during batch insert: {commit_error}")
-        session.rollback()
+    records = list(normalise_alert_rows(scraped_data, logger))
+    if not records:
+        return
+    stats = db_repo.bulk_upsert(records, batch_size=len(records))
+    if stats[0]["ok"]:
+        logger.info("✅ Batch upsert completed successfully.")
+    else:
+        logger.error(f"❌ Error during batch upsert of {len(records)} records")
 
-def write_to_db(scraped_data, logger):
+def normalise_alert_rows(rows, logger):
     """
-    Writes the extracted data to the database in a single batch.
-    Always inserts all provided records without checking for existing entries.
+    Validate write_to_db rows lazily and yield them as SgIntradayScreenerSignals column dicts.
+    Rows that fail type conversion are logged and dropped.
     """
-    db_repo = SgIntradayScreenerSignalsRepository()
-    session = db_repo.session
-    screener_name = ""
-    logger.info("▶️ Connecting to DB for bulk insert")
-
-    if not scraped_data:
-        logger.info("No data to insert; exiting.")
-        return
-
-    new_entries = []
-    for record in scraped_data:
+    screener_dates = {}
+    run_times = {}
+    for record in rows:
         try:
-            (
-                screener_run_time,
-                screener_date,
-                screener_type,
-                screener,
-                stock_name,
-                stock_type,
-                trade_type,
-                ltp,
-                vol_change,
-                alerts,
-                deviation_from_pivots,
-                todays_range,
-                level,
-                run_id,
-                run_history,
-                signal_count,
-                tags,
-                screener_rank,
-                bullish_milestone_tags,
-                bearish_milestone_tags,
-            ) = record
+            if len(record) != len(ALERT_ROW_COLUMNS):
+                raise ValueError(f"expected {len(ALERT_ROW_COLUMNS)} columns, got {len(record)}")
+            values = dict(zip(ALERT_ROW_COLUMNS, record))
 
             # Normalize types
+            screener_date = values["screener_date"]
             if isinstance(screener_date, str):
-                screener_date = datetime.strptime(screener_date, "%Y-%m-%d").date()
-                screener_name = screener
-
-            ltp_val = float(ltp) if ltp is not None else None
+                if screener_date not in screener_dates:
+                    screener_dates[screener_date] = datetime.strptime(screener_date, "%Y-%m-%d").date()
+                values["screener_date"] = screener_dates[screener_date]
+            run_time = values["screener_run_time"]
+            if isinstance(run_time, str):
+                if run_time not in run_times:
+                    run_times[run_time] = datetime.strptime(run_time, "%Y-%m-%d %H:%M:%S")
+                values["screener_run_time"] = run_times[run_time]
+
+            values["ltp"] = float(values["ltp"]) if values["ltp"] is not None else None
             #pct_val = float(percent_change) if percent_change is not None else None
-            vol_val = float(vol_change) if vol_change is not None else None
-            sig_count = int(signal_count) if signal_count is not None else 1
-
-            new_entries.append(
-                SgIntradayScreenerSignals(
-                    screener_run_time=screener_run_time,
-                    screener_date=screener_date,
-                    screener_type=screener_type,
-                    screener=screener,
-                    stock_name=stock_name,
-                    stock_type=stock_type,
-                    trade_type=trade_type,
-                    ltp=ltp_val,
-                    alerts=alerts,
-                    vol_change=vol_val,
-                    deviation_from_pivots=deviation_from_pivots,
-                    todays_range=todays_range,
-                    level=level,
-                    run_id=run_id,
-                    run_history=run_history,
-                    signal_count=sig_count,
-                    tags=tags,
-                    bullish_milestone_tags=bullish_milestone_tags,
-                    bearish_milestone_tags=bearish_milestone_tags,
-                    screener_rank=screener_rank
-                )
-            )
+            values["vol_change"] = float(values["vol_change"]) if values["vol_change"] is not None else None
+            values["level"] = float(values["level"])
+            values["signal_count"] = int(values["signal_count"]) if values["signal_count"] is not None else 1
         except Exception as e:
             logger.error(f"❌ Error processing record {record}: {e}")
+            continue
+        yield values
 
-    try:
-        session.bulk_save_objects(new_entries)
-        session.commit()
-        logger.info(f"✅ Bulk insert completed: inserted {len(new_entries)} records for {screener_name}.")
-    except Exception as e:
-        logger.error(f"❌ Bulk insert failed: {e}")
-        session.rollback()
+
+def write_to_db(scraped_data, logger, chunk_size=500):
+    """
+    Writes the extracted rows (a list or any iterator). Stocks already seen today are merged
+    into their existing row (signal_count, ltp) by a native batch upsert, and every row is
+    recorded as a run event with its milestone tags.
+    Rows are validated as they stream in and written chunk_size per statement/transaction,
+    so memory stays flat, the first chunk is visible before the last row is parsed and a
+    failing chunk is rolled back on its own. Returns the number of rows written.
+    """
+    db_repo = SgIntradayScreenerSignalsRepository()
+    logger.info("▶️ Connecting to DB for bulk upsert")
+
+    stats = db_repo.bulk_upsert(normalise_alert_rows(scraped_data, logger), batch_size=chunk_size)
+    inserted = sum(batch["rows"] for batch in stats if batch["ok"])
+    failed = sum(batch["rows"] for batch in stats if not batch["ok"])
+
+    if not stats:
+        logger.info("No data to insert; exiting.")
+    else:
+        batch_times = ", ".join(f"{batch['rows']}/{batch['seconds'] * 1000:.0f}ms" for batch in stats)
+        logger.info(f"✅ Bulk upsert completed: wrote {inserted} records ({failed} failed) in batches [{batch_times}].")
+    return inserted
 
 
 
@@ -487,11 +1023,76 @@ def delete_bwis_screener_records_from_db(logger):
         logger.error(f"❌ Error committing changes to the database: {str(commit_error)}")
         db_repo.session.rollback()  # ✅ Rollback only this batch
 
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
 def wait_for_file(download_dir, file_name,logger, timeout=60, poll_interval=1):
     """
-    Wait until file_name appears in download_dir and (optionally) finishes writing.
+    Wait until file_name appears in download_dir and finishes writing.
+    Uses inotify to react to Chrome renaming the .crdownload into place and falls
+    back to polling where inotify is not available.
     Raises TimeoutException if not ready within timeout seconds.
     """
+    try:
+        return wait_for_file_inotify(download_dir, file_name, logger, timeout)
+    except OSError as e:
+        logger.info(f"inotify unavailable ({e}), polling for {file_name}")
+    return poll_for_file(download_dir, file_name, logger, timeout, poll_interval)
+
+
+def wait_for_file_inotify(download_dir, file_name, logger, timeout=60):
+    """
+    Block until file_name is moved into (or closed after writing in) download_dir.
+    Raises OSError if inotify cannot be set up, TimeoutException on timeout.
+    """
+    if not sys.platform.startswith("linux"):
+        raise OSError("inotify is Linux only")
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    target = os.path.join(download_dir, file_name)
+    try:
+        if libc.inotify_add_watch(fd, os.fsencode(download_dir), IN_MOVED_TO | IN_CLOSE_WRITE) < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {download_dir}")
+
+        # The download may have completed before the watch was in place
+        if os.path.exists(target) and not os.path.exists(target + ".crdownload"):
+            logger.info("File exists")
+            return
+
+        end_time = time.monotonic() + timeout
+        while True:
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(f"Timed out after {timeout}s waiting for {file_name} to appear")
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            buffer = os.read(fd, 64 * 1024)
+            offset = 0
+            while offset < len(buffer):
+                _, _, _, name_len = INOTIFY_EVENT.unpack_from(buffer, offset)
+                offset += INOTIFY_EVENT.size
+                name = buffer[offset:offset + name_len].rstrip(b"\0")
+                offset += name_len
+                if os.fsdecode(name) == file_name:
+                    logger.info("File written")
+                    return
+    finally:
+        os.close(fd)
+
+
+def poll_for_file(download_dir, file_name, logger, timeout=60, poll_interval=1):
+    """
+    Polling fallback for wait_for_file: wait for the file to appear, then for its size to settle.
+    """
     target = os.path.join(download_dir, file_name)
     logger.info(str(target))
     end_time = time.time() + timeout
@@ -522,7 +1123,10 @@ def wait_for_file(download_dir, file_name,logger, timeout=60, poll_interval=1):
 # Main loop to keep the scheduler running
 if __name__ == "__main__":
     logger = logging.getLogger("FallbackLogger")  # Initialize fallback logger
-    get_intraday_screener_bwis(logger)
+    if "--service" in sys.argv:
+        run_bwis_service(logger, interval=int(os.getenv("BWIS_SCRAPE_INTERVAL", "60")))
+    else:
+        get_intraday_screener_bwis(logger)
 
     # data = [[
     #     "screener_run_time","screener_date","screener_type", "screener", "stock_name", "Tags", "LTP", "price_change",
@@ -0,0 +1,53 @@
+"""
+Latency histogram used by the quote clients (market_data) and the DB pool metrics
+(session_provider).
+"""
+import bisect
+import threading
+from typing import Dict, Optional, Sequence
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (milliseconds) with approximate percentiles."""
+
+    BOUNDS_MS = (25, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000)
+
+    def __init__(self, bounds_ms: Sequence[float] = BOUNDS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the pct-th percentile, capped at the observed max."""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = pct / 100 * self.count
+            seen = 0
+            for i, n in enumerate(self.counts):
+                seen += n
+                if seen >= rank:
+                    return round(min(self.bounds_ms[i], self.max_ms) if i < len(self.bounds_ms) else self.max_ms, 1)
+            return round(self.max_ms, 1)
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": {f"<={b}": n for b, n in zip(self.bounds_ms + ("inf",), self.counts) if n},
+        }
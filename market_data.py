@@ -0,0 +1,578 @@
+"""
+Pluggable last-traded-price sources for the intraday decision loops.
+
+Every source keeps a LastPriceTable up to date and answers get_quotes(symbols) from it, in the
+row shape of quote_rows(): {"symbol", "ltp", "prev_close", "change_percent"}.
+
+- FyersStreamSource: Fyers data websocket (SymbolUpdate), optional REST fallback for symbols that
+  have not ticked yet, optional recording of every tick to a JSONL file.
+- RestQuoteSource:   fyers.quotes() on every get_quotes(), through ChunkedQuoteClient (symbol cap
+                     per request, concurrent chunks, token-bucket rate limits, retries of failed chunks)
+                     and the process-wide QuoteCache (per-symbol TTL, coalesced concurrent fetches).
+- ReplaySource:      replays a recorded JSONL tick file, for offline runs and tests.
+
+Symbols are Fyers symbols ("NSE:RELIANCE-EQ"); fyers_symbol() converts a bare stock name.
+
+get_quotes() only returns quotes younger than the source's `max_age` seconds (QUOTE_MAX_AGE,
+default 5s): a symbol whose fetch failed or that stopped ticking is left out of the result instead
+of being served with an old LTP, the same as a symbol that was never quoted. Ages are measured on
+the table's clock: wall (monotonic) time for live sources, the recording's time for ReplaySource.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from algo_scripts.algotrade.scripts.trade_utils.latency_histogram import LatencyHistogram
+
+# ✅ Fyers quotes API limits: 50 symbols per request, 10 requests/second, 200 requests/minute
+FYERS_QUOTES_SYMBOL_CAP = 50
+DEFAULT_QUOTE_MAX_AGE = 5.0
+FYERS_RATE_LIMITS = ((10, 10), (200 / 60, 200))  # (tokens per second, bucket size)
+
+
+def fyers_symbol(stock_name: str) -> str:
+    return stock_name if ":" in stock_name else f"NSE:{stock_name.upper()}-EQ"
+
+
+def quote_rows(response, logger) -> List[Dict]:
+    """Flatten a fyers.quotes() response into quote rows; malformed entries are skipped."""
+    if not response or "d" not in response:
+        logger.error("Failed to fetch LTP from all tokens.")
+        return []
+
+    rows = []
+    for stock in response["d"]:
+        try:
+            rows.append({
+                "symbol": stock["n"],
+                "ltp": stock["v"]["lp"],
+                "prev_close": stock["v"]["prev_close_price"],
+                "change_percent": stock["v"]["chp"],
+            })
+        except KeyError as ke:
+            logger.warning(f"Key missing in quote: {stock} - {ke}")
+    return rows
+
+
+class LastPriceTable:
+    """Thread-safe symbol -> latest quote row, with the `clock` time of the last update."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._rows: Dict[str, Dict] = {}
+        self._updated_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def update(self, symbol: str, ltp: float, prev_close: float = None, change_percent: float = None,
+               at: float = None):
+        """Store a quote; `at` is its time on the table's clock (default: now)."""
+        with self._lock:
+            row = self._rows.get(symbol)
+            if row is None:
+                row = self._rows[symbol] = {"symbol": symbol, "ltp": ltp, "prev_close": prev_close,
+                                            "change_percent": change_percent}
+            else:
+                row["ltp"] = ltp
+                if prev_close is not None:
+                    row["prev_close"] = prev_close
+                if change_percent is not None:
+                    row["change_percent"] = change_percent
+            self._updated_at[symbol] = self.clock() if at is None else at
+
+    def update_rows(self, rows: Iterable[Dict]):
+        for row in rows:
+            self.update(row["symbol"], row["ltp"], row.get("prev_close"), row.get("change_percent"))
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._rows.get(symbol)
+            return dict(row) if row else None
+
+    def snapshot(self, symbols: Iterable[str], max_age: float = None) -> List[Dict]:
+        """
+        Copies of the known rows for `symbols`, in the given order; unknown symbols, and with
+        `max_age` the rows not updated for more than max_age seconds, are left out.
+        """
+        with self._lock:
+            if max_age is None:
+                return [dict(self._rows[s]) for s in symbols if s in self._rows]
+            oldest = self.clock() - max_age
+            return [dict(self._rows[s]) for s in symbols if s in self._rows and self._updated_at[s] >= oldest]
+
+    def age(self, symbol: str) -> Optional[float]:
+        """Seconds since `symbol` last ticked, None if it never did."""
+        updated_at = self._updated_at.get(symbol)
+        return None if updated_at is None else self.clock() - updated_at
+
+    def stale(self, symbols: Iterable[str], max_age: float) -> List[str]:
+        """The `symbols` never updated or not updated for more than max_age seconds."""
+        oldest = self.clock() - max_age
+        with self._lock:
+            return [s for s in symbols if self._updated_at.get(s, oldest - 1) < oldest]
+
+    def __len__(self):
+        return len(self._rows)
+
+
+class MarketDataSource:
+    """Base class: subscription bookkeeping plus get_quotes() served from the price table."""
+
+    def __init__(self, logger=None, table: LastPriceTable = None, max_age: float = None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.table = table or LastPriceTable()
+        self.max_age = float(os.getenv("QUOTE_MAX_AGE", DEFAULT_QUOTE_MAX_AGE)) if max_age is None else max_age
+        self.symbols = set()
+        self.stale_quotes = 0
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def subscribe(self, symbols: Iterable[str]):
+        """Track `symbols`; returns the ones that were not subscribed before."""
+        new = [s for s in dict.fromkeys(symbols) if s not in self.symbols]
+        self.symbols.update(new)
+        return new
+
+    def unsubscribe(self, symbols: Iterable[str]):
+        gone = [s for s in symbols if s in self.symbols]
+        self.symbols.difference_update(gone)
+        return gone
+
+    def get_quotes(self, symbols: List[str]) -> List[Dict]:
+        return self.fresh_quotes(symbols)
+
+    def fresh_quotes(self, symbols: List[str]) -> List[Dict]:
+        """Table rows of `symbols` younger than max_age; the stale ones are counted and logged."""
+        rows = self.table.snapshot(symbols, self.max_age)
+        if len(rows) < len(symbols):
+            fresh = {row["symbol"] for row in rows}
+            stale = [s for s in symbols if s not in fresh and self.table.age(s) is not None]
+            if stale:
+                self.stale_quotes += len(stale)
+                self.logger.warning(f"⚠️ Skipping {len(stale)} quote(s) older than {self.max_age}s: {stale[:5]}")
+        return rows
+
+    def stats(self) -> Dict:
+        return {"symbols": len(self.symbols), "table": len(self.table), "stale_quotes": self.stale_quotes}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `capacity` saved up."""
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token if there is one; otherwise return how long to wait for the next."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            wait = self._reserve()
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+class ChunkedQuoteClient:
+    """
+    fyers.quotes() for any number of symbols: splits them into `chunk_size` requests, sends the
+    chunks concurrently behind the broker's rate limits, merges the rows and re-sends only the
+    chunks that failed (up to `retries` times, with linear backoff).
+    """
+
+    def __init__(self, fyers_client, logger=None, chunk_size: int = FYERS_QUOTES_SYMBOL_CAP, max_workers: int = 4,
+                 rate_limits: Sequence[Tuple[float, float]] = FYERS_RATE_LIMITS, retries: int = 2,
+                 backoff: float = 0.25):
+        self.fyers_client = fyers_client
+        self.logger = logger or logging.getLogger(__name__)
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.backoff = backoff
+        self.buckets = [TokenBucket(rate, capacity) for rate, capacity in rate_limits]
+        self.latency = LatencyHistogram()
+        self.counters = {"requests": 0, "failed_requests": 0, "retried_chunks": 0, "failed_symbols": 0}
+        self._counters_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="quotes")
+
+    def _count(self, name, n=1):
+        with self._counters_lock:
+            self.counters[name] += n
+
+    def _request(self, chunk: List[str]) -> Optional[List[Dict]]:
+        """One quotes call; None when the chunk failed and should be retried."""
+        for bucket in self.buckets:
+            bucket.acquire()
+        started = time.perf_counter()
+        try:
+            response = self.fyers_client.quotes({"symbols": ",".join(chunk)})
+        except Exception as e:
+            self.logger.warning(f"Quotes request for {len(chunk)} symbol(s) failed: {e}")
+            response = None
+        finally:
+            self.latency.record(time.perf_counter() - started)
+            self._count("requests")
+        if not response or response.get("s") != "ok":
+            if response:
+                self.logger.warning(f"Quotes request rejected: {response}")
+            self._count("failed_requests")
+            return None
+        return quote_rows(response, self.logger)
+
+    def fetch(self, symbols: Sequence[str]) -> Tuple[List[Dict], List[str]]:
+        """Return (rows, symbols of chunks that still failed after all retries)."""
+        symbols = list(dict.fromkeys(symbols))
+        pending = [symbols[i:i + self.chunk_size] for i in range(0, len(symbols), self.chunk_size)]
+        rows: List[Dict] = []
+        for attempt in range(self.retries + 1):
+            if not pending:
+                break
+            if attempt:
+                self._count("retried_chunks", len(pending))
+                time.sleep(self.backoff * attempt)
+            results = list(self._executor.map(self._request, pending))
+            failed = []
+            for chunk, chunk_rows in zip(pending, results):
+                if chunk_rows is None:
+                    failed.append(chunk)
+                else:
+                    rows.extend(chunk_rows)
+            pending = failed
+
+        failed_symbols = [s for chunk in pending for s in chunk]
+        if failed_symbols:
+            self._count("failed_symbols", len(failed_symbols))
+            self.logger.error(f"❌ No quotes for {len(failed_symbols)} symbol(s) after {self.retries} retries")
+        return rows, failed_symbols
+
+    def stats(self) -> Dict:
+        with self._counters_lock:
+            counters = dict(self.counters)
+        return {**counters, "latency": self.latency.summary()}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+class _PendingFetch:
+    __slots__ = ("done",)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class QuoteCache:
+    """
+    Quote rows shared by every strategy in the process, each fresh for `ttl` seconds.
+
+    Symbols that are fresh are served from memory; symbols another thread is already fetching are
+    waited for instead of requested again; only the rest go to the ChunkedQuoteClient, as one batch.
+    """
+
+    def __init__(self, client: ChunkedQuoteClient, ttl: float = 1.0, clock=time.monotonic):
+        self.client = client
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: Dict[str, Tuple[Dict, float]] = {}
+        self._inflight: Dict[str, _PendingFetch] = {}
+        self._lock = threading.Lock()
+        self.served_age = LatencyHistogram()
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0, "fetches": 0}
+
+    def fetch(self, symbols: Sequence[str], ttl: float = None) -> Tuple[List[Dict], List[str]]:
+        """
+        Return (rows in `symbols` order, symbols without a quote); rows are shared copies-on-read.
+        A symbol whose fetch failed counts as without a quote even if an expired entry is left.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        symbols = list(dict.fromkeys(symbols))
+        to_fetch, to_wait = [], []
+        with self._lock:
+            now = started = self._clock()
+            for symbol in symbols:
+                entry = self._entries.get(symbol)
+                if entry is not None and now - entry[1] <= ttl:
+                    self.counters["hits"] += 1
+                elif symbol in self._inflight:
+                    self.counters["coalesced"] += 1
+                    to_wait.append(self._inflight[symbol])
+                else:
+                    self.counters["misses"] += 1
+                    self._inflight[symbol] = _PendingFetch()
+                    to_fetch.append(symbol)
+
+        if to_fetch:
+            rows = []
+            try:
+                rows, _ = self.client.fetch(to_fetch)
+            finally:
+                fetched_at = self._clock()
+                with self._lock:
+                    self.counters["fetches"] += 1
+                    for row in rows:
+                        self._entries[row["symbol"]] = (row, fetched_at)
+                    for symbol in to_fetch:
+                        pending = self._inflight.pop(symbol, None)
+                        if pending is not None:
+                            pending.done.set()
+        for pending in to_wait:
+            pending.done.wait()
+
+        rows, missing = [], []
+        with self._lock:
+            now = self._clock()
+            for symbol in symbols:
+                entry = self._entries.get(symbol)
+                if entry is None or started - entry[1] > ttl:
+                    missing.append(symbol)
+                    continue
+                rows.append(dict(entry[0]))
+                self.served_age.record(now - entry[1])
+        return rows, missing
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self.counters)
+            now = self._clock()
+            ages = [now - fetched_at for _, fetched_at in self._entries.values()]
+        lookups = counters["hits"] + counters["misses"] + counters["coalesced"]
+        return {
+            **counters,
+            "hit_ratio": round((counters["hits"] + counters["coalesced"]) / lookups, 3) if lookups else 0.0,
+            "symbols": len(ages),
+            "oldest_entry_s": round(max(ages), 3) if ages else None,
+            "served_age": self.served_age.summary(),
+            "client": self.client.stats(),
+        }
+
+
+_shared_quote_caches: Dict[int, QuoteCache] = {}
+_shared_quote_caches_lock = threading.Lock()
+
+
+def shared_quote_cache(fyers_client, logger=None, ttl: float = None) -> QuoteCache:
+    """The process-wide QuoteCache for `fyers_client` (TTL from QUOTE_CACHE_TTL, default 1s)."""
+    with _shared_quote_caches_lock:
+        cache = _shared_quote_caches.get(id(fyers_client))
+        if cache is None:
+            ttl = float(os.getenv("QUOTE_CACHE_TTL", "1")) if ttl is None else ttl
+            cache = QuoteCache(ChunkedQuoteClient(fyers_client, logger), ttl=ttl)
+            _shared_quote_caches[id(fyers_client)] = cache
+        return cache
+
+
+class RestQuoteSource(MarketDataSource):
+    """Polling path: fyers.quotes() through the shared QuoteCache on every get_quotes() call."""
+
+    def __init__(self, fyers_client, logger=None, table: LastPriceTable = None, quote_cache: QuoteCache = None,
+                 max_age: float = None):
+        super().__init__(logger, table, max_age)
+        self.quote_cache = quote_cache or shared_quote_cache(fyers_client, self.logger)
+
+    def fetch(self, symbols: List[str]) -> List[Dict]:
+        if not symbols:
+            return []
+        rows, _ = self.quote_cache.fetch(symbols)
+        self.table.update_rows(rows)
+        return rows
+
+    def stats(self) -> Dict:
+        return {**super().stats(), "rest": self.quote_cache.stats()}
+
+    def get_quotes(self, symbols: List[str]) -> List[Dict]:
+        # ✅ only this call's quotes: a symbol whose fetch failed is left out, not served from the table
+        return self.fetch(symbols)
+
+
+class TickRecorder:
+    """Appends ticks as JSON lines ({"t": epoch seconds, "symbol", "ltp", ...}) for ReplaySource."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def record(self, symbol, ltp, prev_close=None, change_percent=None):
+        line = json.dumps({"t": time.time(), "symbol": symbol, "ltp": ltp,
+                           "prev_close": prev_close, "change_percent": change_percent})
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class FyersStreamSource(MarketDataSource):
+    """
+    Streams SymbolUpdate messages from the Fyers data websocket into the price table.
+    Symbols that have not ticked yet, or not within max_age, are served by `fallback` (usually a
+    RestQuoteSource).
+    """
+
+    def __init__(self, access_token: str, client_id: str, logger=None, table: LastPriceTable = None,
+                 fallback: MarketDataSource = None, record_path: str = None, max_age: float = None):
+        super().__init__(logger, table, max_age)
+        self.access_token = f"{client_id}:{access_token}"
+        self.fallback = fallback
+        if fallback is not None:
+            fallback.table = self.table
+        self.recorder = TickRecorder(record_path) if record_path else None
+        self._socket = None
+        self._connected = threading.Event()
+
+    def start(self):
+        from fyers_apiv3.FyersWebsocket import data_ws
+
+        self._socket = data_ws.FyersDataSocket(
+            access_token=self.access_token,
+            log_path="",
+            litemode=False,
+            write_to_file=False,
+            reconnect=True,
+            on_connect=self._on_connect,
+            on_close=self._on_close,
+            on_error=self._on_error,
+            on_message=self._on_message,
+        )
+        self._socket.connect()
+
+    def stop(self):
+        if self._socket is not None:
+            try:
+                self._socket.close_connection()
+            except Exception as e:
+                self.logger.warning(f"Closing market data socket failed: {e}")
+            self._socket = None
+        self._connected.clear()
+        if self.recorder:
+            self.recorder.close()
+
+    def subscribe(self, symbols: Iterable[str]):
+        new = super().subscribe(symbols)
+        if new and self._connected.is_set():
+            self._socket.subscribe(symbols=new, data_type="SymbolUpdate")
+        return new
+
+    def unsubscribe(self, symbols: Iterable[str]):
+        gone = super().unsubscribe(symbols)
+        if gone and self._connected.is_set():
+            self._socket.unsubscribe(symbols=gone, data_type="SymbolUpdate")
+        return gone
+
+    def get_quotes(self, symbols: List[str]) -> List[Dict]:
+        stale = self.table.stale(symbols, self.max_age)
+        if stale and self.fallback is not None:
+            self.fallback.fetch(stale)
+        return self.fresh_quotes(symbols)
+
+    def stats(self) -> Dict:
+        stats = {**super().stats(), "connected": self._connected.is_set()}
+        if self.fallback is not None:
+            stats["fallback"] = self.fallback.stats()
+        return stats
+
+    def _on_connect(self):
+        self._connected.set()
+        self.logger.info(f"✅ Market data stream connected, subscribing {len(self.symbols)} symbol(s)")
+        if self.symbols:
+            self._socket.subscribe(symbols=sorted(self.symbols), data_type="SymbolUpdate")
+
+    def _on_close(self, message):
+        self._connected.clear()
+        self.logger.warning(f"Market data stream closed: {message}")
+
+    def _on_error(self, message):
+        self.logger.error(f"❌ Market data stream error: {message}")
+
+    def _on_message(self, message):
+        symbol = message.get("symbol")
+        ltp = message.get("ltp")
+        if symbol is None or ltp is None:
+            return  # ✅ acks / control frames
+        prev_close, change_percent = message.get("prev_close_price"), message.get("chp")
+        self.table.update(symbol, ltp, prev_close, change_percent)
+        if self.recorder:
+            self.recorder.record(symbol, ltp, prev_close, change_percent)
+
+
+class ReplaySource(MarketDataSource):
+    """
+    Replays a TickRecorder file into the price table.
+    `speed` scales the recorded gaps (2.0 = twice as fast); 0 replays without sleeping.
+    Quote ages run on the recording's clock (the time of the last replayed tick), so max_age means
+    the same as live at any speed, and the last quotes stay usable once the file is exhausted.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, logger=None, table: LastPriceTable = None,
+                 max_age: float = None):
+        super().__init__(logger, table, max_age)
+        self.replay_now = 0.0  # ✅ recorded time of the last applied tick
+        self.table.clock = self.replay_time
+        self.path = path
+        self.speed = speed
+        self.finished = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def replay_time(self) -> float:
+        return self.replay_now
+
+    def ticks(self):
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+    def replay(self):
+        """Apply every tick in order (blocking), honouring the recorded timing."""
+        previous = None
+        for tick in self.ticks():
+            if self._stop.is_set():
+                break
+            if previous is not None and self.speed > 0:
+                self._stop.wait(max(0.0, (tick["t"] - previous) / self.speed))
+            previous = tick["t"]
+            self.replay_now = max(self.replay_now, tick["t"])
+            self.table.update(tick["symbol"], tick["ltp"], tick.get("prev_close"), tick.get("change_percent"),
+                              at=tick["t"])
+        if not self._stop.is_set():
+            self.logger.info(f"ℹ️ Replay of {self.path} finished; quotes stay at the last recorded ticks")
+        self.finished.set()
+
+    def start(self):
+        self._stop.clear()
+        self.finished.clear()
+        self._thread = threading.Thread(target=self.replay, name="ReplaySource", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
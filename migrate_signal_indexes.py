@@ -0,0 +1,254 @@
+"""
+Create the indexes declared on the signal models that are missing from the live database.
+
+Base.metadata.create_all() only creates tables that do not exist yet, so indexes added to
+an existing model never reach production on their own. Run this once after deploying:
+
+    python migrate_signal_indexes.py            # create missing indexes
+    python migrate_signal_indexes.py --dry-run  # only print the DDL
+
+Before a unique index is created its table must be free of duplicate keys. Intraday signals
+written before the upsert (one row per run) are merged into one row per key first; any other
+duplicates stop the migration with an error, since without the index MySQL's
+ON DUPLICATE KEY UPDATE silently falls back to plain inserts.
+
+Indexes a model no longer declares (OBSOLETE_INDEXES) are dropped once their replacement exists.
+"""
+import sys
+
+from sqlalchemy import delete, func, inspect, select, update
+from sqlalchemy.schema import CreateIndex
+
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.management.database_manager import (
+    Base,
+    engine,
+)
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_intraday_screener_signals import (
+    SgIntradayScreenerSignals,
+    SgIntradaySignalEvents,
+    SgIntradaySignalEventTags,
+    SgSignalTags,
+)
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_ohl_signals import SgOhlSignals
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.tradingview_signals import TVSignals
+
+SIGNAL_MODELS = (
+    SgIntradayScreenerSignals,
+    SgIntradaySignalEvents,
+    SgSignalTags,
+    SgIntradaySignalEventTags,
+    SgOhlSignals,
+    TVSignals,
+)
+
+# ✅ table -> index names it used to declare; intraday's unique_stock_entry (with the nullable
+#    stock_type) became uq_sg_intra_stock_entry
+OBSOLETE_INDEXES = {
+    SgIntradayScreenerSignals.__tablename__: ("unique_stock_entry",),
+}
+
+
+def missing_indexes(bind=engine):
+    """Yield every model index whose name is not present on the existing table."""
+    inspector = inspect(bind)
+    for model in SIGNAL_MODELS:
+        table = model.__table__
+        if not inspector.has_table(table.name):
+            continue  # create_all() builds the table together with its indexes
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name not in existing:
+                yield index
+
+
+MERGE_BATCH_SIZE = 500  # ✅ duplicate keys merged per transaction
+
+
+def duplicate_keys(conn, index, limit=None) -> list:
+    """Key tuples of `index` held by more than one row of its table."""
+    columns = [index.table.c[column.name] for column in index.columns]
+    statement = select(*columns).group_by(*columns).having(func.count() > 1)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return [tuple(row) for row in conn.execute(statement)]
+
+
+def duplicate_count(conn, index) -> tuple:
+    """(number of duplicate keys of `index`, number of rows holding them)."""
+    columns = [index.table.c[column.name] for column in index.columns]
+    groups = (
+        select(func.count().label("rows")).select_from(index.table)
+        .group_by(*columns).having(func.count() > 1).subquery()
+    )
+    keys, rows = conn.execute(select(func.count(), func.coalesce(func.sum(groups.c.rows), 0))).one()
+    return keys, rows
+
+
+def _merge_rows(rows) -> dict:
+    """Values of the first row after folding in the later runs, as upsert() merges a new run."""
+    first, latest = rows[0]._mapping, rows[-1]._mapping
+    merged = {"signal_count": sum(row._mapping["signal_count"] or 1 for row in rows)}
+    for column in ("ltp", "price_change"):
+        values = [row._mapping[column] for row in rows if row._mapping[column] is not None]
+        merged[column] = values[-1] if values else None
+    merged["run_id"] = latest["run_id"]
+    merged["is_processed"] = latest["is_processed"]
+    merged["updated_time"] = max((row._mapping["updated_time"] for row in rows if row._mapping["updated_time"]),
+                                 default=first["updated_time"])
+    for column in ("run_history", "tags"):
+        merged[column] = ", ".join(row._mapping[column] for row in rows if row._mapping[column]) or None
+    for column in ("bullish_milestone_tags", "bearish_milestone_tags"):
+        names = set()
+        for row in rows:
+            names.update((row._mapping[column] or "").split())
+        merged[column] = " ".join(sorted(names)) or None
+    return merged
+
+
+def _move_events(conn, kept_id: int, folded_ids: list):
+    """Point the run events of folded rows at the kept row; runs it already has are dropped."""
+    events = SgIntradaySignalEvents.__table__
+    kept_runs = set(conn.execute(select(events.c.run_time).where(events.c.signal_id == kept_id)).scalars())
+    duplicate_events = []
+    for event_id, run_time in conn.execute(
+        select(events.c.id, events.c.run_time).where(events.c.signal_id.in_(folded_ids)).order_by(events.c.id)
+    ):
+        if run_time in kept_runs:
+            duplicate_events.append(event_id)
+            continue
+        kept_runs.add(run_time)
+        conn.execute(update(events).where(events.c.id == event_id).values(signal_id=kept_id))
+    if duplicate_events:
+        event_tags = SgIntradaySignalEventTags.__table__
+        conn.execute(delete(event_tags).where(event_tags.c.event_id.in_(duplicate_events)))
+        conn.execute(delete(events).where(events.c.id.in_(duplicate_events)))
+
+
+def merge_intraday_duplicates(bind=engine, dry_run: bool = False) -> int:
+    """
+    Merge the intraday rows sharing a uq_sg_intra_stock_entry key into the first row (lowest id)
+    of the key: signal_count adds up, ltp / price_change / run_id come from the latest run,
+    run_history / tags are joined in run order, milestone tags are united.
+    Run events of the merged rows move to the kept row. Returns the number of rows removed.
+    """
+    table = SgIntradayScreenerSignals.__table__
+    index = next(index for index in table.indexes if index.name == "uq_sg_intra_stock_entry")
+    key_columns = [column.name for column in index.columns]
+    inspector = inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns(table.name)}
+    with_events = inspector.has_table(SgIntradaySignalEvents.__tablename__)
+    selected = [table.c[column.name] for column in table.columns if column.name in columns]
+
+    if dry_run:
+        with bind.connect() as conn:
+            keys, rows = duplicate_count(conn, index)
+        if keys:
+            print(f"ℹ️ {table.name}: would merge {rows} rows into {keys} keys")
+        return 0
+
+    removed = 0
+    while True:
+        with bind.begin() as conn:
+            keys = set(duplicate_keys(conn, index, MERGE_BATCH_SIZE))
+            if not keys:
+                break
+            groups = {}
+            for row in conn.execute(
+                select(*selected)
+                .where(table.c.screener_date.in_({key[key_columns.index("screener_date")] for key in keys}),
+                       table.c.stock_name.in_({key[key_columns.index("stock_name")] for key in keys}))
+                .order_by(table.c.id)
+            ):
+                key = tuple(row._mapping[column] for column in key_columns)
+                if key in keys:
+                    groups.setdefault(key, []).append(row)
+            for rows in groups.values():
+                kept_id, folded_ids = rows[0].id, [row.id for row in rows[1:]]
+                conn.execute(update(table).where(table.c.id == kept_id).values(_merge_rows(rows)))
+                if with_events:
+                    _move_events(conn, kept_id, folded_ids)
+                conn.execute(delete(table).where(table.c.id.in_(folded_ids)))
+                removed += len(folded_ids)
+        print(f"🔄 {table.name}: merged {removed} duplicate rows so far")
+    if removed:
+        print(f"✅ {table.name}: merged {removed} duplicate rows")
+    return removed
+
+
+def ready_for_unique(index, bind=engine, dry_run: bool = False) -> bool:
+    """Merge (intraday) or report the duplicate keys of a unique index about to be created."""
+    if index.table is SgIntradayScreenerSignals.__table__:
+        merge_intraday_duplicates(bind, dry_run)
+        if dry_run:
+            return True
+    with bind.connect() as conn:
+        keys, rows = duplicate_count(conn, index)
+    if not keys:
+        return True
+    if dry_run:
+        print(f"⚠️ {index.table.name}: {rows} rows share {keys} keys of {index.name}; the migration will stop here")
+        return True
+    print(f"❌ {index.table.name}: {rows} rows share {keys} keys of {index.name}; "
+          f"remove the duplicates and run the migration again")
+    return False
+
+
+def drop_obsolete_indexes(bind=engine, dry_run: bool = False) -> bool:
+    """Drop the OBSOLETE_INDEXES still present; returns False if any of them failed."""
+    inspector = inspect(bind)
+    ok = True
+    for table_name, names in OBSOLETE_INDEXES.items():
+        if not inspector.has_table(table_name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table_name)}
+        for name in names:
+            if name not in existing:
+                continue
+            if bind.dialect.name in ("mysql", "mariadb"):
+                ddl = f"DROP INDEX {name} ON {table_name}"
+            else:
+                ddl = f"DROP INDEX {name}"
+            if dry_run:
+                print(f"{ddl};")
+                continue
+            try:
+                print(f"▶️ {ddl}")
+                with bind.begin() as conn:
+                    conn.exec_driver_sql(ddl)
+                print(f"✅ Dropped {name} from {table_name}")
+            except Exception as e:
+                ok = False
+                print(f"❌ Failed to drop {name} from {table_name}: {e}")
+    return ok
+
+
+def migrate(bind=engine, dry_run: bool = False) -> bool:
+    """Create missing indexes one by one; returns False if any of them failed."""
+    Base.metadata.create_all(bind, tables=[model.__table__ for model in SIGNAL_MODELS])
+    ok = True
+    pending = list(missing_indexes(bind))
+    if not pending:
+        print("✅ All signal indexes are in place")
+        return drop_obsolete_indexes(bind, dry_run)
+
+    for index in pending:
+        if index.unique and not ready_for_unique(index, bind, dry_run):
+            return False
+        ddl = str(CreateIndex(index).compile(bind)).strip()
+        if dry_run:
+            print(f"{ddl};")
+            continue
+        try:
+            print(f"▶️ {ddl}")
+            index.create(bind=bind)
+            print(f"✅ Created {index.name} on {index.table.name}")
+        except Exception as e:
+            # ❌ leave the others going
+            ok = False
+            print(f"❌ Failed to create {index.name} on {index.table.name}: {e}")
+    # ✅ keep the old indexes until their replacements exist
+    return drop_obsolete_indexes(bind, dry_run) if ok else ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if migrate(dry_run="--dry-run" in sys.argv[1:]) else 1)
@@ -1,42 +1,38 @@
-from datetime import datetime
 import logging
 
-from sqlalchemy import false
-
 from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.market_context.index_snapshot import IndexSnapshotRepository
-from algo_scripts.algotrade.scripts.trade_utils.time_manager import get_today_date_as_str, get_current_ist_time_as_str
-from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_ohl_signals import SgOhlSignalsRepository, SgOhlSignals
+from algo_scripts.algotrade.scripts.trade_utils.time_manager import get_today_date_as_str
+from algo_scripts.algotrade.scripts.trade_utils.market_data import (
+    FyersStreamSource, MarketDataSource, ReplaySource, RestQuoteSource, fyers_symbol)
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_ohl_signals import SgOhlSignalsRepository
 from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.tradingview_signals import TVSignalsRepository
-from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.management.database_manager import (
-    Base, get_db_session)
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.management.session_provider import (
+    pool_metrics, release_session, remove_session)
 from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_intraday_screener_signals import SgIntradayScreenerSignalsRepository
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.signal_cache import SignalCache
 import json
 import os
+import sys
+import time
 from dotenv import load_dotenv
-from fyers_apiv3 import fyersModel
-from collections import Counter
 
 load_dotenv()
 
-fyers_token_primary = os.getenv('FYERS_ACCESS_TOKEN')
-fyers_client_id = os.getenv('FYERS_CLIENT_ID')
-fyers_token = fyersModel.FyersModel(
-    token=fyers_token_primary,
-    is_async=False,
-    client_id=fyers_client_id,
-    log_path="."
-)
+
+def create_fyers_client():
+    from fyers_apiv3 import fyersModel  # ✅ imported on first use: the SDK is slow to import
+    fyers_token_primary = os.getenv('FYERS_ACCESS_TOKEN')
+    fyers_client_id = os.getenv('FYERS_CLIENT_ID')
+    return fyersModel.FyersModel(
+        token=fyers_token_primary,
+        is_async=False,
+        client_id=fyers_client_id,
+        log_path="."
+    )
 #Get the latest data for ohl and intraday alerts stocks
 #get_ohl_stocks_intra_screener(logger)
 #get_intraday_screener_bwis(logger_two)
 #---------------------------------------------------------------------------
-intra_alerts_repo = SgIntradayScreenerSignalsRepository()
-tv_repo = TVSignalsRepository(get_db_session())
-index_repo = IndexSnapshotRepository()
-ohl_data = SgOhlSignalsRepository()
-index_data = index_repo.get_snapshot_by_date_and_index(get_today_date_as_str(), 2) #Change to get_today_date_as_str
-ohl_repo = SgOhlSignalsRepository()
-logger = logging.getLogger("IntradayScreenerOHLLogger")
 """
 import csv
 
@@ -61,87 +57,148 @@ print(tv_input_data)
 tv_signal_status = tv_repo.bulk_insert_trade_signals(tv_input_data)
 """
 
-def get_quotes(fyers_token, symbols, logger):
-    # Ensure NSE prefix
-    symbols_string = ",".join([f"NSE:{s.upper()}-EQ" for s in symbols])
-    data = {"symbols": symbols_string}
-    logger.info(f"Fetching quotes for: {symbols_string}")
-
-    try:
-        response = fyers_token.quotes(data)
-        print(response)
-        logger.info(f"Quotes response: {response}")
-
-        if response.get("s") == "ok":
-            return response
-        else:
-            return {"status": "Invalid Token", "reason": "Token is invalid or response malformed"}
-    except Exception as e:
-        logger.exception("Exception occurred while fetching quotes.")
-        return {"status": "Invalid Token", "reason": str(e)}
-
-def get_intra_stock_data(fyers_token, STOCK_SYMBOLS, logger):
-    response_data = None
 
-    response_data = get_quotes(fyers_token, STOCK_SYMBOLS, logger)
-
-
-    print(response_data)
-    if not response_data or "d" not in response_data:
-        logger.error("Failed to fetch LTP from all tokens.")
-        return []
-
-    stock_data = []
-    for stock in response_data["d"]:
+class OhlDecisionEngine:
+    """
+    Resident OHL decision loop.
+
+    The day context (index breadth and the OHL/TV/intraday-level lookups behind SignalCache) is
+    loaded once per trading day; every tick reads the candidates' LTPs from `market_data` and
+    compares them against the cached levels. A candidate's decision is emitted when it starts
+    qualifying, through `on_decision(decision)` and/or `decision_queue.put(decision)`.
+    """
+
+    def __init__(self, fyers_token, logger, on_decision=None, decision_queue=None, tick_interval=1.0,
+                 signal_cache=None, index_repo=None, market_data: MarketDataSource = None):
+        self.fyers_token = fyers_token
+        self.logger = logger
+        self.market_data = market_data or RestQuoteSource(fyers_token, logger)
+        self.on_decision = on_decision
+        self.decision_queue = decision_queue
+        self.tick_interval = tick_interval
+        if signal_cache is None:
+            signal_cache = SignalCache(SgOhlSignalsRepository(), SgIntradayScreenerSignalsRepository(),
+                                       TVSignalsRepository())
+        self.signal_cache = signal_cache
+        self.index_repo = index_repo or IndexSnapshotRepository()
+        self.day = None
+        self.bullish = None
+        self._active = set()
+
+    def load_day_context(self, day=None):
+        """Fetch the static context of the trading day; returns False while it is not available yet."""
+        day = day or get_today_date_as_str()
+        index_data = self.index_repo.get_snapshot_by_date_and_index(day, 2)
+        if not index_data:
+            self.logger.warning(f"No index snapshot for {day} yet, retrying next tick.")
+            return False
+        self.day = day
+        self.bullish = "BULLISH" in str(index_data[0].breadth_trend)
+        self._active = set()
+        self.logger.info(f"▶️ OHL engine day context loaded: {day} ({'BULLISH' if self.bullish else 'BEARISH'} breadth)")
+        return True
+
+    def get_candidates(self):
+        """OHL stocks of the breadth direction with a PRB milestone and a TradingView signal today."""
+        side = "Low" if self.bullish else "High"
+        # ✅ both branches have always matched PRB against the bearish milestone tags
+        ohl_data_filtered = self.signal_cache.ohl_candidates(self.day, side, "PRB", direction="bearish")
+        tv_tickers = self.signal_cache.tv_tickers(self.day, ohl_data_filtered)
+        return [s for s in ohl_data_filtered if s in tv_tickers]
+
+    def get_intra_levels(self, symbols: list):
+        """{symbol: level} for the day's intraday alerts ("NSE:XYZ-EQ" -> "XYZ")."""
+        names = {symbol: symbol[4:-3].strip().upper() for symbol in symbols}
+        levels = self.signal_cache.intra_levels(self.day, names.values())
+        return {symbol: levels[name] for symbol, name in names.items() if name in levels}
+
+    def evaluate(self):
+        """Return the decisions that hold right now for the day's candidates."""
+        candidates = self.get_candidates()
+        if not candidates:
+            return []
+        symbols = [fyers_symbol(s) for s in candidates]
+        self.market_data.subscribe(symbols)
+        quotes = self.market_data.get_quotes(symbols)
+        intra_levels = self.get_intra_levels([z["symbol"] for z in quotes])
+        if self.bullish:
+            return [{"symbol":z["symbol"],"to_buy":False,"to_sell":True} for z in quotes if z["symbol"] in intra_levels and z["ltp"]>intra_levels[z["symbol"]]]
+        return [{"symbol":z["symbol"],"to_buy":False,"to_sell":True} for z in quotes if z["symbol"] in intra_levels and z["ltp"]<intra_levels[z["symbol"]]]
+
+    def tick(self):
+        """Run one evaluation; emits and returns the decisions that are new since the last tick."""
+        today = get_today_date_as_str()
+        try:
+            if self.day != today and not self.load_day_context(today):
+                return []
+            decisions = self.evaluate()
+        finally:
+            # ✅ end the tick's read transaction: a reload after SignalCache sees a new day version
+            #    reads a fresh snapshot (not the one the first read of the process opened), and the
+            #    pooled connection is returned between ticks
+            release_session()
+        current = {d["symbol"] for d in decisions}
+        new_decisions = [d for d in decisions if d["symbol"] not in self._active]
+        self._active = current
+        for decision in new_decisions:
+            self.emit(decision)
+        return new_decisions
+
+    def emit(self, decision):
+        if self.on_decision is not None:
+            self.on_decision(decision)
+        if self.decision_queue is not None:
+            self.decision_queue.put(decision)
+        if self.on_decision is None and self.decision_queue is None:
+            self.logger.info(f"Decision: {json.dumps(decision)}")
+
+    def run(self, stop_event=None, max_ticks=None):
+        """Tick every `tick_interval` seconds until `stop_event` is set, `max_ticks` ran or Ctrl+C."""
+        ticks = 0
+        self.market_data.start()
         try:
-            symbol = stock["n"]
-            last_price = stock["v"]["lp"]
-            prev_close = stock["v"]["prev_close_price"]
-            change_percent = stock["v"]["chp"]
-
-            logger.info(json.dumps({
-                "symbol": symbol, "ltp": last_price,
-                "prev_close": prev_close, "change_percent": change_percent
-            }))
-
-            stock_data.append({
-                "symbol": symbol,
-                "ltp": last_price,
-                "prev_close": prev_close,
-                "change_percent": change_percent
-            })
-        except KeyError as ke:
-            logger.warning(f"Key missing in ETF quote: {stock} - {ke}")
-    return stock_data
-
-
-
-if "BULLISH" in str(index_data[0].breadth_trend):
-    ohl_data = ohl_repo.get_by_screener_date_and_screener(get_today_date_as_str())
-    ohl_data_filtered_high = [x[4] for x in ohl_data if "Low" in x[3] and "PRB" in x[-1]]
-    ohl_data_dict = tv_repo.check_stocks_by_date_and_screener(ohl_data_filtered_high, get_today_date_as_str())
-    ltp_bullish = get_intra_stock_data(fyers_token, [i[0][0] for i in ohl_data_dict], logger)
-    def get_intra_get_level(stock_name:str):
-        intra_get_level = intra_alerts_repo.fetch_signals_by_date_stock_and_screeners(get_today_date_as_str(), stock_name[4:-3])
-        if len(intra_get_level)!=0:
-            return intra_get_level[0].level
-        else:
-            return -1
-    ltp_bullish =[{"symbol":z["symbol"],"to_buy":False,"to_sell":True} for z in ltp_bullish if z["ltp"]>get_intra_get_level(z["symbol"]) and get_intra_get_level(z["symbol"])!=-1]
-    print(ltp_bullish)
-
-
-else:
-    ohl_data = ohl_repo.get_by_screener_date_and_screener(get_today_date_as_str())
-    ohl_data_filtered_high = [x[4] for x in ohl_data if "High" in x[3] and "PRB" in x[-1]]
-    ohl_data_dict = tv_repo.check_stocks_by_date_and_screener(ohl_data_filtered_high, get_today_date_as_str())
-    ltp_bearish = get_intra_stock_data(fyers_token, [i[0][0] for i in ohl_data_dict], logger)
-    print(ltp_bearish)
-    def get_intra_get_level(stock_name:str):
-        intra_get_level = intra_alerts_repo.fetch_signals_by_date_stock_and_screeners(get_today_date_as_str(), stock_name[4:-3])
-        if len(intra_get_level)!=0:
-            return intra_get_level[0].level
-        else:
-            return -1
-    ltp_bearish =[{"symbol":z["symbol"],"to_buy":False,"to_sell":True} for z in ltp_bearish if z["ltp"]<get_intra_get_level(z["symbol"]) and get_intra_get_level(z["symbol"])!=-1]
-    print(ltp_bearish)
+            while not (stop_event and stop_event.is_set()) and (max_ticks is None or ticks < max_ticks):
+                started = time.monotonic()
+                try:
+                    self.tick()
+                except Exception as e:
+                    self.logger.error(f"❌ OHL engine tick failed: {e}", exc_info=True)
+                ticks += 1
+                elapsed = time.monotonic() - started
+                if elapsed > self.tick_interval:
+                    self.logger.warning(f"⏱️ OHL engine tick took {elapsed:.2f}s (interval {self.tick_interval}s)")
+                if stop_event:
+                    stop_event.wait(max(0.0, self.tick_interval - elapsed))
+                else:
+                    time.sleep(max(0.0, self.tick_interval - elapsed))
+        except KeyboardInterrupt:
+            self.logger.info("OHL engine stopping.")
+        finally:
+            self.market_data.stop()
+            remove_session()
+            self.logger.info(f"SignalCache stats: {self.signal_cache.stats()}")
+            self.logger.info(f"Market data stats: {self.market_data.stats()}")
+            self.logger.info(f"DB pool: {pool_metrics()}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger("IntradayScreenerOHLLogger")
+    fyers_token = create_fyers_client()
+    # ✅ OHL_MARKET_DATA: "rest" (default), "stream", or "replay:<ticks.jsonl>"
+    market_data_mode = os.getenv("OHL_MARKET_DATA", "rest")
+    if market_data_mode == "stream":
+        market_data = FyersStreamSource(os.getenv('FYERS_ACCESS_TOKEN'), os.getenv('FYERS_CLIENT_ID'), logger,
+                                        fallback=RestQuoteSource(fyers_token, logger),
+                                        record_path=os.getenv("OHL_TICK_RECORD_PATH"))
+    elif market_data_mode.startswith("replay:"):
+        market_data = ReplaySource(market_data_mode.split(":", 1)[1], logger=logger)
+    else:
+        market_data = RestQuoteSource(fyers_token, logger)
+    engine = OhlDecisionEngine(fyers_token, logger, market_data=market_data,
+                               tick_interval=float(os.getenv("OHL_TICK_INTERVAL", "1")))
+    if "--once" in sys.argv:
+        # ✅ single pass, like the scheduler-launched script used to do
+        engine.run(max_ticks=1)
+    else:
+        engine.run()
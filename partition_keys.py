@@ -0,0 +1,29 @@
+"""
+Primary keys of the date-partitioned signal tables.
+
+MySQL requires the partition column in every unique key, so the tables partition_manager
+partitions by screener_date use (id, screener_date) as primary key, with id still AUTO_INCREMENT.
+SQLite only numbers rows on its own for a lone INTEGER PRIMARY KEY, so for tables whose info
+names a ROWID_KEY column the key is rendered as PRIMARY KEY (<that column>) there instead,
+and that column is emitted without the AUTOINCREMENT SQLite rejects on composite keys.
+"""
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn, PrimaryKeyConstraint
+
+ROWID_KEY = "sqlite_rowid_key"
+
+
+@compiles(PrimaryKeyConstraint, "sqlite")
+def _sqlite_primary_key(constraint, compiler, **kw):
+    rowid_key = constraint.table.info.get(ROWID_KEY)
+    if rowid_key is None:
+        return compiler.visit_primary_key_constraint(constraint, **kw)
+    return f"PRIMARY KEY ({rowid_key})"
+
+
+@compiles(CreateColumn, "sqlite")
+def _sqlite_rowid_column(element, compiler, **kw):
+    column = element.element
+    if column.table.info.get(ROWID_KEY) != column.name:
+        return compiler.visit_create_column(element, **kw)
+    return f"{compiler.preparer.format_column(column)} INTEGER NOT NULL"
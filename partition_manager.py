@@ -0,0 +1,409 @@
+"""
+Date partitioning and archival of the signal tables (MySQL RANGE COLUMNS partitioning).
+
+    python partition_manager.py convert [--days-ahead N] [--dry-run]   # one-off: partition the tables
+    python partition_manager.py extend  [--days-ahead N] [--dry-run]   # daily: add upcoming days
+    python partition_manager.py archive [--keep-months M] [--archive-dir DIR] [--dry-run]
+
+Layout per table: one partition per month for the history found at conversion (mYYYYMM), one per
+day from then on (pYYYYMMDD) and a MAXVALUE catch-all (pfuture) that `extend` splits into the next
+days while it is still empty. Queries on one screener_date / signal day only touch that day's
+partition, and archiving a closed month is a DROP PARTITION instead of a row-by-row DELETE.
+
+MySQL requires the partition column in every unique key, so the models declare the primary keys
+(id, screener_date) and (updated_time, ticker, signal_time), and `convert` widens the keys of
+tables created before that; ids stay unique through AUTO_INCREMENT. Partition and archive
+boundaries follow the IST trading date (time_manager), not the host's local date.
+Partitioned tables cannot take part in foreign keys, so the run events of the intraday signals
+(sg_intraday_signal_events) are not partitioned and are archived/deleted explicitly.
+
+`archive` writes every closed month older than --keep-months to zstd-compressed Parquet files
+(ARCHIVE_DIR/<table>/<YYYY-MM>.parquet, needs pyarrow) and only removes the month from the
+database once the file has been written and its row count checked. On other databases the
+partition commands are skipped and archival falls back to deleting the archived range.
+"""
+import argparse
+import logging
+import os
+import sys
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import BigInteger, Boolean, Date, DateTime, Float, Integer, delete, func, inspect, select, text
+from sqlalchemy.engine import Connection
+
+from algo_scripts.algotrade.scripts.trade_utils.time_manager import get_today_date_as_str
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.management.database_manager import engine
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_intraday_screener_signals import (
+    SgIntradayScreenerSignals,
+    SgIntradaySignalEvents,
+    SgIntradaySignalEventTags,
+    SgSignalTags,
+)
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_ohl_signals import SgOhlSignals
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.tradingview_signals import TVSignals
+
+DAYS_AHEAD = int(os.getenv("SIGNAL_PARTITION_DAYS_AHEAD", "14"))
+KEEP_MONTHS = int(os.getenv("SIGNAL_ARCHIVE_KEEP_MONTHS", "3"))
+ARCHIVE_DIR = os.getenv("SIGNAL_ARCHIVE_DIR", "signal_archive")
+EXPORT_BATCH_SIZE = 10_000
+DELETE_BATCH_SIZE = 5_000
+FUTURE_PARTITION = "pfuture"
+
+# ✅ model -> partition column (part of the model's primary key)
+PARTITIONED = {
+    SgIntradayScreenerSignals: "screener_date",
+    SgOhlSignals: "screener_date",
+    TVSignals: "signal_time",
+}
+
+
+def today_ist() -> date:
+    """The IST trading date the partition and archive boundaries are based on."""
+    return datetime.strptime(get_today_date_as_str(), "%Y-%m-%d").date()
+
+
+def is_mysql(bind) -> bool:
+    return bind.dialect.name in ("mysql", "mariadb")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def day_partition(day: date) -> Tuple[str, date]:
+    """(name, exclusive upper bound) of the partition holding `day`."""
+    return f"p{day:%Y%m%d}", day + timedelta(days=1)
+
+
+def month_partition(month: date) -> Tuple[str, date]:
+    return f"m{month:%Y%m}", next_month(month)
+
+
+def partition_clause(name: str, upper: Optional[date]) -> str:
+    bound = "MAXVALUE" if upper is None else f"'{upper:%Y-%m-%d}'"
+    return f"PARTITION {name} VALUES LESS THAN ({bound})"
+
+
+def existing_partitions(conn: Connection, table_name: str) -> Dict[str, Optional[str]]:
+    """{partition name: upper bound as reported by MySQL} in partition order; {} if not partitioned."""
+    rows = conn.execute(text(
+        "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"
+    ), {"table": table_name}).all()
+    return {name: description for name, description in rows}
+
+
+def _execute(conn: Connection, ddl: str, dry_run: bool):
+    if dry_run:
+        print(f"{ddl};")
+        return
+    print(f"▶️ {ddl}")
+    conn.exec_driver_sql(ddl)
+
+
+# ---------- convert / extend ----------
+
+def convert(bind=engine, days_ahead: int = DAYS_AHEAD, today: Optional[date] = None, dry_run: bool = False) -> bool:
+    """Partition every signal table that is not partitioned yet."""
+    if not is_mysql(bind):
+        print(f"ℹ️ {bind.dialect.name} has no RANGE COLUMNS partitioning; nothing to convert")
+        return True
+    today = today or today_ist()
+    ok = True
+    with bind.connect() as conn:
+        _drop_event_foreign_keys(conn, dry_run)
+        for model, column in PARTITIONED.items():
+            table = model.__table__
+            primary_key = [key.name for key in table.primary_key.columns]
+            if existing_partitions(conn, table.name):
+                print(f"✅ {table.name} is already partitioned")
+                continue
+            oldest = conn.execute(select(func.min(table.c[column]))).scalar()
+            oldest = oldest.date() if isinstance(oldest, datetime) else oldest
+            partitions = []
+            month = month_start(oldest) if oldest else month_start(today)
+            while month < month_start(today):
+                partitions.append(month_partition(month))
+                month = next_month(month)
+            day = month_start(today)
+            while day <= today + timedelta(days=days_ahead):
+                partitions.append(day_partition(day))
+                day += timedelta(days=1)
+            clauses = ",\n    ".join(partition_clause(name, upper) for name, upper in partitions)
+            live_key = inspect(conn).get_pk_constraint(table.name)["constrained_columns"]
+            # ✅ tables created from the current models already have the widened key
+            widen = "" if live_key == primary_key else f" DROP PRIMARY KEY, ADD PRIMARY KEY ({', '.join(primary_key)})"
+            ddl = (
+                f"ALTER TABLE {table.name}{widen}\n"
+                f"PARTITION BY RANGE COLUMNS({column}) (\n    {clauses},\n    {partition_clause(FUTURE_PARTITION, None)}\n)"
+            )
+            try:
+                _execute(conn, ddl, dry_run)
+                if not dry_run:
+                    print(f"✅ Partitioned {table.name} by {column} ({len(partitions) + 1} partitions)")
+            except Exception as e:
+                ok = False
+                print(f"❌ Failed to partition {table.name}: {e}")
+    return ok
+
+
+def _drop_event_foreign_keys(conn: Connection, dry_run: bool):
+    """Drop FKs from the run events to the signals table (created before it was partitioned)."""
+    inspector = inspect(conn)
+    events = SgIntradaySignalEvents.__tablename__
+    if not inspector.has_table(events):
+        return
+    for fk in inspector.get_foreign_keys(events):
+        if fk["referred_table"] == SgIntradayScreenerSignals.__tablename__ and fk.get("name"):
+            _execute(conn, f"ALTER TABLE {events} DROP FOREIGN KEY {fk['name']}", dry_run)
+
+
+def extend(bind=engine, days_ahead: int = DAYS_AHEAD, today: Optional[date] = None, dry_run: bool = False) -> bool:
+    """Split pfuture so every table has a daily partition up to today + days_ahead."""
+    if not is_mysql(bind):
+        print(f"ℹ️ {bind.dialect.name} has no RANGE COLUMNS partitioning; nothing to extend")
+        return True
+    today = today or today_ist()
+    ok = True
+    with bind.connect() as conn:
+        for model in PARTITIONED:
+            table_name = model.__tablename__
+            partitions = existing_partitions(conn, table_name)
+            if FUTURE_PARTITION not in partitions:
+                print(f"⚠️ {table_name} is not partitioned (run `convert` first)")
+                ok = False
+                continue
+            last_bound = _last_bound(partitions)
+            new = []
+            day = last_bound or today
+            while day <= today + timedelta(days=days_ahead):
+                new.append(day_partition(day))
+                day += timedelta(days=1)
+            if not new:
+                print(f"✅ {table_name}: partitions already reach {last_bound}")
+                continue
+            # ✅ pfuture is empty while the daily partitions stay ahead of the data, so this is cheap
+            clauses = ", ".join(partition_clause(name, upper) for name, upper in new)
+            ddl = (
+                f"ALTER TABLE {table_name} REORGANIZE PARTITION {FUTURE_PARTITION} INTO "
+                f"({clauses}, {partition_clause(FUTURE_PARTITION, None)})"
+            )
+            try:
+                _execute(conn, ddl, dry_run)
+                if not dry_run:
+                    print(f"✅ {table_name}: added {len(new)} daily partitions up to {new[-1][1] - timedelta(days=1)}")
+            except Exception as e:
+                ok = False
+                print(f"❌ Failed to extend {table_name}: {e}")
+    return ok
+
+
+def _bound(description: Optional[str]) -> Optional[date]:
+    """Upper bound of a partition from its PARTITION_DESCRIPTION; None for MAXVALUE."""
+    if not description or description == "MAXVALUE":
+        return None
+    return datetime.strptime(description.strip("'")[:10], "%Y-%m-%d").date()
+
+
+def _last_bound(partitions: Dict[str, Optional[str]]) -> Optional[date]:
+    """Upper bound of the last bounded partition."""
+    bounds = [_bound(description) for description in partitions.values() if _bound(description)]
+    return max(bounds) if bounds else None
+
+
+# ---------- archive ----------
+
+def closed_months(bind, model, keep_months: int, today: Optional[date] = None) -> List[date]:
+    """First days of the months of `model` that ended more than keep_months months ago."""
+    column = model.__table__.c[PARTITIONED[model]]
+    cutoff = month_start(today or today_ist())
+    for _ in range(keep_months):
+        cutoff = month_start(cutoff - timedelta(days=1))
+    with bind.connect() as conn:
+        oldest = conn.execute(select(func.min(column))).scalar()
+    if oldest is None:
+        return []
+    oldest = oldest.date() if isinstance(oldest, datetime) else oldest
+    months, month = [], month_start(oldest)
+    while month < cutoff:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def _arrow_type(column):
+    import pyarrow as pa
+
+    if isinstance(column.type, (Integer, BigInteger)):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def export_parquet(conn: Connection, statement, path: str) -> int:
+    """Stream the rows of `statement` into a zstd-compressed Parquet file; returns the row count."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Archiving needs pyarrow: pip install pyarrow") from None
+
+    schema = pa.schema([(column.name, _arrow_type(column)) for column in statement.selected_columns])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    partial = f"{path}.partial"
+    rows = 0
+    result = conn.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE).execute(statement)
+    with pq.ParquetWriter(partial, schema, compression="zstd") as writer:
+        for batch in result.partitions():
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+            ))
+            rows += len(batch)
+    if pq.ParquetFile(partial).metadata.num_rows != rows:
+        raise RuntimeError(f"{partial}: row count does not match the {rows} exported rows")
+    os.replace(partial, path)
+    return rows
+
+
+def _month_range(model, month: date):
+    column = model.__table__.c[PARTITIONED[model]]
+    start, end = month, next_month(month)
+    if isinstance(column.type, DateTime):
+        start, end = datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())
+    return column >= start, column < end
+
+
+def archive_month(bind, model, month: date, archive_dir: str = ARCHIVE_DIR, dry_run: bool = False) -> int:
+    """Export one closed month of `model` to Parquet, then drop it from the database."""
+    table = model.__table__
+    path = os.path.join(archive_dir, table.name, f"{month:%Y-%m}.parquet")
+    criteria = _month_range(model, month)
+    with bind.connect() as conn:
+        count = conn.execute(select(func.count()).select_from(table).where(*criteria)).scalar()
+    if dry_run:
+        print(f"{table.name} {month:%Y-%m}: would archive {count} rows to {path}")
+        return count
+
+    exported = 0
+    if count:  # ✅ empty months (weekends, holidays, gaps) only lose their partitions
+        with bind.connect() as conn:
+            exported = export_parquet(conn, select(table).where(*criteria).order_by(*table.primary_key.columns), path)
+            if model is SgIntradayScreenerSignals:
+                _archive_events(conn, month, archive_dir)
+        if exported != count:
+            raise RuntimeError(f"{table.name} {month:%Y-%m}: exported {exported} rows, expected {count}")
+        print(f"✅ {table.name} {month:%Y-%m}: archived {exported} rows to {path}")
+
+    with bind.connect() as conn:
+        if model is SgIntradayScreenerSignals:
+            events = SgIntradaySignalEvents.__table__
+            event_tags = SgIntradaySignalEventTags.__table__
+            in_month = (events.c.screener_date >= month, events.c.screener_date < next_month(month))
+            # ✅ tag links first and explicitly: SQLite does not apply ON DELETE CASCADE by default
+            _delete_in_batches(conn, event_tags, (event_tags.c.event_id.in_(select(events.c.id).where(*in_month)),))
+            _delete_in_batches(conn, events, in_month)
+        _remove_month(conn, model, month, criteria)
+    return exported
+
+
+def _archive_events(conn: Connection, month: date, archive_dir: str):
+    """Archive the month's run events and their tags next to the intraday signals."""
+    events = SgIntradaySignalEvents.__table__
+    event_tags = SgIntradaySignalEventTags.__table__
+    tags = SgSignalTags.__table__
+    in_month = (events.c.screener_date >= month, events.c.screener_date < next_month(month))
+    folder = os.path.join(archive_dir, events.name)
+    export_parquet(conn, select(events).where(*in_month).order_by(events.c.id),
+                   os.path.join(folder, f"{month:%Y-%m}.parquet"))
+    export_parquet(
+        conn,
+        select(event_tags.c.event_id, tags.c.name, event_tags.c.direction)
+        .join(events, events.c.id == event_tags.c.event_id)
+        .join(tags, tags.c.id == event_tags.c.tag_id)
+        .where(*in_month)
+        .order_by(event_tags.c.event_id),
+        os.path.join(folder, f"{month:%Y-%m}.tags.parquet"),
+    )
+
+
+def _remove_month(conn: Connection, model, month: date, criteria):
+    """
+    DROP the partitions that lie wholly inside the month (MySQL), then DELETE whatever is left
+    of the month's range: everything on unpartitioned tables, usually nothing on partitioned ones.
+    The first partition has no lower bound; it counts as inside because archive() goes oldest
+    month first and stops at a failure, so nothing older than `month` is left in the table.
+    """
+    table = model.__table__
+    partitions = existing_partitions(conn, table.name) if is_mysql(conn) else {}
+    inside, lower = [], date.min
+    for name, description in partitions.items():
+        upper = _bound(description)
+        if upper is not None and upper <= next_month(month) and (lower == date.min or lower >= month):
+            inside.append(name)
+        lower = upper
+    if inside:
+        conn.exec_driver_sql(f"ALTER TABLE {table.name} DROP PARTITION {', '.join(inside)}")
+        print(f"🗑️ {table.name}: dropped partitions {', '.join(inside)}")
+    deleted = _delete_in_batches(conn, table, criteria)
+    if deleted or not inside:
+        print(f"🗑️ {table.name}: deleted {deleted} rows of {month:%Y-%m}")
+
+
+def _delete_in_batches(conn: Connection, table, criteria) -> int:
+    """DELETE ... LIMIT DELETE_BATCH_SIZE until nothing matches, committing each batch (MySQL)."""
+    statement = delete(table).where(*criteria).with_dialect_options(mysql_limit=DELETE_BATCH_SIZE)
+    deleted = 0
+    while True:
+        count = conn.execute(statement).rowcount
+        conn.commit()
+        deleted += count
+        if not is_mysql(conn) or count < DELETE_BATCH_SIZE:
+            return deleted
+
+
+def archive(bind=engine, keep_months: int = KEEP_MONTHS, archive_dir: str = ARCHIVE_DIR,
+            today: Optional[date] = None, dry_run: bool = False) -> bool:
+    ok = True
+    for model in PARTITIONED:
+        for month in closed_months(bind, model, keep_months, today):
+            try:
+                archive_month(bind, model, month, archive_dir, dry_run)
+            except Exception as e:
+                # ❌ leave this and the later months in the database; the next run retries them
+                ok = False
+                print(f"❌ Failed to archive {model.__tablename__} {month:%Y-%m}: {e}")
+                break
+    return ok
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    arg_parser = argparse.ArgumentParser(description="Partition and archive the signal tables.")
+    arg_parser.add_argument("command", choices=("convert", "extend", "archive"))
+    arg_parser.add_argument("--days-ahead", type=int, default=DAYS_AHEAD)
+    arg_parser.add_argument("--keep-months", type=int, default=KEEP_MONTHS)
+    arg_parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    arg_parser.add_argument("--dry-run", action="store_true")
+    args = arg_parser.parse_args()
+
+    if args.command == "convert":
+        result = convert(days_ahead=args.days_ahead, dry_run=args.dry_run)
+    elif args.command == "extend":
+        result = extend(days_ahead=args.days_ahead, dry_run=args.dry_run)
+    else:
+        result = archive(keep_months=args.keep_months, archive_dir=args.archive_dir, dry_run=args.dry_run)
+    sys.exit(0 if result else 1)
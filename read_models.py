@@ -0,0 +1,87 @@
+"""
+Read-only row types for the signal repositories.
+
+The read paths only look at a handful of columns and never modify what they load, so they select
+exactly those columns with Core and wrap each result row in a named tuple: no ORM identity map, no
+per-row object plus copied list, and the rows stay immutable. OhlSignalRow keeps the column order
+of the old 20-element lists, so positional access (row[3], row[4], row[-1]) keeps working next to
+row.screener / row.stock_name / row.bearish_milestone_tags.
+
+stream_rows() is the iterator form for history reads: rows arrive in `batch_size` chunks over a
+server-side cursor, so memory stays flat however many rows the query returns. The cursor runs on
+a connection of its own, never on the thread's shared session.
+"""
+from collections import namedtuple
+from typing import Iterator, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+OhlSignalRow = namedtuple("OhlSignalRow", (
+    "screener_run_id",
+    "screener_date",
+    "screener_type",
+    "screener",
+    "stock_name",
+    "trade_type",
+    "screener_rank",
+    "price",
+    "change",
+    "percentage",
+    "momentum",
+    "open",
+    "deviation_from_pivots",
+    "todays_range",
+    "ohl",
+    "stock_type",
+    "weekly_trend",
+    "sector",
+    "bullish_milestone_tags",
+    "bearish_milestone_tags",
+))
+
+IntradaySignalRow = namedtuple("IntradaySignalRow", (
+    "screener_date",
+    "screener_type",
+    "screener",
+    "stock_name",
+    "trade_type",
+    "stock_type",
+    "ltp",
+    "level",
+    "screener_rank",
+    "bullish_milestone_tags",
+    "bearish_milestone_tags",
+    "updated_time",
+))
+
+
+def row_select(model, row_type):
+    """SELECT of exactly the columns of `row_type`, in its field order."""
+    table = model.__table__
+    return select(*(table.c[field] for field in row_type._fields))
+
+
+def fetch_rows(session: Session, statement, row_type) -> List:
+    """Execute a row_select() statement and return its rows as `row_type` tuples."""
+    make = row_type._make
+    return [make(row) for row in session.execute(statement).tuples()]
+
+
+def stream_rows(session: Session, statement, row_type=None, batch_size: int = 1000) -> Iterator:
+    """
+    Yield the rows of `statement` (as `row_type` tuples, or Core rows when None) `batch_size` at a
+    time over a server-side cursor. The cursor runs on a dedicated connection from the session's
+    engine, held until the iterator is exhausted or closed, so the (shared) session stays free for
+    other queries meanwhile; MySQL would otherwise fail them with "Commands out of sync".
+    """
+    with session.get_bind().connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(statement)
+        try:
+            for partition in result.partitions(batch_size):
+                if row_type is None:
+                    yield from partition
+                else:
+                    yield from map(row_type._make, partition)
+        finally:
+            result.close()
@@ -0,0 +1,179 @@
+"""
+Shared, pooled session management for the signal repositories.
+
+The process keeps the single database_manager engine (its URL, connect_args, execution options and
+event listeners); on first use its QueuePool is swapped for a TimedQueuePool that reuses the same
+connection factory with tuned sizing (pre-ping, recycle, bounded overflow). Two ways to get a
+session:
+
+- get_session():   the calling thread's session (scoped_session registry). Repositories use it by
+                   default, so every repository in a thread shares one session and at most one
+                   pooled connection. Call release_session() when a unit of reads is done so
+                   the next one starts on a fresh snapshot, and remove_session() when a
+                   thread/task is done.
+- session_scope(): a short unit of work on its own session, committed on success and rolled back
+                   on error.
+
+pool_metrics() reports checkout latency and pool saturation. The pool is configured through
+DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT and DB_POOL_RECYCLE.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from algo_scripts.algotrade.scripts.trade_utils.latency_histogram import LatencyHistogram
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.management.database_manager import (
+    engine as base_engine,
+)
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # ✅ below MySQL wait_timeout
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait and how close the pool runs to its limit."""
+
+    @classmethod
+    def replacing(cls, pool: QueuePool, pool_size: int, max_overflow: int, timeout: float,
+                  recycle: int) -> "TimedQueuePool":
+        """
+        A TimedQueuePool built like QueuePool.recreate(): same connection factory (URL and
+        connect_args), dialect, event listeners and reset behaviour as `pool`, with new sizing.
+        """
+        return cls(
+            pool._creator,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            timeout=timeout,
+            recycle=recycle,
+            pre_ping=True,
+            echo=pool.echo,
+            logging_name=pool._orig_logging_name,
+            reset_on_return=pool._reset_on_return,
+            _dispatch=pool.dispatch,
+            dialect=pool._dialect,
+        )
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        self.max_overflow = max_overflow
+        self.checkout_latency = LatencyHistogram(bounds_ms=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000))
+        self.peak_checked_out = 0
+        self.saturated_checkouts = 0
+        self.timeouts = 0
+        self._metrics_lock = threading.Lock()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            self.checkout_latency.record(time.perf_counter() - started)
+            checked_out = self.checkedout()
+            with self._metrics_lock:
+                self.peak_checked_out = max(self.peak_checked_out, checked_out)
+                if checked_out >= self.size() + self.max_overflow:
+                    self.saturated_checkouts += 1
+
+
+_engine = None
+_session_factory = None
+_scoped = None
+_init_lock = threading.Lock()
+
+
+def get_engine():
+    """The database_manager engine, with its pool swapped for a TimedQueuePool on first use."""
+    global _engine, _session_factory, _scoped
+    if _engine is None:
+        with _init_lock:
+            if _engine is None:
+                pool = base_engine.pool
+                if isinstance(pool, QueuePool) and not isinstance(pool, TimedQueuePool):
+                    base_engine.pool = TimedQueuePool.replacing(
+                        pool,
+                        pool_size=POOL_SIZE,
+                        max_overflow=MAX_OVERFLOW,
+                        timeout=POOL_TIMEOUT,
+                        recycle=POOL_RECYCLE,
+                    )
+                    pool.dispose()
+                    logger.info(f"✅ DB pool ready: size={POOL_SIZE} overflow={MAX_OVERFLOW} recycle={POOL_RECYCLE}s")
+                else:
+                    # ✅ e.g. SQLite's SingletonThreadPool/StaticPool: nothing to size, keep it
+                    logger.info(f"ℹ️ DB pool left as {type(pool).__name__}")
+                _engine = base_engine
+                _session_factory = sessionmaker(bind=_engine)
+                _scoped = scoped_session(_session_factory)
+    return _engine
+
+
+def get_session() -> Session:
+    """The calling thread's shared session."""
+    get_engine()
+    return _scoped()
+
+
+def release_session():
+    """
+    End the calling thread's read transaction and hand its connection back to the pool; the
+    session stays registered, so repositories holding it keep working (next use starts a new
+    transaction, i.e. a new REPEATABLE READ snapshot).
+    """
+    if _scoped is not None and _scoped.registry.has():
+        _scoped().close()
+
+
+def remove_session():
+    """Close the calling thread's session and hand its connection back to the pool."""
+    if _scoped is not None:
+        _scoped.remove()
+
+
+@contextmanager
+def session_scope():
+    """Unit of work on a dedicated session: commit on success, rollback on error, always close."""
+    get_engine()
+    session = _session_factory()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def pool_metrics() -> Dict:
+    pool = get_engine().pool
+    if not isinstance(pool, TimedQueuePool):
+        return {"pool": type(pool).__name__, "status": pool.status()}
+    capacity = pool.size() + pool.max_overflow
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "max_overflow": pool.max_overflow,
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "saturation": round(checked_out / capacity, 3) if capacity else None,
+        "peak_checked_out": pool.peak_checked_out,
+        "saturated_checkouts": pool.saturated_checkouts,
+        "timeouts": pool.timeouts,
+        "checkout_latency": pool.checkout_latency.summary(),
+    }
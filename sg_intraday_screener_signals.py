@@ -1,13 +1,26 @@
 import pytz
+import time
 import traceback
 import os
-from typing import Union,List
-from datetime import datetime
-from sqlalchemy import Column, String, Float, Integer, DateTime, Boolean, Text, Date, Index
+from itertools import islice
+from typing import Union, List, Dict, Iterable, Optional, Sequence, Set, Tuple
+from datetime import datetime, time as dt_time
+from sqlalchemy import Column, String, Float, Integer, DateTime, Boolean, Text, Date, Index, ForeignKey, insert, select, delete, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
 from sqlalchemy.dialects.mysql import DATETIME
 from dotenv import load_dotenv
 from dateutil import parser
-from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.management.database_manager import get_db_session, Base
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.management.database_manager import Base
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.management.session_provider import get_session
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.partition_keys import ROWID_KEY
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.read_models import (
+    IntradaySignalRow,
+    fetch_rows,
+    row_select,
+)
 from datetime import date
 import logging
 # suppress SQL text logging
@@ -34,7 +47,7 @@ class SgIntradayScreenerSignals(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     screener_run_time = Column(DATETIME, nullable=True, default=now_ist)  # ✅ Nullable
-    screener_date = Column(Date, nullable=False, default=today_ist)  # ✅ Must be Non-Nullable (Unique Key)
+    screener_date = Column(Date, primary_key=True, nullable=False, default=today_ist)  # ✅ Unique Key, partition column
     screener_type = Column(String(50), nullable=True)  # ✅ Newly added column
     screener = Column(String(50), nullable=False)  # ✅ Must be Non-Nullable (Unique Key)
     stock_name = Column(String(50), nullable=False)  # ✅ Must be Non-Nullable (Unique Key)
@@ -75,17 +88,177 @@ class SgIntradayScreenerSignals(Base):
     bullish_milestone_tags = Column(String(2500), nullable=True)  # ✅ New Column
     bearish_milestone_tags = Column(String(2500), nullable=True)  # ✅ New Column
     updated_time = Column(DateTime, default=now_ist, onupdate=now_ist)  # ✅ Nullable
-    """
+
+    __table_args__ = (
+        # ✅ the key write_to_db merges runs on; stock_type is nullable and NULLs never collide in a
+        #    unique index, so it stays out of the key (own name: SQLite/PG share one index namespace)
+        Index('uq_sg_intra_stock_entry', 'screener', 'screener_date', 'stock_name', 'trade_type', unique=True),
+        # ✅ fetch_signals_by_date_stock_and_screeners
+        Index('ix_sg_intraday_date_stock', 'screener_date', 'stock_name'),
+        # ✅ delete_by_date_and_type / delete_by_date_type_and_screeners
+        Index('ix_sg_intraday_date_type', 'screener_date', 'screener_type'),
+        # ✅ primary key (id, screener_date) for date partitioning; SQLite keeps id as its rowid
+        {"info": {ROWID_KEY: "id"}},
+    )
+
+
+# ✅ Conflict key of bulk_upsert (columns of uq_sg_intra_stock_entry)
+UPSERT_KEY = ('screener', 'screener_date', 'stock_name', 'trade_type')
+
+# ✅ Per-run market values: a later run's value replaces the stored one when it has one
+UPSERT_REFRESHED = (
+    'ltp', 'price_change', 'level', 'alerts', 'vol_change', 'oi_change', 'deviation_from_pivots',
+    'todays_range', 'screener_rank', 'S3', 'S2', 'S1', 'R1', 'R2', 'R3', 'break_type', 'break_price',
+    'break_time', 'ohl_type', 'stock_momentum_score', 'stock_outperformance_score',
+    'sector_performance_score', 'sector_rank', 'index_contribution',
+)
+
+
+### **✅ Run events: one row per signal per scrape run, tags in a dimension table**
+class SgIntradaySignalEvents(Base):
+    __tablename__ = "sg_intraday_signal_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # ✅ no FK: sg_intraday_screener_signals is partitioned by date (partition_manager) and MySQL
+    #    partitioned tables cannot be referenced by foreign keys; the delete paths remove events
+    signal_id = Column(Integer, nullable=False)
+    screener_date = Column(Date, nullable=False)
+    run_time = Column(DATETIME, nullable=False)  # ✅ screener_run_time of the run (IST, seconds)
+    run_id = Column(String(50), nullable=True)
+    label = Column(String(100), nullable=True)  # ✅ what the run reported, e.g. BEST_Intraday
+    ltp = Column(Float, nullable=True)
+
     __table_args__ = (
-        Index('unique_stock_entry', 'screener', 'screener_date', 'stock_name', 'trade_type', 'stock_type', unique=True),
+        Index('unique_signal_run', 'signal_id', 'run_time', unique=True),  # ✅ history of one signal
+        Index('ix_sg_intraday_events_date_time', 'screener_date', 'run_time'),  # ✅ "fired after 11:00"
     )
+
+
+class SgSignalTags(Base):
+    __tablename__ = "sg_signal_tags"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(50), nullable=False, unique=True)
+
+
+class SgIntradaySignalEventTags(Base):
+    __tablename__ = "sg_intraday_signal_event_tags"
+
+    event_id = Column(Integer, ForeignKey("sg_intraday_signal_events.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("sg_signal_tags.id"), primary_key=True)
+    direction = Column(String(10), primary_key=True)  # ✅ bullish / bearish milestone
+
+    __table_args__ = (
+        Index('ix_sg_intraday_event_tags_tag', 'tag_id', 'event_id'),  # ✅ "which stocks fired tag X"
+    )
+
+
+# ✅ record column -> direction stored on its event tags
+MILESTONE_DIRECTIONS = {
+    "bullish_milestone_tags": "bullish",
+    "bearish_milestone_tags": "bearish",
+}
+
+
+def _insert_ignore(table, dialect: str):
+    """INSERT that skips rows already present (same unique key) instead of failing the batch."""
+    if dialect in ("mysql", "mariadb"):
+        return insert(table).prefix_with("IGNORE")
+    if dialect == "sqlite":
+        return sqlite_insert(table).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return postgresql_insert(table).on_conflict_do_nothing()
+    return insert(table)
+
+
+def _event_time(value) -> datetime:
+    """
+    screener_run_time as the naive IST datetime, to the second, that DATETIME stores; a missing
+    or unparseable value stands for the current IST time.
     """
+    if isinstance(value, str):
+        try:
+            value = parser.parse(value)
+        except (ValueError, OverflowError):
+            value = None
+    if value is None:
+        value = now_ist()
+    if value.tzinfo is not None:
+        value = value.astimezone(IST)
+    return value.replace(tzinfo=None, microsecond=0)
+
+
+def _event_label(tags: Optional[str]) -> Optional[str]:
+    """The run's label from a "HH:MM-<label>" tags entry."""
+    if not tags:
+        return None
+    run_time, sep, label = tags.partition("-")
+    return label if sep and len(run_time) == 5 and run_time[2] == ":" else tags
+
+
+def _merge_batch(batch: List[Dict], seen_runs: Set[Tuple]) -> Tuple[List[Dict], Set[Tuple]]:
+    """
+    One record per UPSERT_KEY for a single upsert statement (PostgreSQL rejects ON CONFLICT DO
+    UPDATE touching a row twice, MySQL/SQLite would count it twice). A key listed twice in one
+    export is one run: later values win where given and the milestone tags are united.
+    signal_count carries the number of runs of the key not yet counted (seen_runs); records
+    without a screener_run_time are stamped with one time for the whole batch.
+    Returns the merged records and the batch's (key, run time) pairs.
+    """
+    batch_time = None
+    merged, runs = {}, set()
+    for record in batch:
+        if record.get("screener_run_time") is None:
+            batch_time = batch_time or _event_time(None)
+            record["screener_run_time"] = batch_time
+        key = tuple(record.get(column) for column in UPSERT_KEY)
+        runs.add((key, _event_time(record["screener_run_time"])))
+        current = merged.get(key)
+        if current is None:
+            merged[key] = dict(record)
+            continue
+        for column, value in record.items():
+            if column in MILESTONE_DIRECTIONS:
+                names = set((current.get(column) or "").split()).union((value or "").split())
+                current[column] = " ".join(sorted(names)) or None
+            elif value is not None:
+                current[column] = value
+    for record in merged.values():
+        record["signal_count"] = 0
+    for key, _ in runs.difference(seen_runs):
+        merged[key]["signal_count"] += 1
+    return list(merged.values()), runs
+
+
+def _native_upsert(dialect: str):
+    """Build the dialect's INSERT ... ON DUPLICATE KEY / ON CONFLICT statement for bulk_upsert."""
+    table = SgIntradayScreenerSignals.__table__
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql_insert(table)
+        new = stmt.inserted
+    else:
+        stmt = (sqlite_insert if dialect == "sqlite" else postgresql_insert)(table)
+        new = stmt.excluded
+    current = table.c
+
+    updates = {column: func.coalesce(new[column], current[column]) for column in UPSERT_REFRESHED}
+    updates.update({
+        "updated_time": new.updated_time,
+        "signal_count": func.coalesce(current.signal_count, 0) + new.signal_count,
+        "is_processed": False,
+        "run_id": new.run_id,
+        # ✅ run_history / tags / milestone tags keep the first run's values; later runs are
+        #    recorded in sg_intraday_signal_events (see get_signal_history)
+    })
+    if dialect in ("mysql", "mariadb"):
+        return stmt.on_duplicate_key_update(**updates)
+    return stmt.on_conflict_do_update(index_elements=list(UPSERT_KEY), set_=updates)
 
 ### **✅ Repository Class with `is_processed` Support**
 class SgIntradayScreenerSignalsRepository:
-    def __init__(self):
-        """Creates a new session internally so that it does not need to be passed explicitly."""
-        self.session = next(get_db_session())
+    def __init__(self, session: Optional[Session] = None):
+        """Uses the thread's shared session (session_provider) unless one is passed explicitly."""
+        self.session = session if session is not None else get_session()
 
     def to_ist(self, dt_str):
         """Convert a datetime string (various formats) to IST datetime object."""
@@ -102,11 +275,14 @@ class SgIntradayScreenerSignalsRepository:
     def upsert(self, data: List[List[str]], screener: str):
         """
         Insert new records if they do not exist. If they exist, update them.
+        All rows go to the database through bulk_upsert in one batch; every row also records
+        this run as an event of its signal.
         """
         try:
             self.session.rollback()  # ✅ Ensure no pending transactions
 
             column_names = data[0]
+            records = []
             for row in data[1:]:
                 record = {column_names[i]: row[i] if row[i] else None for i in range(len(column_names))}
                 record["screener"] = screener
@@ -130,59 +306,201 @@ class SgIntradayScreenerSignalsRepository:
                 # ✅ Standardize stock_name (strip spaces & uppercase)
                 record["stock_name"] = record["stock_name"].strip().upper()
 
-                # ✅ Log if an entry already exists
-                existing_entry = self.session.query(SgIntradayScreenerSignals).filter_by(
-                    screener=record["screener"],
-                    screener_date=record["screener_date"],
-                    stock_name=record["stock_name"],
-                    trade_type=record["trade_type"]
-                ).first()
-
-                if existing_entry:
-                    print(f"🔄 Updating existing entry for {record['stock_name']}")
-                    existing_entry.ltp = record.get("ltp", existing_entry.ltp)
-                    existing_entry.price_change = record.get("price_change", existing_entry.price_change)
-                    existing_entry.updated_time = now_ist()
-                    existing_entry.signal_count += 1
-                    existing_entry.is_processed = False
-                    existing_entry.run_history = (
-                        existing_entry.run_history + f", {record['screener_run_time'].strftime('%H:%M')}-RUN"
-                        if existing_entry.run_history else f"{record['screener_run_time'].strftime('%H:%M')}-RUN"
-                    )
-                    existing_entry.tags = (
-                        existing_entry.tags + f", {record['screener_run_time'].strftime('%H:%M')}-{record['tags']}"
-                        if existing_entry.tags else f"{record['screener_run_time'].strftime('%H:%M')}-{record['tags']}"
-                    )
-
-                    # ✅ Handling bullish_milestone_tags
-                    existing_bullish_tags = set(existing_entry.bullish_milestone_tags.split()) if existing_entry.bullish_milestone_tags else set()
-                    new_bullish_tags = set(record.get("bullish_milestone_tags", "").split())
-
-                    # Add only the missing values
-                    updated_bullish_tags = existing_bullish_tags.union(new_bullish_tags)
-                    existing_entry.bullish_milestone_tags = " ".join(updated_bullish_tags) if updated_bullish_tags else None
-
-                    # ✅ Handling bearish_milestone_tags
-                    existing_bearish_tags = set(existing_entry.bearish_milestone_tags.split()) if existing_entry.bearish_milestone_tags else set()
-                    new_bearish_tags = set(record.get("bearish_milestone_tags", "").split())
-
-                    # Add only the missing values
-                    updated_bearish_tags = existing_bearish_tags.union(new_bearish_tags)
-                    existing_entry.bearish_milestone_tags = " ".join(updated_bearish_tags) if updated_bearish_tags else None
-
-            else:
-                    print(f"➕ Inserting new entry for {record['stock_name']}")
-                    new_entry = SgIntradayScreenerSignals(**record)
-                    self.session.add(new_entry)
+                # ✅ This run's history/tag entries: stored on new rows, recorded as an event for all
+                #    (no or unparsed screener_run_time: stamped with the current IST time)
+                run_time_str = _event_time(record.get("screener_run_time")).strftime('%H:%M')
+                record["run_history"] = f"{run_time_str}-RUN"
+                record["tags"] = f"{run_time_str}-{record.get('tags')}"
+                records.append(record)
 
-            self.session.commit()
-            print("✅ Data upserted successfully!")
+            stats = self.bulk_upsert(records, batch_size=max(len(records), 1))
+            if all(batch["ok"] for batch in stats):
+                print("✅ Data upserted successfully!")
 
         except Exception as e:
             print("❌ Error in upsert operation:")
             traceback.print_exc()
             self.session.rollback()
 
+    def bulk_upsert(self, records: Iterable[Dict], batch_size: int = 1000) -> List[Dict]:
+        """
+        Insert-or-update rows on the uq_sg_intra_stock_entry key, batch_size rows per statement.
+
+        MySQL uses INSERT ... ON DUPLICATE KEY UPDATE and SQLite/PostgreSQL ON CONFLICT DO UPDATE,
+        so the whole batch is one round trip and the merge happens in SQL: signal_count + 1 per
+        run, the UPSERT_REFRESHED values (ltp, level, alerts, ...) take the new value when one is
+        given. Other dialects pre-fetch the existing rows of the batch in one query and merge in
+        Python. Records repeating a key are merged first (_merge_batch), so a symbol listed twice
+        in one export counts once.
+        Each record is also appended as a run event (with its milestone tags) in the same
+        transaction, instead of growing the run_history / tags text of the signal row.
+        Returns one {"rows", "seconds", "ok"} entry per batch.
+        """
+        dialect = self.session.get_bind().dialect.name
+        iterator = iter(records)
+        stats = []
+        seen_runs = set()  # ✅ (key, run time) already counted by an earlier batch of this call
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                break
+
+            started = time.perf_counter()
+            merged, runs = _merge_batch(batch, seen_runs)
+            try:
+                if dialect in ("mysql", "mariadb", "sqlite", "postgresql"):
+                    self.session.execute(_native_upsert(dialect), merged)
+                else:
+                    self._prefetch_merge_upsert(merged)
+                # ✅ events from the unmerged records: one per run of the signal
+                self._record_events(batch, dialect)
+                self.session.commit()
+                seen_runs.update(runs)
+                ok = True
+            except Exception as e:
+                print(f"❌ Upsert of {len(batch)} rows failed:", e)
+                self.session.rollback()
+                ok = False
+            stats.append({"rows": len(batch), "seconds": time.perf_counter() - started, "ok": ok})
+        return stats
+
+    def _prefetch_merge_upsert(self, batch: List[Dict]):
+        """Fallback for dialects without native upsert: one SELECT for the batch, merge in Python."""
+        def key_of(values):
+            return tuple(values.get(column) for column in UPSERT_KEY)
+
+        existing = {
+            key_of(row.__dict__): row
+            for row in self.session.query(SgIntradayScreenerSignals).filter(
+                SgIntradayScreenerSignals.screener_date.in_({r["screener_date"] for r in batch}),
+                SgIntradayScreenerSignals.stock_name.in_({r["stock_name"] for r in batch}),
+            )
+        }
+        new_rows = []
+        for record in batch:
+            entry = existing.get(key_of(record))
+            if entry is None:
+                entry = SgIntradayScreenerSignals(**record)
+                existing[key_of(record)] = entry
+                new_rows.append(entry)
+                continue
+            for column in UPSERT_REFRESHED:
+                if record.get(column) is not None:
+                    setattr(entry, column, record[column])
+            entry.updated_time = now_ist()
+            entry.signal_count = (entry.signal_count or 0) + record["signal_count"]
+            entry.is_processed = False
+            entry.run_id = record.get("run_id")
+        self.session.add_all(new_rows)
+        self.session.flush()  # ✅ ids for _record_events
+
+    def _record_events(self, batch: List[Dict], dialect: str):
+        """Append one event per record (and its milestone tags) to the signals the batch upserted."""
+        table = SgIntradayScreenerSignals.__table__
+        events = SgIntradaySignalEvents.__table__
+
+        def key_of(values):
+            return tuple(values.get(column) for column in UPSERT_KEY)
+
+        signal_ids = {
+            key_of(row._mapping): row.id
+            for row in self.session.execute(
+                select(table.c.id, *(table.c[column] for column in UPSERT_KEY)).where(
+                    table.c.screener_date.in_({r["screener_date"] for r in batch}),
+                    table.c.stock_name.in_({r["stock_name"] for r in batch}),
+                )
+            )
+        }
+
+        event_rows, event_tags = {}, {}
+        for record in batch:
+            signal_id = signal_ids.get(key_of(record))
+            if signal_id is None:
+                continue
+            run_time = _event_time(record.get("screener_run_time"))
+            event_rows.setdefault((signal_id, run_time), {
+                "signal_id": signal_id,
+                "screener_date": record["screener_date"],
+                "run_time": run_time,
+                "run_id": record.get("run_id"),
+                "label": _event_label(record.get("tags")),
+                "ltp": record.get("ltp"),
+            })
+            tags = event_tags.setdefault((signal_id, run_time), set())
+            for column, direction in MILESTONE_DIRECTIONS.items():
+                tags.update((name, direction) for name in (record.get(column) or "").split())
+        if not event_rows:
+            return
+        self.session.execute(_insert_ignore(events, dialect), list(event_rows.values()))
+
+        tag_ids = self._tag_ids({name for tags in event_tags.values() for name, _ in tags}, dialect)
+        if not tag_ids:
+            return
+        event_ids = {
+            (row.signal_id, row.run_time): row.id
+            for row in self.session.execute(
+                select(events.c.id, events.c.signal_id, events.c.run_time).where(
+                    events.c.signal_id.in_({signal_id for signal_id, _ in event_rows}),
+                    events.c.run_time.in_({run_time for _, run_time in event_rows}),
+                )
+            )
+        }
+        links = [
+            {"event_id": event_ids[key], "tag_id": tag_ids[name], "direction": direction}
+            for key, tags in event_tags.items() if key in event_ids
+            for name, direction in tags
+        ]
+        if links:
+            self.session.execute(_insert_ignore(SgIntradaySignalEventTags.__table__, dialect), links)
+
+    def _tag_ids(self, names: Set[str], dialect: str) -> Dict[str, int]:
+        """{tag name: id}, adding the names the tag table does not have yet."""
+        if not names:
+            return {}
+        tags = SgSignalTags.__table__
+        known = dict(self.session.execute(select(tags.c.name, tags.c.id).where(tags.c.name.in_(names))).all())
+        missing = names.difference(known)
+        if missing:
+            self.session.execute(_insert_ignore(tags, dialect), [{"name": name} for name in sorted(missing)])
+            known.update(self.session.execute(select(tags.c.name, tags.c.id).where(tags.c.name.in_(missing))).all())
+        return known
+
+    def bulk_insert(
+            self,
+            rows: Iterable[Union[Sequence, Dict]],
+            columns: Optional[Sequence[str]] = None,
+            batch_size: int = 1000,
+    ) -> List[Dict]:
+        """
+        Insert plain dicts, or tuples in `columns` order, with a Core executemany INSERT
+        (no ORM objects). Each batch of batch_size rows is its own statement and transaction,
+        so a failing batch is rolled back on its own.
+        Returns one {"rows", "seconds", "ok"} entry per batch.
+        """
+        table = SgIntradayScreenerSignals.__table__
+        iterator = iter(rows)
+        stats = []
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                break
+            if columns is not None:
+                batch = [dict(zip(columns, row)) for row in batch]
+
+            started = time.perf_counter()
+            try:
+                # executemany: the compiled INSERT is cached and the driver sends the batch as
+                # multi-row INSERTs (pymysql/mysqlclient rewrite executemany into VALUES lists)
+                self.session.execute(insert(table), batch)
+                self.session.commit()
+                ok = True
+            except Exception as e:
+                print(f"❌ Bulk insert of {len(batch)} rows failed:", e)
+                self.session.rollback()
+                ok = False
+            stats.append({"rows": len(batch), "seconds": time.perf_counter() - started, "ok": ok})
+        return stats
+
     def fetch_signals_by_date_stock_and_screeners(
             self,
             screener_date: Union[date, str],
@@ -207,6 +525,170 @@ class SgIntradayScreenerSignalsRepository:
             )
             .all()
         )
+
+    def get_signal_rows(
+            self,
+            screener_date: Union[date, str],
+            stock_names: Optional[Iterable[str]] = None,
+    ) -> List[IntradaySignalRow]:
+        """
+        Read-only rows of a day's alerts (optionally only for some stocks), ordered by id.
+        Use fetch_signals_by_date_stock_and_screeners() when the ORM objects are to be modified.
+        """
+        if isinstance(screener_date, str):
+            screener_date = parser.parse(screener_date).date()
+
+        statement = row_select(SgIntradayScreenerSignals, IntradaySignalRow).where(
+            SgIntradayScreenerSignals.screener_date == screener_date
+        )
+        if stock_names is not None:
+            names = {name.strip().upper() for name in stock_names}
+            if not names:
+                return []
+            statement = statement.where(SgIntradayScreenerSignals.stock_name.in_(names))
+        return fetch_rows(self.session, statement.order_by(SgIntradayScreenerSignals.id), IntradaySignalRow)
+
+    def get_levels_by_date_and_stocks(
+            self,
+            screener_date: Union[date, str],
+            stock_names: Iterable[str],
+    ) -> Dict[str, float]:
+        """
+        Return {stock_name: level} for the given date in one query.
+        Like fetch_signals_by_date_stock_and_screeners()[0].level, the first row (by id) wins;
+        stocks without a row are left out of the map.
+        """
+        if isinstance(screener_date, str):
+            screener_date = parser.parse(screener_date).date()
+
+        names = {name.strip().upper() for name in stock_names}
+        if not names:
+            return {}
+
+        rows = (
+            self.session
+            .query(SgIntradayScreenerSignals.stock_name, SgIntradayScreenerSignals.level)
+            .filter(
+                SgIntradayScreenerSignals.screener_date == screener_date,
+                SgIntradayScreenerSignals.stock_name.in_(names),
+            )
+            .order_by(SgIntradayScreenerSignals.id)
+            .all()
+        )
+        levels = {}
+        for stock_name, level in rows:
+            levels.setdefault(stock_name, level)
+        return levels
+
+    def get_signal_history(self, signal_ids: Iterable[int]) -> Dict[int, Dict[str, Optional[str]]]:
+        """
+        Rebuild the old text columns of signals from their run events:
+        {signal_id: {"run_history", "tags", "bullish_milestone_tags", "bearish_milestone_tags"}}
+        with run_history/tags as "HH:MM-RUN, ..." / "HH:MM-<label>, ..." and each milestone
+        column as the sorted, space-separated set of tags seen over the day.
+        """
+        ids = set(signal_ids)
+        if not ids:
+            return {}
+        events = SgIntradaySignalEvents.__table__
+        event_tags = SgIntradaySignalEventTags.__table__
+        tags = SgSignalTags.__table__
+
+        history = {}
+        for signal_id, run_time, label in self.session.execute(
+            select(events.c.signal_id, events.c.run_time, events.c.label)
+            .where(events.c.signal_id.in_(ids))
+            .order_by(events.c.signal_id, events.c.run_time)
+        ):
+            entry = history.setdefault(signal_id, {"run_history": [], "tags": [], "bullish": set(), "bearish": set()})
+            entry["run_history"].append(f"{run_time:%H:%M}-RUN")
+            entry["tags"].append(f"{run_time:%H:%M}-{label}")
+
+        for signal_id, name, direction in self.session.execute(
+            select(events.c.signal_id, tags.c.name, event_tags.c.direction)
+            .join(event_tags, event_tags.c.event_id == events.c.id)
+            .join(tags, tags.c.id == event_tags.c.tag_id)
+            .where(events.c.signal_id.in_(ids))
+        ):
+            history[signal_id][direction].add(name)
+
+        return {
+            signal_id: {
+                "run_history": ", ".join(entry["run_history"]),
+                "tags": ", ".join(entry["tags"]),
+                "bullish_milestone_tags": " ".join(sorted(entry["bullish"])) or None,
+                "bearish_milestone_tags": " ".join(sorted(entry["bearish"])) or None,
+            }
+            for signal_id, entry in history.items()
+        }
+
+    def get_stocks_with_tag(
+            self,
+            screener_date: Union[date, str],
+            tag: str,
+            since: Union[datetime, dt_time, None] = None,
+            direction: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Stocks whose runs on `screener_date` reported milestone `tag` (optionally only runs at or
+        after `since`, a time of that day or a datetime, and only as a "bullish"/"bearish" tag),
+        in order of their first such run.
+        """
+        if isinstance(screener_date, str):
+            screener_date = parser.parse(screener_date).date()
+        events = SgIntradaySignalEvents.__table__
+        event_tags = SgIntradaySignalEventTags.__table__
+        tags = SgSignalTags.__table__
+        signals = SgIntradayScreenerSignals.__table__
+
+        statement = (
+            select(signals.c.stock_name, func.min(events.c.run_time).label("first_run"))
+            .select_from(tags)
+            .join(event_tags, event_tags.c.tag_id == tags.c.id)
+            .join(events, events.c.id == event_tags.c.event_id)
+            .join(signals, signals.c.id == events.c.signal_id)
+            .where(tags.c.name == tag, events.c.screener_date == screener_date)
+            .group_by(signals.c.stock_name)
+            .order_by("first_run", signals.c.stock_name)
+        )
+        if isinstance(since, dt_time):
+            since = datetime.combine(screener_date, since)
+        if since is not None:
+            statement = statement.where(events.c.run_time >= _event_time(since))
+        if direction is not None:
+            statement = statement.where(event_tags.c.direction == direction)
+        return [stock_name for stock_name, _ in self.session.execute(statement)]
+
+    def get_day_version(self, screener_date: Union[date, str]) -> Tuple:
+        """
+        Cheap change marker for a screener_date: (latest run_id, latest update, row count).
+        Used by SignalCache to notice a new scrape without reloading the rows.
+        """
+        if isinstance(screener_date, str):
+            screener_date = parser.parse(screener_date).date()
+        # ✅ own short-lived connection: a fresh snapshot under REPEATABLE READ without ending the
+        #    (shared) session's transaction
+        statement = select(
+            func.max(SgIntradayScreenerSignals.run_id),
+            func.max(SgIntradayScreenerSignals.updated_time),
+            func.count(SgIntradayScreenerSignals.id),
+        ).where(SgIntradayScreenerSignals.screener_date == screener_date)
+        with self.session.get_bind().connect() as connection:
+            return tuple(connection.execute(statement).one())
+
+    def _delete_events_of(self, *criteria):
+        """
+        Delete the run events of the signals matching `criteria`, and their tag links, in the
+        same transaction as the signals. The links are deleted explicitly: SQLite ignores
+        ON DELETE CASCADE unless foreign keys are switched on per connection.
+        """
+        signals = SgIntradayScreenerSignals.__table__
+        events = SgIntradaySignalEvents.__table__
+        event_tags = SgIntradaySignalEventTags.__table__
+        of_signals = events.c.signal_id.in_(select(signals.c.id).where(*criteria))
+        self.session.execute(delete(event_tags).where(event_tags.c.event_id.in_(select(events.c.id).where(of_signals))))
+        self.session.execute(delete(events).where(of_signals))
+
     def delete_by_date_and_type(
             self,
             screener_date: Union[date, str],
@@ -221,6 +703,10 @@ class SgIntradayScreenerSignalsRepository:
             screener_date = parser.parse(screener_date).date()
 
         try:
+            self._delete_events_of(
+                SgIntradayScreenerSignals.screener_date == screener_date,
+                SgIntradayScreenerSignals.screener_type == screener_type,
+            )
             deleted_count = (
                 self.session
                 .query(SgIntradayScreenerSignals)
@@ -228,7 +714,7 @@ class SgIntradayScreenerSignalsRepository:
                     SgIntradayScreenerSignals.screener_date == screener_date,
                     SgIntradayScreenerSignals.screener_type == screener_type
                 )
-                .delete(synchronize_session='fetch')
+                .delete(synchronize_session=False)
             )
             self.session.commit()
             print(f"🗑️ Deleted {deleted_count} records for date={screener_date} and type={screener_type}")
@@ -254,6 +740,10 @@ class SgIntradayScreenerSignalsRepository:
             screener_date = parser.parse(screener_date).date()
 
         try:
+            self._delete_events_of(
+                SgIntradayScreenerSignals.screener_date == screener_date,
+                SgIntradayScreenerSignals.screener_type == screener_type,
+            )
             deleted_count = (
                 self.session
                 .query(SgIntradayScreenerSignals)
@@ -261,7 +751,7 @@ class SgIntradayScreenerSignalsRepository:
                     SgIntradayScreenerSignals.screener_date == screener_date,
                     SgIntradayScreenerSignals.screener_type == screener_type,
                 )
-                .delete(synchronize_session='fetch')
+                .delete(synchronize_session=False)
             )
             self.session.commit()
             print(f"🗑️ Deleted {deleted_count} records for "
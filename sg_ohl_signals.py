@@ -1,21 +1,34 @@
 import pytz
 from datetime import datetime, date
-from sqlalchemy import Column, String, Float, Integer, Date, Index,DateTime
+from sqlalchemy import Column, String, Float, Integer, Date, Index,DateTime, func, select
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 from dateutil import parser
-from typing import Union
+from typing import Union, Tuple, Optional, List, Iterator
 
 from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.management.database_manager import (
-    get_db_session,
     Base,
     engine,
 )
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.management.session_provider import get_session
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.partition_keys import ROWID_KEY
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.read_models import (
+    OhlSignalRow,
+    fetch_rows,
+    row_select,
+    stream_rows,
+)
 
 load_dotenv()
 
 IST = pytz.timezone("Asia/Kolkata")
 
+# ✅ trade direction -> column holding its milestone tags
+MILESTONE_TAG_COLUMNS = {
+    "bullish": "bullish_milestone_tags",
+    "bearish": "bearish_milestone_tags",
+}
+
 def now_ist():
     return datetime.utcnow().replace(tzinfo=pytz.utc).astimezone(IST)
 
@@ -28,7 +41,7 @@ class SgOhlSignals(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     screener_run_id = Column(String(50), nullable=True)
-    screener_date = Column(Date, nullable=False, default=today_ist)
+    screener_date = Column(Date, primary_key=True, nullable=False, default=today_ist)  # ✅ partition column
     screener_type = Column(String(50), nullable=True)
     screener = Column(String(50), nullable=False)
     stock_name = Column(String(50), nullable=False)
@@ -59,11 +72,18 @@ class SgOhlSignals(Base):
             "stock_type",
             unique=True,
         ),
+        # ✅ get_by_screener_date_and_screener / delete_by_date_and_type
+        Index("ix_sg_ohl_date_type", "screener_date", "screener_type"),
+        # ✅ get_candidate_stock_names: the screener pattern is checked on the index entries
+        Index("ix_sg_ohl_date_screener_stock", "screener_date", "screener", "stock_name"),
+        # ✅ primary key (id, screener_date) for date partitioning; SQLite keeps id as its rowid
+        {"info": {ROWID_KEY: "id"}},
     )
 
 class SgOhlSignalsRepository:
-    def __init__(self):
-        self.session: Session = next(get_db_session())
+    def __init__(self, session: Optional[Session] = None):
+        """Uses the thread's shared session (session_provider) unless one is passed explicitly."""
+        self.session: Session = session if session is not None else get_session()
 
     def insert(self, data: list):
         try:
@@ -95,87 +115,100 @@ class SgOhlSignalsRepository:
             self.session.rollback()
             print("Error inserting data:", e)
 
-    def get_data(self, date: str | None = None):
+    @staticmethod
+    def _data_statement(date: str | None = None):
+        statement = row_select(SgOhlSignals, OhlSignalRow)
+        if date:
+            from datetime import datetime as _dt
+            date_obj = _dt.strptime(date, "%Y-%m-%d").date()
+            statement = statement.where(SgOhlSignals.screener_date == date_obj)
+        return statement
+
+    def get_data(self, date: str | None = None) -> List[OhlSignalRow]:
         try:
-            query = self.session.query(SgOhlSignals)
-            if date:
-                from datetime import datetime as _dt
-                date_obj = _dt.strptime(date, "%Y-%m-%d").date()
-                query = query.filter(SgOhlSignals.screener_date == date_obj)
-            result = query.all()
-            return [
-                [
-                    row.screener_run_id,
-                    row.screener_date,
-                    row.screener_type,
-                    row.screener,
-                    row.stock_name,
-                    row.trade_type,
-                    row.screener_rank,
-                    row.price,
-                    row.change,
-                    row.percentage,
-                    row.momentum,
-                    row.open,
-                    row.deviation_from_pivots,
-                    row.todays_range,
-                    row.ohl,
-                    row.stock_type,
-                    row.weekly_trend,
-                    row.sector,
-                    row.bullish_milestone_tags,
-                    row.bearish_milestone_tags,
-                ]
-                for row in result
-            ]
+            return fetch_rows(self.session, self._data_statement(date), OhlSignalRow)
         except Exception as e:
             print("Error retrieving data:", e)
             return []
 
-    def get_by_screener_date_and_screener(self, screener_date: str | date):
+    def iter_data(self, date: str | None = None, batch_size: int = 1000) -> Iterator[OhlSignalRow]:
+        """
+        Streaming get_data() for history reads: yields OhlSignalRow in `batch_size` chunks.
+        Unlike get_data(), errors are raised rather than turned into an empty (or truncated) result.
+        """
+        try:
+            yield from stream_rows(self.session, self._data_statement(date), OhlSignalRow, batch_size)
+        except Exception as e:
+            print("Error streaming data:", e)
+            raise
+
+    def get_by_screener_date_and_screener(self, screener_date: str | date) -> List[OhlSignalRow]:
         try:
             if isinstance(screener_date, str):
                 from datetime import datetime as _dt
                 date_obj = _dt.strptime(screener_date, "%Y-%m-%d").date()
             else:
                 date_obj = screener_date
-            result = (
-                self.session.query(SgOhlSignals)
+            statement = row_select(SgOhlSignals, OhlSignalRow).where(
+                SgOhlSignals.screener_date == date_obj,
+                #SgOhlSignals.screener == screener,
+            )
+            return fetch_rows(self.session, statement, OhlSignalRow)
+        except Exception as e:
+            print("Error retrieving data by screener_date and screener:", e)
+            return []
+
+    def get_candidate_stock_names(
+            self,
+            screener_date: str | date,
+            screener_pattern: str,
+            milestone_tag: str,
+            direction: str = "bearish",
+    ) -> List[str]:
+        """
+        Distinct stock_names of the day whose screener contains `screener_pattern` and whose
+        `direction` ("bullish"/"bearish") milestone tags contain `milestone_tag`, in insertion order.
+        Same matching as `pattern in row.screener and tag in row.<direction>_milestone_tags`, done in SQL.
+        """
+        if direction not in MILESTONE_TAG_COLUMNS:
+            raise ValueError(f"direction must be one of {sorted(MILESTONE_TAG_COLUMNS)}, got {direction!r}")
+        if isinstance(screener_date, str):
+            screener_date = parser.parse(screener_date).date()
+        has_tag = getattr(SgOhlSignals, MILESTONE_TAG_COLUMNS[direction]).contains(milestone_tag, autoescape=True)
+        try:
+            rows = (
+                self.session.query(SgOhlSignals.stock_name)
                 .filter(
-                    SgOhlSignals.screener_date == date_obj,
-                    #SgOhlSignals.screener == screener,
-                    )
+                    SgOhlSignals.screener_date == screener_date,
+                    SgOhlSignals.screener.contains(screener_pattern, autoescape=True),
+                    has_tag,
+                )
+                .order_by(SgOhlSignals.id)
                 .all()
             )
-            return [
-                [
-                    row.screener_run_id,
-                    row.screener_date,
-                    row.screener_type,
-                    row.screener,
-                    row.stock_name,
-                    row.trade_type,
-                    row.screener_rank,
-                    row.price,
-                    row.change,
-                    row.percentage,
-                    row.momentum,
-                    row.open,
-                    row.deviation_from_pivots,
-                    row.todays_range,
-                    row.ohl,
-                    row.stock_type,
-                    row.weekly_trend,
-                    row.sector,
-                    row.bullish_milestone_tags,
-                    row.bearish_milestone_tags,
-                ]
-                for row in result
-            ]
+            return list(dict.fromkeys(stock_name for stock_name, in rows))
         except Exception as e:
-            print("Error retrieving data by screener_date and screener:", e)
+            self.session.rollback()
+            print("Error retrieving candidate stock names:", e)
             return []
 
+    def get_day_version(self, screener_date: str | date) -> Tuple:
+        """
+        Cheap change marker for a screener_date: (latest run id, latest update, row count).
+        Used by SignalCache to notice a new scrape without reloading the rows.
+        """
+        if isinstance(screener_date, str):
+            screener_date = parser.parse(screener_date).date()
+        # ✅ own short-lived connection: a fresh snapshot under REPEATABLE READ without ending the
+        #    (shared) session's transaction
+        statement = select(
+            func.max(SgOhlSignals.screener_run_id),
+            func.max(SgOhlSignals.last_updated_time),
+            func.count(SgOhlSignals.id),
+        ).where(SgOhlSignals.screener_date == screener_date)
+        with self.session.get_bind().connect() as connection:
+            return tuple(connection.execute(statement).one())
+
     def update_weekly_trend(
             self,
             screener_date: str | date,
@@ -224,7 +257,7 @@ class SgOhlSignalsRepository:
                     SgOhlSignals.screener_date == screener_date,
                     SgOhlSignals.screener_type == screener_type
                 )
-                .delete(synchronize_session='fetch')
+                .delete(synchronize_session=False)
             )
             self.session.commit()
             print(f"🗑️ Deleted {deleted_count} records for date={screener_date} and type={screener_type}")
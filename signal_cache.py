@@ -0,0 +1,203 @@
+"""
+Process-local, day-scoped cache in front of the signal repositories.
+
+Within a trading day the OHL rows, intraday alert levels and TradingView tickers only change
+when a new scrape lands. Every cached slot remembers the repository's get_day_version() marker
+(latest run id / update time and row count for the day); the marker is re-probed at most every
+`probe_interval` seconds, and a different value drops the slot so the next read goes to the DB.
+
+    cache = SignalCache(ohl_repo, intra_alerts_repo, tv_repo)
+    rows = cache.ohl_rows("2025-01-02")
+    names = cache.ohl_candidates("2025-01-02", "Low", "PRB")
+    levels = cache.intra_levels("2025-01-02", ["RELIANCE", "TCS"])
+    tickers = cache.tv_tickers("2025-01-02", ["NSE:RELIANCE-EQ"])
+    print(cache.stats())
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Iterable, List, Set, Union
+
+logger = logging.getLogger(__name__)
+
+OHL_ROWS = "ohl_rows"
+OHL_CANDIDATES = "ohl_candidates"
+INTRA_LEVELS = "intra_levels"
+TV_TICKERS = "tv_tickers"
+
+
+class _Slot:
+    """Cached payload of one source for one day, plus the version it was loaded at."""
+
+    __slots__ = ("version", "probed_at", "data")
+
+    def __init__(self, version, probed_at):
+        self.version = version
+        self.probed_at = probed_at
+        self.data = None
+
+
+class SignalCache:
+    def __init__(
+            self,
+            ohl_repo=None,
+            intra_repo=None,
+            tv_repo=None,
+            max_days: int = 3,
+            probe_interval: float = 1.0,
+            clock=time.monotonic,
+    ):
+        """
+        :param max_days: days kept in memory; the least recently used day is evicted first.
+        :param probe_interval: seconds a slot is trusted before its version is checked again;
+                               0 checks on every read.
+        """
+        self._probes = {
+            OHL_ROWS: ohl_repo.get_day_version if ohl_repo else None,
+            OHL_CANDIDATES: ohl_repo.get_day_version if ohl_repo else None,
+            INTRA_LEVELS: intra_repo.get_day_version if intra_repo else None,
+            TV_TICKERS: tv_repo.get_day_version if tv_repo else None,
+        }
+        self.ohl_repo = ohl_repo
+        self.intra_repo = intra_repo
+        self.tv_repo = tv_repo
+        self.max_days = max_days
+        self.probe_interval = probe_interval
+        self._clock = clock
+        self._days: "OrderedDict[str, Dict[str, _Slot]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._counters = {"hits": 0, "misses": 0, "probes": 0, "invalidations": 0, "evictions": 0}
+
+    # ---------- cached reads ----------
+
+    def ohl_rows(self, screener_date: Union[str, date]) -> list:
+        """SgOhlSignalsRepository.get_by_screener_date_and_screener(), cached per day."""
+        with self._lock:
+            slot = self._slot(screener_date, OHL_ROWS)
+            if slot.data is not None:
+                self._counters["hits"] += 1
+                return slot.data
+            self._counters["misses"] += 1
+            slot.data = self.ohl_repo.get_by_screener_date_and_screener(screener_date)
+            return slot.data
+
+    def ohl_candidates(
+            self,
+            screener_date: Union[str, date],
+            screener_pattern: str,
+            milestone_tag: str,
+            direction: str = "bearish",
+    ) -> List[str]:
+        """SgOhlSignalsRepository.get_candidate_stock_names(), cached per day and filter."""
+        key = (screener_pattern, milestone_tag, direction)
+        with self._lock:
+            slot = self._slot(screener_date, OHL_CANDIDATES)
+            if slot.data is None:
+                slot.data = {}
+            if key in slot.data:
+                self._counters["hits"] += 1
+                return slot.data[key]
+            self._counters["misses"] += 1
+            slot.data[key] = self.ohl_repo.get_candidate_stock_names(
+                self._day_key(screener_date), screener_pattern, milestone_tag, direction
+            )
+            return slot.data[key]
+
+    def intra_levels(self, screener_date: Union[str, date], stock_names: Iterable[str]) -> Dict[str, float]:
+        """
+        SgIntradayScreenerSignalsRepository.get_levels_by_date_and_stocks(), cached per day and stock.
+        Only the names not seen since the last run are queried; stocks without a level are
+        remembered as absent too.
+        """
+        names = {name.strip().upper() for name in stock_names}
+        with self._lock:
+            known = self._per_name(screener_date, INTRA_LEVELS, names, self.intra_repo.get_levels_by_date_and_stocks)
+            return {name: known[name] for name in names if known.get(name) is not None}
+
+    def tv_tickers(self, signal_date: Union[str, date], stocks: Iterable[str]) -> Set[str]:
+        """TVSignalsRepository.get_tickers_with_signals_on(), cached per day and ticker."""
+        tickers = set(stocks)
+
+        def fetch(day, missing):
+            with_signals = self.tv_repo.get_tickers_with_signals_on(missing, day)
+            return {ticker: True for ticker in with_signals}
+
+        with self._lock:
+            known = self._per_name(signal_date, TV_TICKERS, tickers, fetch)
+            return {ticker for ticker in tickers if known.get(ticker)}
+
+    # ---------- management ----------
+
+    def invalidate(self, day: Union[str, date, None] = None, source: str = None):
+        """Drop cached data: everything, one day, or one source (of one day or of all days)."""
+        with self._lock:
+            days = [self._day_key(day)] if day is not None else list(self._days)
+            for key in days:
+                slots = self._days.get(key)
+                if slots is None:
+                    continue
+                if source is None:
+                    del self._days[key]
+                else:
+                    slots.pop(source, None)
+            self._counters["invalidations"] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_ratio": round(self._counters["hits"] / lookups, 3) if lookups else 0.0,
+                "days": list(self._days),
+            }
+
+    # ---------- internals ----------
+
+    @staticmethod
+    def _day_key(day: Union[str, date]) -> str:
+        return day.strftime("%Y-%m-%d") if isinstance(day, date) else str(day)
+
+    def _slot(self, day: Union[str, date], source: str) -> _Slot:
+        """Return the slot for (day, source), re-probing its version when it is due."""
+        key = self._day_key(day)
+        slots = self._days.get(key)
+        if slots is None:
+            slots = self._days[key] = {}
+            while len(self._days) > self.max_days:
+                evicted, _ = self._days.popitem(last=False)
+                self._counters["evictions"] += 1
+                logger.debug(f"SignalCache evicted {evicted}")
+        self._days.move_to_end(key)
+
+        now = self._clock()
+        slot = slots.get(source)
+        if slot is not None and now - slot.probed_at < self.probe_interval:
+            return slot
+
+        probe = self._probes[source]
+        version = probe(key) if probe else None
+        self._counters["probes"] += 1
+        if slot is None or slot.version != version:
+            if slot is not None:
+                self._counters["invalidations"] += 1
+                logger.info(f"🔄 SignalCache: new {source} data for {key}")
+            slot = slots[source] = _Slot(version, now)
+        else:
+            slot.probed_at = now
+        return slot
+
+    def _per_name(self, day, source, names: Set[str], fetch) -> Dict:
+        slot = self._slot(day, source)
+        if slot.data is None:
+            slot.data = {}
+        missing = names.difference(slot.data)
+        if not missing:
+            self._counters["hits"] += 1
+            return slot.data
+        self._counters["misses"] += 1
+        found = fetch(self._day_key(day), missing)
+        for name in missing:
+            slot.data[name] = found.get(name)
+        return slot.data
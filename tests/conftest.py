@@ -0,0 +1,24 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.management.database_manager import Base
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals import (  # noqa: F401 (models)
+    sg_intraday_screener_signals,
+    sg_ohl_signals,
+    tradingview_signals,
+)
+
+
+@pytest.fixture
+def sqlite_engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(sqlite_engine):
+    with Session(sqlite_engine) as session:
+        yield session
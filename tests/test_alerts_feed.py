@@ -0,0 +1,81 @@
+import io
+import json
+import logging
+from pathlib import Path
+
+from algo_scripts.algotrade.scripts.trading_style.intraday.strategies.intraday_screener.scanner import (
+    get_intra_stock_alerts as alerts,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+RUN = dict(stock_type="Intraday Alerts", strength="Intraday", date_time="2025-01-02 10:15:00")
+logger = logging.getLogger("test_alerts_feed")
+
+
+def csv_records():
+    with open(FIXTURES / "intraday_alerts.csv", newline="", encoding="utf-8") as file:
+        rows = alerts.parse_alerts_csv(file, logger=logger, **RUN)
+    return list(alerts.normalise_alert_rows(rows, logger))
+
+
+def feed_records(payload=None):
+    if payload is None:
+        payload = json.loads((FIXTURES / "intraday_alerts_feed.json").read_text())
+    rows = alerts.json_alerts_to_rows(payload, logger=logger, **RUN)
+    return list(alerts.normalise_alert_rows(rows, logger))
+
+
+def test_feed_rows_match_csv_export():
+    expected = csv_records()
+    assert [r["stock_name"] for r in expected] == ["RELIANCE", "TATASTEEL", "INFY", "SBIN"]
+    assert feed_records() == expected
+
+
+def test_feed_rows_trade_type_and_tags():
+    by_name = {r["stock_name"]: r for r in feed_records()}
+    assert by_name["TATASTEEL"]["trade_type"] == "SELL"
+    assert by_name["TATASTEEL"]["bearish_milestone_tags"] == "PDL"
+    assert by_name["RELIANCE"]["bullish_milestone_tags"] == "PRB ORB"
+    assert by_name["INFY"]["bullish_milestone_tags"] == ""
+
+
+def test_reshaped_feed_gives_no_rows():
+    payload = {"data": [{"ticker": "RELIANCE", "price": 2891.5}]}
+    assert feed_records(payload) == []
+
+
+def test_only_the_alerts_feed_matches():
+    site = "https://api.intradayscreener.com"
+    feed = {"url": f"{site}/api/v1/intraday-alerts?segment=fno", "mimeType": "application/json"}
+    assert alerts.is_alerts_feed(feed, "XHR")
+    assert not alerts.is_alerts_feed(feed, "Document")
+    assert not alerts.is_alerts_feed({**feed, "url": f"{site}/api/v1/alert-settings"}, "XHR")
+    assert not alerts.is_alerts_feed({**feed, "url": "https://widgets.example.com/intraday-alerts"}, "Fetch")
+    assert not alerts.is_alerts_feed({**feed, "mimeType": "text/html"}, "Fetch")
+
+
+def test_captured_export_streams_into_the_db_in_chunks(session, monkeypatch):
+    from sqlalchemy import select
+
+    from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_intraday_screener_signals import (
+        SgIntradayScreenerSignals,
+        SgIntradayScreenerSignalsRepository,
+    )
+
+    batches = []
+
+    class Repository(SgIntradayScreenerSignalsRepository):
+        def bulk_upsert(self, records, batch_size=500):
+            assert not isinstance(records, list)  # rows arrive lazily, not as a parsed list
+            stats = super().bulk_upsert(records, batch_size=batch_size)
+            batches.extend(batch["rows"] for batch in stats)
+            return stats
+
+    monkeypatch.setattr(alerts, "SgIntradayScreenerSignalsRepository", lambda: Repository(session))
+    csv_text = (FIXTURES / "intraday_alerts.csv").read_text(encoding="utf-8")
+
+    inserted = alerts.stream_alerts_to_db(io.StringIO(csv_text, newline=""), logger=logger, chunk_size=3, **RUN)
+
+    assert inserted == 4 and batches == [3, 1]
+    names = session.scalars(select(SgIntradayScreenerSignals.stock_name)).all()
+    assert sorted(names) == ["INFY", "RELIANCE", "SBIN", "TATASTEEL"]
@@ -0,0 +1,105 @@
+from datetime import date, datetime
+
+from sqlalchemy import func, select
+
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.sg_intraday_screener_signals import (
+    SgIntradayScreenerSignals,
+    SgIntradayScreenerSignalsRepository,
+    SgIntradaySignalEvents,
+    SgIntradaySignalEventTags,
+)
+
+DAY = date(2025, 1, 2)
+
+
+def record(stock_name, run_time, **values):
+    return {
+        "screener": "TOP_GAINER",
+        "screener_date": DAY,
+        "screener_type": "INTRADAY",
+        "stock_name": stock_name,
+        "trade_type": "BUY",
+        "screener_run_time": run_time,
+        "level": 100.0,
+        "alerts": None,
+        "ltp": None,
+        "tags": None,
+        "bullish_milestone_tags": None,
+        "bearish_milestone_tags": None,
+        **values,
+    }
+
+
+def signal(session, stock_name):
+    return session.execute(
+        select(SgIntradayScreenerSignals).where(SgIntradayScreenerSignals.stock_name == stock_name)
+    ).scalar_one()
+
+
+def test_key_listed_twice_in_one_export_counts_once_per_run(session):
+    repo = SgIntradayScreenerSignalsRepository(session=session)
+    for minute in (15, 30):
+        run = datetime(2025, 1, 2, 9, minute)
+        stats = repo.bulk_upsert([record("TCS", run), record("TCS", run)])
+        assert all(batch["ok"] for batch in stats)
+    assert signal(session, "TCS").signal_count == 2
+    assert session.execute(select(func.count()).select_from(SgIntradaySignalEvents)).scalar() == 2
+
+
+def test_later_run_refreshes_the_per_run_values(session):
+    repo = SgIntradayScreenerSignalsRepository(session=session)
+    repo.bulk_upsert([record("TCS", datetime(2025, 1, 2, 9, 15), level=100.0, alerts="VOL", ltp=10.0)])
+    repo.bulk_upsert([record("TCS", datetime(2025, 1, 2, 9, 30), level=105.0, alerts="OI", ltp=None)])
+    row = signal(session, "TCS")
+    assert (row.level, row.alerts, row.ltp, row.signal_count) == (105.0, "OI", 10.0, 2)
+
+
+def test_duplicates_within_an_export_merge_values_and_milestone_tags(session):
+    repo = SgIntradayScreenerSignalsRepository(session=session)
+    run = datetime(2025, 1, 2, 9, 15)
+    repo.bulk_upsert([
+        record("TCS", run, level=100.0, bearish_milestone_tags="PRB"),
+        record("TCS", run, level=101.0, bearish_milestone_tags="NR7"),
+    ])
+    row = signal(session, "TCS")
+    assert (row.level, row.signal_count, row.bearish_milestone_tags) == (101.0, 1, "NR7 PRB")
+    history = repo.get_signal_history([row.id])[row.id]
+    assert history["bearish_milestone_tags"] == "NR7 PRB"
+
+
+def test_runs_of_one_key_in_a_single_batch_are_all_recorded(session):
+    repo = SgIntradayScreenerSignalsRepository(session=session)
+    repo.bulk_upsert([
+        record("TCS", datetime(2025, 1, 2, 9, 15), tags="09:15-BEST_Intraday"),
+        record("TCS", datetime(2025, 1, 2, 9, 30), tags="09:30-OI_BUILDUP"),
+    ])
+    row = signal(session, "TCS")
+    assert row.signal_count == 2
+    history = repo.get_signal_history([row.id])[row.id]
+    assert history["run_history"] == "09:15-RUN, 09:30-RUN"
+    assert history["tags"] == "09:15-BEST_Intraday, 09:30-OI_BUILDUP"
+
+
+def test_a_key_repeated_across_batches_of_one_call_counts_once(session):
+    repo = SgIntradayScreenerSignalsRepository(session=session)
+    run = datetime(2025, 1, 2, 9, 15)
+    stats = repo.bulk_upsert([record("TCS", run), record("INFY", run), record("TCS", run)], batch_size=2)
+    assert [batch["ok"] for batch in stats] == [True, True]
+    assert signal(session, "TCS").signal_count == 1
+    assert signal(session, "INFY").signal_count == 1
+
+
+def test_delete_removes_the_events_and_their_tag_links(session):
+    repo = SgIntradayScreenerSignalsRepository(session=session)
+    repo.bulk_upsert([
+        record("TCS", datetime(2025, 1, 2, 9, 15), bearish_milestone_tags="PRB"),
+        record("INFY", datetime(2025, 1, 2, 9, 15), screener_type="SWING", bullish_milestone_tags="NR7"),
+    ])
+    assert repo.delete_by_date_and_type(DAY, "INTRADAY") == 1
+
+    def count(model):
+        return session.execute(select(func.count()).select_from(model)).scalar()
+
+    assert count(SgIntradayScreenerSignals) == 1
+    assert count(SgIntradaySignalEvents) == 1
+    assert count(SgIntradaySignalEventTags) == 1
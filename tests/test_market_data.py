@@ -0,0 +1,32 @@
+import json
+
+from algo_scripts.algotrade.scripts.trade_utils.market_data import ReplaySource
+
+
+def write_ticks(path, ticks):
+    path.write_text("".join(json.dumps(tick) + "\n" for tick in ticks), encoding="utf-8")
+
+
+def test_replay_staleness_follows_the_recording_clock(tmp_path):
+    path = tmp_path / "ticks.jsonl"
+    write_ticks(path, [
+        {"t": 1000.0, "symbol": "NSE:TCS-EQ", "ltp": 10.0},
+        {"t": 1001.0, "symbol": "NSE:INFY-EQ", "ltp": 20.0},
+        {"t": 1010.0, "symbol": "NSE:INFY-EQ", "ltp": 21.0},
+    ])
+    source = ReplaySource(str(path), speed=0, max_age=5.0)
+    source.replay()
+
+    # ✅ TCS last ticked 10 recorded seconds before the end; INFY is current
+    quotes = source.get_quotes(["NSE:TCS-EQ", "NSE:INFY-EQ"])
+    assert quotes == [{"symbol": "NSE:INFY-EQ", "ltp": 21.0, "prev_close": None, "change_percent": None}]
+    assert source.stats()["stale_quotes"] == 1
+
+
+def test_replay_quotes_stay_fresh_after_the_recording_ends(tmp_path, monkeypatch):
+    path = tmp_path / "ticks.jsonl"
+    write_ticks(path, [{"t": 1000.0, "symbol": "NSE:TCS-EQ", "ltp": 10.0}])
+    source = ReplaySource(str(path), speed=0, max_age=5.0)
+    source.replay()
+    monkeypatch.setattr("time.monotonic", lambda: 10 ** 9)
+    assert [quote["ltp"] for quote in source.get_quotes(["NSE:TCS-EQ"])] == [10.0]
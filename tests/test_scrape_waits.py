@@ -0,0 +1,43 @@
+import logging
+import time
+
+from algo_scripts.algotrade.scripts.trading_style.intraday.strategies.intraday_screener.scanner.get_intra_stock_alerts import (
+    read_captured_download,
+    wait_for_settle,
+)
+
+logger = logging.getLogger("test_scrape_waits")
+
+
+class ScriptDriver:
+    """Answers execute_script from a table of script -> result; unknown scripts return None."""
+
+    def __init__(self, **results):
+        self.results = results
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        self.scripts.append(script)
+        for marker, result in self.results.items():
+            if marker in script:
+                return result
+        return None
+
+
+def test_busy_page_is_logged_and_not_fatal():
+    driver = ScriptDriver(getAllAngularTestabilities=False, __pendingRequests=False)
+    timings = {}
+    assert wait_for_settle(driver, "alerts page settled", logger, timings, timeout=0.2) is False
+    assert timings["alerts page settled"] < 1
+
+
+def test_download_to_disk_is_detected_without_waiting_out_the_timeout(tmp_path):
+    (tmp_path / "All Intrady Alerts.csv.crdownload").write_text("partial")
+    driver = ScriptDriver(__capturedDownloads=False)
+    started = time.perf_counter()
+    text = read_captured_download(
+        driver, logger, timeout=10, download_path=str(tmp_path / "All Intrady Alerts.csv")
+    )
+    assert text is None
+    assert time.perf_counter() - started < 1
+    assert driver.scripts[-1] == "window.__captureDownloads = false;"
@@ -0,0 +1,86 @@
+import logging
+
+import pytest
+
+from algo_scripts.algotrade.scripts.trading_style.intraday.strategies.intraday_screener.scanner.get_intra_stock_alerts import (
+    ScreenerBrowserSession,
+    ScreenerSessionPool,
+    ScreenerSessionPoolTimeout,
+)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.current_url = "https://intradayscreener.com/home"
+        self.quits = 0
+
+    def quit(self):
+        self.quits += 1
+
+    def find_elements(self, by, value):
+        return []
+
+
+class FakePool(ScreenerSessionPool):
+    """Pool whose browsers are FakeDrivers; login fails while fail_login is set."""
+
+    def __init__(self, size=1, fail_login=False):
+        super().__init__(logging.getLogger("test_session_pool"), size=size, download_dir="/tmp")
+        self.fail_login = fail_login
+        self.started = []
+
+    def _start_browser(self):
+        browser = ScreenerBrowserSession(FakeDriver(), "/nonexistent/chrome-ud-test", self.download_dir)
+        self.started.append(browser)
+        return browser
+
+    def _login(self, browser):
+        if self.fail_login:
+            raise RuntimeError("login form never showed up")
+        browser.logged_in_at = 1e12
+
+
+def test_failed_login_quits_the_browser_and_frees_the_slot():
+    pool = FakePool(fail_login=True)
+    with pytest.raises(RuntimeError):
+        with pool.session():
+            pass
+    assert [b.driver.quits for b in pool.started] == [1]
+    assert pool._open_sessions == 0
+
+    pool.fail_login = False
+    with pool.session() as driver:
+        assert driver is pool.started[1].driver
+    assert pool._open_sessions == 1
+
+
+def test_failed_relogin_of_a_replacement_quits_both_browsers():
+    pool = FakePool()
+    pool.warm_up()
+    dead = pool.started[0]
+    dead.closed = True  # Chrome crashed while idle
+    pool.fail_login = True
+    with pytest.raises(RuntimeError):
+        with pool.session():
+            pass
+    replacement = pool.started[1]
+    assert replacement.closed and replacement.driver.quits == 1
+    assert pool._open_sessions == 0
+    assert pool._idle.empty()
+
+
+def test_checkout_times_out_with_a_pool_error():
+    pool = FakePool()
+    with pool.session():
+        with pytest.raises(ScreenerSessionPoolTimeout):
+            with pool.session(timeout=0.01):
+                pass
+    assert pool._open_sessions == 1
+
+
+def test_quit_is_idempotent():
+    browser = ScreenerBrowserSession(FakeDriver(), "/nonexistent/chrome-ud-test", "/tmp")
+    browser.quit()
+    browser.quit()
+    assert browser.driver.quits == 1
+    assert not browser.is_alive()
@@ -0,0 +1,87 @@
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.signal_cache import SignalCache
+
+
+class FakeOhlRepo:
+    def __init__(self):
+        self.version = ("run-1", None, 1)
+        self.rows = ["A"]
+        self.loads = 0
+
+    def get_day_version(self, day):
+        return self.version
+
+    def get_by_screener_date_and_screener(self, day):
+        self.loads += 1
+        return list(self.rows)
+
+
+class FakeIntraRepo:
+    def __init__(self):
+        self.version = 1
+        self.levels = {"TCS": 10.0}
+        self.queried = []
+
+    def get_day_version(self, day):
+        return self.version
+
+    def get_levels_by_date_and_stocks(self, day, names):
+        self.queried.append(set(names))
+        return {name: self.levels[name] for name in names if name in self.levels}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_rows_are_served_from_cache_while_the_version_holds():
+    repo = FakeOhlRepo()
+    cache = SignalCache(ohl_repo=repo, probe_interval=0)
+    assert cache.ohl_rows("2025-01-02") == ["A"]
+    assert cache.ohl_rows("2025-01-02") == ["A"]
+    assert repo.loads == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_new_day_version_reloads_the_slot():
+    repo = FakeOhlRepo()
+    cache = SignalCache(ohl_repo=repo, probe_interval=0)
+    cache.ohl_rows("2025-01-02")
+    repo.version, repo.rows = ("run-2", None, 2), ["A", "B"]
+    assert cache.ohl_rows("2025-01-02") == ["A", "B"]
+    assert repo.loads == 2
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_version_is_only_probed_after_the_probe_interval():
+    repo, clock = FakeOhlRepo(), Clock()
+    cache = SignalCache(ohl_repo=repo, probe_interval=1.0, clock=clock)
+    cache.ohl_rows("2025-01-02")
+    repo.version, repo.rows = ("run-2", None, 2), ["A", "B"]
+    clock.now = 0.5
+    assert cache.ohl_rows("2025-01-02") == ["A"]
+    clock.now = 1.5
+    assert cache.ohl_rows("2025-01-02") == ["A", "B"]
+
+
+def test_intra_levels_only_query_unseen_names_until_the_version_changes():
+    repo = FakeIntraRepo()
+    cache = SignalCache(intra_repo=repo, probe_interval=0)
+    assert cache.intra_levels("2025-01-02", ["tcs", "INFY"]) == {"TCS": 10.0}
+    assert cache.intra_levels("2025-01-02", ["TCS", "INFY"]) == {"TCS": 10.0}
+    assert repo.queried == [{"TCS", "INFY"}]
+    repo.version, repo.levels = 2, {"TCS": 10.0, "INFY": 20.0}
+    assert cache.intra_levels("2025-01-02", ["TCS", "INFY"]) == {"TCS": 10.0, "INFY": 20.0}
+    assert repo.queried[-1] == {"TCS", "INFY"}
+
+
+def test_least_recently_used_day_is_evicted():
+    repo = FakeOhlRepo()
+    cache = SignalCache(ohl_repo=repo, max_days=2, probe_interval=0)
+    for day in ("2025-01-01", "2025-01-02", "2025-01-03"):
+        cache.ohl_rows(day)
+    assert cache.stats()["days"] == ["2025-01-02", "2025-01-03"]
+    assert cache.stats()["evictions"] == 1
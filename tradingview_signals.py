@@ -1,7 +1,7 @@
-from sqlalchemy import Column, String, Float, Integer, DateTime, PrimaryKeyConstraint
+from sqlalchemy import Column, String, Float, Integer, DateTime, PrimaryKeyConstraint, Index
 from sqlalchemy.orm import Session
-from datetime import datetime
-from typing import List, Optional, Dict
+from datetime import datetime, date as date_type, timedelta
+from typing import List, Optional, Dict, Iterable, Iterator, Set, Tuple, Union
 import logging
 from dotenv import load_dotenv
 import json
@@ -9,11 +9,13 @@ from sqlalchemy.sql import cast
 from sqlalchemy import and_
 from sqlalchemy import func
 from sqlalchemy import distinct
+from sqlalchemy import select
 from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.management.database_manager import (
-    get_db_session,
     Base,
     engine,
 )
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.management.session_provider import get_session
+from algo_scripts.algotrade.scripts.trading_style.intraday.core.intra_utils.db.signals.read_models import stream_rows
 
 # ✅ Load environment variables
 load_dotenv()
@@ -23,7 +25,35 @@ load_dotenv()
 # Logger setup
 logger = logging.getLogger(__name__)
 
-unique_stocks = []
+
+def day_range(day: Union[str, date_type]) -> Tuple[datetime, datetime]:
+    """Half-open [day_start, next_day) bounds, so signal_time filters stay index-friendly."""
+    if isinstance(day, str):
+        day = datetime.strptime(day, "%Y-%m-%d").date()
+    start = datetime(day.year, day.month, day.day)
+    return start, start + timedelta(days=1)
+
+def _to_dict(row) -> Dict:
+    """API dict of one signal (ORM object or Core row)."""
+    return {
+        "updated_time": row.updated_time.strftime("%Y-%m-%d %H:%M:%S"),
+        "exchange": row.exchange,
+        "ticker": row.ticker,
+        "trade_type": row.trade_type,
+        "order_type": row.order_type,
+        "quantity": row.quantity,
+        "limit_price": row.limit_price,
+        "signal_time": row.signal_time.strftime("%Y-%m-%d %H:%M:%S"),
+        "strategy": row.strategy,
+        "candle_interval": row.candle_interval,
+        "alert_name": row.alert_name,
+        "open_price": row.open_price,
+        "close_price": row.close_price,
+        "high_price": row.high_price,
+        "low_price": row.low_price,
+        "response_message": row.response_message  # ✅ This is now stored and retrieved as proper JSON
+    }
+
 # ✅ Define the TVSignals model
 class TVSignals(Base):
     __tablename__ = "sg_tv_signals"
@@ -36,7 +66,7 @@ class TVSignals(Base):
     order_type = Column(String(20), nullable=False)
     quantity = Column(Integer, nullable=False)
     limit_price = Column(Float, nullable=False)
-    signal_time = Column(DateTime, nullable=False)
+    signal_time = Column(DateTime, primary_key=True, nullable=False)
     strategy = Column(String(50), nullable=False)
     candle_interval  = Column(String(10), nullable=False)
     alert_name = Column(String(100), nullable=False)
@@ -47,15 +77,21 @@ class TVSignals(Base):
     response_message = Column(String(200), nullable=False)
 
     __table_args__ = (
-        PrimaryKeyConstraint('updated_time', 'ticker', name='updated_time_ticker_pk'),
+        # ✅ signal_time: partition column (partition_manager), MySQL needs it in the primary key
+        PrimaryKeyConstraint('updated_time', 'ticker', 'signal_time', name='updated_time_ticker_pk'),
+        Index('ix_sg_tv_ticker_signal_time', 'ticker', 'signal_time'),  # ✅ check_stocks_by_date_and_screener
+        Index('ix_sg_tv_signal_time', 'signal_time'),  # ✅ get_tv_signals by date
+        Index('ix_sg_tv_type_strategy_signal_time', 'trade_type', 'strategy', 'signal_time'),  # ✅ get_tv_signals_by_criteria
         {"extend_existing": True},  # ✅ Fix for duplicate table issue
     )
 
 # ✅ Repository class for handling trade signals
 class TVSignalsRepository:
-    def __init__(self, db_session):
-        self.db_session: Session = next(get_db_session())
-    # ✅ Ensure session is stored properly
+    def __init__(self, db_session: Optional[Session] = None):
+        """Uses the given session, or the thread's shared session (session_provider)."""
+        if db_session is not None and not isinstance(db_session, Session):
+            db_session = next(db_session)  # ✅ older callers pass the get_db_session() generator
+        self.db_session: Session = db_session if db_session is not None else get_session()
 
     def insert_trade_signal(self, trade_data: List) -> Dict[str, str]:
         """Inserts a single trade signal into the database and returns the inserted row_id."""
@@ -140,40 +176,35 @@ class TVSignalsRepository:
             logger.error(f"Error deleting data: {e}", exc_info=True)
             return {"status": "error", "message": str(e)}
 
+    @staticmethod
+    def _tv_signals_statement(date: Optional[str] = None):
+        statement = select(TVSignals.__table__)
+        if date:
+            day_start, next_day = day_range(date)
+            statement = statement.where(TVSignals.signal_time >= day_start, TVSignals.signal_time < next_day)
+        return statement
+
     def get_tv_signals(self, date: Optional[str] = None):
         """Fetches trade signals from the database, optionally filtering by date."""
         try:
-            query = self.db_session.query(TVSignals)
-            if date:
-                date_obj = datetime.strptime(date, "%Y-%m-%d").date()
-                query = query.filter(cast(TVSignals.signal_time, DateTime) == date_obj)
-
-            result = query.all()
-            return [
-                {
-                    "updated_time": row.updated_time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "exchange": row.exchange,
-                    "ticker": row.ticker,
-                    "trade_type": row.trade_type,
-                    "order_type": row.order_type,
-                    "quantity": row.quantity,
-                    "limit_price": row.limit_price,
-                    "signal_time": row.signal_time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "strategy": row.strategy,
-                    "candle_interval": row.candle_interval,
-                    "alert_name": row.alert_name,
-                    "open_price": row.open_price,
-                    "close_price": row.close_price,
-                    "high_price": row.high_price,
-                    "low_price": row.low_price,
-                    "response_message": row.response_message  # ✅ This is now stored and retrieved as proper JSON
-                }
-                for row in result
-            ]
+            result = self.db_session.execute(self._tv_signals_statement(date))
+            return [_to_dict(row) for row in result]
         except Exception as e:
             logger.error(f"Error retrieving data: {e}", exc_info=True)
             return []
 
+    def iter_tv_signals(self, date: Optional[str] = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """
+        Streaming get_tv_signals() for history reads: yields the same dicts, `batch_size` rows at a
+        time from a server-side cursor. Errors are raised instead of ending the stream early.
+        """
+        try:
+            for row in stream_rows(self.db_session, self._tv_signals_statement(date), batch_size=batch_size):
+                yield _to_dict(row)
+        except Exception as e:
+            logger.error(f"Error streaming trade signals: {e}", exc_info=True)
+            raise
+
     def exists_trade_signal(self, signal_time, ticker, trade_type):
         """Checks if a trade signal already exists in the database."""
         existing_entry = self.db_session.query(TVSignals).filter(
@@ -185,30 +216,67 @@ class TVSignalsRepository:
         ).first()
         return existing_entry is not None  # ✅ Return True if exists, else False
 
-    def check_stocks_by_date_and_screener(self, stocks:list, date: str) :
+    def get_tickers_with_signals_on(self, stocks: Iterable[str], date: str) -> Set[str]:
         """
-        Retrieves unique stock tickers along with their strategies for a given date based on signal_time.
+        Returns the subset of `stocks` that have at least one signal on the given date,
+        in a single `ticker IN (...)` query over the signal_time range.
         :param date: The date in "YYYY-MM-DD" format.
-        :return: A list of dictionaries containing unique stock tickers and their strategies.
         """
+        tickers = set(stocks)
+        if not tickers:
+            return set()
         try:
-            for ticker in stocks:
-                date_obj = datetime.strptime(date, "%Y-%m-%d").date()
-                query = (
-                    self.db_session.query(distinct(TVSignals.ticker))
-                    .filter(func.DATE(TVSignals.signal_time) == str(date_obj),
-                            TVSignals.ticker == ticker
-                            ).all()
+            day_start, next_day = day_range(date)
+            rows = (
+                self.db_session.query(TVSignals.ticker)
+                .filter(
+                    TVSignals.ticker.in_(tickers),
+                    TVSignals.signal_time >= day_start,
+                    TVSignals.signal_time < next_day,
                 )
-                if type(query).__name__ == "list" and len(query)!=0:
-                    unique_stocks.append(query)
-                else:
-                    pass
-            return unique_stocks
-
+                .distinct()
+                .all()
+            )
+            return {row[0] for row in rows}
         except Exception as e:
-            logger.error(f"Error retrieving unique stocks: {e}", exc_info=True)
-            return []
+            self.db_session.rollback()
+            logger.error(f"Error retrieving tickers with signals: {e}", exc_info=True)
+            return set()
+
+    def get_day_version(self, date: str) -> Tuple:
+        """
+        Cheap change marker for the signals of a day: (latest updated_time, row count).
+        Used by SignalCache to notice new TradingView signals without reloading them.
+        """
+        day_start, next_day = day_range(date)
+        # ✅ own short-lived connection: a fresh snapshot under REPEATABLE READ without ending the
+        #    (shared) session's transaction
+        statement = (
+            select(func.max(TVSignals.updated_time), func.count())
+            .select_from(TVSignals)
+            .where(TVSignals.signal_time >= day_start, TVSignals.signal_time < next_day)
+        )
+        with self.db_session.get_bind().connect() as connection:
+            return tuple(connection.execute(statement).one())
+
+    def check_stocks_by_date_and_screener(self, stocks:list, date: str) :
+        """
+        Retrieves the stock tickers from `stocks` that have a signal on the given date.
+        :param date: The date in "YYYY-MM-DD" format.
+        :return: One `[(ticker,)]` entry per matching ticker, in the order of `stocks`.
+        """
+        with_signals = self.get_tickers_with_signals_on(stocks, date)
+        return [[(ticker,)] for ticker in dict.fromkeys(stocks) if ticker in with_signals]
+
+    @staticmethod
+    def _tv_signals_by_criteria_statement(signal_date: str, trade_type: str, strategy: str):
+        day_start, next_day = day_range(signal_date)
+        return select(TVSignals.__table__).where(
+            TVSignals.signal_time >= day_start,
+            TVSignals.signal_time < next_day,
+            TVSignals.trade_type == trade_type,
+            TVSignals.strategy == strategy
+        )
 
     def get_tv_signals_by_criteria(self, signal_date: str, trade_type: str, strategy: str):
         """
@@ -219,39 +287,28 @@ class TVSignalsRepository:
         :return: List of matching trade signals.
         """
         try:
-            date_obj = datetime.strptime(signal_date, "%Y-%m-%d").date()
-            query = self.db_session.query(TVSignals).filter(
-                func.DATE(TVSignals.signal_time) == date_obj,
-                TVSignals.trade_type == trade_type,
-                TVSignals.strategy == strategy
-            )
-
-            result = query.all()
-            return [
-                {
-                    "updated_time": row.updated_time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "exchange": row.exchange,
-                    "ticker": row.ticker,
-                    "trade_type": row.trade_type,
-                    "order_type": row.order_type,
-                    "quantity": row.quantity,
-                    "limit_price": row.limit_price,
-                    "signal_time": row.signal_time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "strategy": row.strategy,
-                    "candle_interval": row.candle_interval,
-                    "alert_name": row.alert_name,
-                    "open_price": row.open_price,
-                    "close_price": row.close_price,
-                    "high_price": row.high_price,
-                    "low_price": row.low_price,
-                    "response_message": row.response_message
-                }
-                for row in result
-            ]
+            statement = self._tv_signals_by_criteria_statement(signal_date, trade_type, strategy)
+            return [_to_dict(row) for row in self.db_session.execute(statement)]
         except Exception as e:
             logger.error(f"Error retrieving trade signals by criteria: {e}", exc_info=True)
             return []
 
+    def iter_tv_signals_by_criteria(
+            self,
+            signal_date: str,
+            trade_type: str,
+            strategy: str,
+            batch_size: int = 1000,
+    ) -> Iterator[Dict]:
+        """Streaming get_tv_signals_by_criteria(); see iter_tv_signals()."""
+        try:
+            statement = self._tv_signals_by_criteria_statement(signal_date, trade_type, strategy)
+            for row in stream_rows(self.db_session, statement, batch_size=batch_size):
+                yield _to_dict(row)
+        except Exception as e:
+            logger.error(f"Error streaming trade signals by criteria: {e}", exc_info=True)
+            raise
+
     def bulk_insert_trade_signals(self, trade_data_list):
         """
         Bulk inserts trade signals into the database while skipping existing records.